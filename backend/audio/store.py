@@ -0,0 +1,169 @@
+"""
+Audio Store
+Local content-addressed storage for call recordings.
+
+Uploads are streamed to a temporary file in fixed-size chunks while their
+SHA-256 is computed, then renamed to <root>/<aa>/<bb>/<sha256>; identical
+recordings are stored once. Recordings are referenced from
+calls.audio_file_url as audio://sha256/<digest><ext>, the extension carrying
+the media type.
+
+Reads serve one byte range at a time from a memory map, so seeking in a long
+recording touches only the pages it needs.
+
+Configuration (environment):
+    AUDIO_STORE_DIR       default ./audio_store
+    AUDIO_CHUNK_SIZE      write/read chunk in bytes (default 1 MiB)
+    AUDIO_MAX_BYTES       largest accepted upload (default 2 GiB)
+"""
+import asyncio
+import hashlib
+import mimetypes
+import mmap
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+URL_PREFIX = "audio://sha256/"
+_URL = re.compile(r"^audio://sha256/([0-9a-f]{64})(\.[A-Za-z0-9]+)?$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds AUDIO_MAX_BYTES."""
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised for a Range header that does not overlap the recording."""
+
+
+@dataclass
+class AudioStoreConfig:
+    root: str = "audio_store"
+    chunk_size: int = 1024 * 1024
+    max_bytes: int = 2 * 1024 * 1024 * 1024
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ
+        return cls(
+            root=env.get("AUDIO_STORE_DIR", cls.root),
+            chunk_size=int(env.get("AUDIO_CHUNK_SIZE", cls.chunk_size)),
+            max_bytes=int(env.get("AUDIO_MAX_BYTES", cls.max_bytes)),
+        )
+
+
+def audio_url(digest, content_type=None):
+    ext = mimetypes.guess_extension(content_type.split(";")[0].strip()) if content_type else None
+    return f"{URL_PREFIX}{digest}{ext or ''}"
+
+
+def parse_audio_url(url):
+    """Return (digest, media_type) for a store URL, or None for anything else (e.g. legacy paths)."""
+    match = _URL.match(url or "")
+    if not match:
+        return None
+    media_type = mimetypes.guess_type(f"recording{match.group(2) or ''}")[0]
+    return match.group(1), media_type or "application/octet-stream"
+
+
+def parse_range(header, size):
+    """
+    Resolve a single-range "bytes=start-end" header to an inclusive (start, end).
+    Returns None when the whole file should be sent (no header, or a
+    multi-range/unknown unit, which HTTP allows a server to ignore).
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise RangeNotSatisfiable(header)
+    return start, end
+
+
+class AudioStore:
+    def __init__(self, config=None):
+        self.config = config or AudioStoreConfig.from_env()
+        self.root = Path(self.config.root)
+
+    def path_for(self, digest):
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def size(self, digest):
+        return self.path_for(digest).stat().st_size
+
+    def exists(self, digest):
+        return self.path_for(digest).is_file()
+
+    async def save_stream(self, chunks):
+        """
+        Write an async iterator of byte chunks to the store in fixed-size pieces.
+        Returns (digest, size). Raises UploadTooLarge past max_bytes.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        digest = hashlib.sha256()
+        size = 0
+        pending = bytearray()
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.config.max_bytes:
+                        raise UploadTooLarge(f"Upload exceeds {self.config.max_bytes} bytes")
+                    pending += chunk
+                    while len(pending) >= self.config.chunk_size:
+                        piece = bytes(pending[:self.config.chunk_size])
+                        del pending[:self.config.chunk_size]
+                        digest.update(piece)
+                        await asyncio.to_thread(f.write, piece)
+                if pending:
+                    digest.update(pending)
+                    await asyncio.to_thread(f.write, bytes(pending))
+                await asyncio.to_thread(os.fsync, f.fileno())
+            hexdigest = digest.hexdigest()
+            target = self.path_for(hexdigest)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if target.exists():
+                os.unlink(tmp_path)
+            else:
+                os.replace(tmp_path, target)
+            return hexdigest, size
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def iter_range(self, digest, start, end):
+        """Yield bytes start..end (inclusive) from a memory map, chunk_size at a time."""
+        with open(self.path_for(digest), "rb") as f:
+            if end < start:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                position = start
+                while position <= end:
+                    stop = min(end + 1, position + self.config.chunk_size)
+                    yield mapped[position:stop]
+                    position = stop
+
+
+_store = None
+
+
+def get_audio_store():
+    global _store
+    if _store is None:
+        _store = AudioStore()
+    return _store
@@ -0,0 +1,133 @@
+"""
+Cached Lookups
+Read-through cached access to patients, calls and latest transcripts, plus
+the invalidation hooks every write path calls after it commits.
+"""
+import asyncio
+
+from backend.cache.store import get_cache, is_missing
+from backend.crm.postgres.calls import fetch_calls
+from backend.crm.postgres.patients import get_patient, get_patient_by_phone, normalize_phone
+from backend.crm.postgres.pool import connection, get_async_pool
+
+
+def patient_key(patient_id):
+    return f"patient:{patient_id}"
+
+
+def patient_phone_key(phone):
+    return f"patient:phone:{normalize_phone(phone)}"
+
+
+def call_key(call_id):
+    return f"call:{call_id}"
+
+
+def latest_transcript_key(call_id):
+    return f"transcript:latest:{call_id}"
+
+
+# ----------- Reads -----------
+
+def _load(fn, *args):
+    with connection() as conn:
+        return fn(conn, *args)
+
+
+def cached_patient(patient_id):
+    return get_cache().get_or_load(patient_key(patient_id), lambda: _load(get_patient, patient_id))
+
+
+def cached_patient_by_phone(phone):
+    return get_cache().get_or_load(patient_phone_key(phone), lambda: _load(get_patient_by_phone, phone))
+
+
+def cached_call(call_id):
+    return get_cache().get_or_load(call_key(call_id), lambda: _load(fetch_calls, [call_id]).get(call_id))
+
+
+def _split_cached(cache, call_ids):
+    found, misses = {}, []
+    for call_id in call_ids:
+        row = cache.get(call_key(call_id))
+        if is_missing(row):
+            misses.append(call_id)
+        else:
+            found[call_id] = row
+    return found, misses
+
+
+def _store_calls(cache, rows):
+    for call_id, row in rows.items():
+        cache.set(call_key(call_id), row)
+
+
+def cached_calls(call_ids):
+    """
+    Cached calls for many ids: hits come from the cache and all misses are
+    fetched with a single fetch_calls query. Returns {call_id: row}.
+    """
+    cache = get_cache()
+    found, misses = _split_cached(cache, call_ids)
+    if misses:
+        fetched = _load(fetch_calls, misses)
+        _store_calls(cache, fetched)
+        found.update(fetched)
+    return found
+
+
+async def cached_calls_async(call_ids):
+    """cached_calls for the event loop; a shared (network) backend is consulted off-loop."""
+    cache = get_cache()
+    if cache.shared is not None:
+        return await asyncio.to_thread(cached_calls, call_ids)
+    found, misses = _split_cached(cache, call_ids)
+    if misses:
+        fetched = await get_async_pool().run(fetch_calls, misses)
+        _store_calls(cache, fetched)
+        found.update(fetched)
+    return found
+
+
+async def cached_latest_transcript(call_id, repository):
+    """Latest transcript for a call via the async repository, cached."""
+    cache = get_cache()
+    key = latest_transcript_key(call_id)
+    if cache.shared is not None:
+        doc = await asyncio.to_thread(cache.get, key)
+    else:
+        doc = cache.get(key)
+    if not is_missing(doc):
+        return doc
+    doc = await repository.latest_for_call(call_id)
+    if doc is not None:
+        if cache.shared is not None:
+            await asyncio.to_thread(cache.set, key, doc)
+        else:
+            cache.set(key, doc)
+    return doc
+
+
+# ----------- Invalidation -----------
+
+def invalidate_patient(patient_id=None, phone=None):
+    keys = []
+    if patient_id is not None:
+        keys.append(patient_key(patient_id))
+    if phone:
+        try:
+            keys.append(patient_phone_key(phone))
+        except ValueError:
+            pass
+    if keys:
+        get_cache().invalidate(*keys)
+
+
+def invalidate_calls(*call_ids):
+    if call_ids:
+        get_cache().invalidate(*(call_key(call_id) for call_id in call_ids))
+
+
+def invalidate_transcripts(*call_ids):
+    if call_ids:
+        get_cache().invalidate(*(latest_transcript_key(call_id) for call_id in call_ids))
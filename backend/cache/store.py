@@ -0,0 +1,233 @@
+"""
+Cache Store
+Bounded in-process LRU cache with TTL, optionally backed by a shared cache
+so several processes (API workers, CLIs) see each other's entries and
+invalidations.
+
+An invalidation only reaches the local tier of the process that made it, so
+with a shared backend the local tier is skipped by default and every read
+goes to the shared cache. CACHE_LOCAL_TTL_SECONDS keeps shared values locally
+for that long, trading up to that much staleness after another process's
+write for fewer round trips.
+
+Configuration (environment):
+    CACHE_MAX_ENTRIES         local LRU capacity (default 10000)
+    CACHE_TTL_SECONDS         entry lifetime (default 300)
+    CACHE_LOCAL_TTL_SECONDS   local lifetime of shared-backend values (default 0 = no
+                              local tier); ignored without a shared backend
+    CACHE_BACKEND         "local" (default), "memory" (in-process shared
+                          stand-in, for tests) or "redis"
+    CACHE_REDIS_URL       default redis://localhost:6379/0
+"""
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU with per-entry expiry; safe to use from worker threads and the event loop."""
+
+    def __init__(self, max_entries=10000, ttl=300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class InMemorySharedBackend:
+    """Local stand-in for a shared cache (same interface as RedisBackend)."""
+
+    def __init__(self):
+        self._cache = LRUCache(max_entries=1_000_000)
+
+    def get(self, key):
+        return self._cache.get(key, _MISSING)
+
+    def set(self, key, value, ttl):
+        self._cache.set(key, value, ttl)
+
+    def delete(self, *keys):
+        self._cache.delete(*keys)
+
+
+class RedisBackend:
+    def __init__(self, url):
+        import redis  # optional dependency, only needed for CACHE_BACKEND=redis
+
+        self._redis = redis.Redis.from_url(url)
+
+    def get(self, key):
+        raw = self._redis.get(key)
+        return _MISSING if raw is None else pickle.loads(raw)
+
+    def set(self, key, value, ttl):
+        self._redis.set(key, pickle.dumps(value), ex=max(1, int(ttl)))
+
+    def delete(self, *keys):
+        if keys:
+            self._redis.delete(*keys)
+
+
+class TieredCache:
+    """
+    Local LRU in front of an optional shared backend. With a shared backend,
+    values are kept locally for local_ttl seconds only (default 0: not at
+    all), so other processes' invalidations take effect within local_ttl.
+    Shared-backend errors count as misses.
+    """
+
+    def __init__(self, local, shared=None, local_ttl=0.0):
+        self.local = local
+        self.shared = shared
+        self.local_ttl = local.ttl if shared is None else local_ttl
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.shared_errors = 0
+
+    def get(self, key):
+        if self.local_ttl:
+            value = self.local.get(key, _MISSING)
+            if value is not _MISSING or self.shared is None:
+                return value
+        try:
+            value = self.shared.get(key)
+        except Exception:
+            self.shared_errors += 1
+            return _MISSING
+        if value is _MISSING:
+            self.shared_misses += 1
+            return value
+        self.shared_hits += 1
+        if self.local_ttl:
+            self.local.set(key, value, self.local_ttl)
+        return value
+
+    def set(self, key, value):
+        if self.local_ttl:
+            self.local.set(key, value, self.local_ttl)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value, self.local.ttl)
+            except Exception:
+                self.shared_errors += 1
+
+    def get_or_load(self, key, loader):
+        """Return the cached value or call loader(); None results are not cached."""
+        value = self.get(key)
+        if value is not _MISSING:
+            return value
+        value = loader()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def invalidate(self, *keys):
+        self.local.delete(*keys)
+        if self.shared is not None:
+            try:
+                self.shared.delete(*keys)
+            except Exception:
+                self.shared_errors += 1
+
+    def stats(self):
+        stats = self.local.stats()
+        stats["shared_backend"] = type(self.shared).__name__ if self.shared is not None else None
+        stats["local_ttl"] = self.local_ttl
+        stats["shared_hits"] = self.shared_hits
+        stats["shared_misses"] = self.shared_misses
+        stats["shared_errors"] = self.shared_errors
+        return stats
+
+
+def is_missing(value):
+    return value is _MISSING
+
+
+def build_cache_from_env():
+    env = os.environ
+    local = LRUCache(
+        max_entries=int(env.get("CACHE_MAX_ENTRIES", 10000)),
+        ttl=float(env.get("CACHE_TTL_SECONDS", 300)),
+    )
+    backend = env.get("CACHE_BACKEND", "local")
+    if backend == "redis":
+        shared = RedisBackend(env.get("CACHE_REDIS_URL", "redis://localhost:6379/0"))
+    elif backend == "memory":
+        shared = InMemorySharedBackend()
+    else:
+        shared = None
+    return TieredCache(local, shared, local_ttl=float(env.get("CACHE_LOCAL_TTL_SECONDS", 0)))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = build_cache_from_env()
+    return _cache
+
+
+def set_cache(cache):
+    """Swap the process-wide cache (e.g. a TieredCache over a stand-in backend in tests)."""
+    global _cache
+    _cache = cache
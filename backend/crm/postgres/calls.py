@@ -0,0 +1,358 @@
+"""
+CRM Call Queries
+Set-based operations on the calls table.
+"""
+import base64
+import io
+import json
+from datetime import datetime
+
+from psycopg2 import errors as pg_errors
+
+from backend.crm.postgres.pool import get_async_pool, get_pool
+
+DEFAULT_BATCH_SIZE = 1000
+CALL_STATUS_MAX_LENGTH = 20  # calls.call_status is VARCHAR(20)
+
+
+class BulkInsertResult:
+    """call_ids is aligned with the input: failed rows hold None and appear in errors."""
+
+    def __init__(self):
+        self.call_ids = []
+        self.errors = []
+
+    @property
+    def inserted(self):
+        return len(self.call_ids) - len(self.errors)
+
+    def merge(self, other, offset):
+        self.call_ids.extend(other.call_ids)
+        for error in other.errors:
+            self.errors.append(dict(error, index=error["index"] + offset))
+
+    def to_dict(self):
+        return {"inserted": self.inserted, "failed": len(self.errors),
+                "call_ids": self.call_ids, "errors": self.errors}
+
+
+def normalize_call_row(row):
+    """Accept a (patient_id, audio_file_url, call_status) tuple or a dict with those keys."""
+    if isinstance(row, dict):
+        patient_id = row.get("patient_id")
+        audio_file_url = row.get("audio_file_url")
+        call_status = row.get("call_status")
+    else:
+        patient_id, audio_file_url, call_status = (tuple(row) + (None, None, None))[:3]
+    if patient_id is not None:
+        patient_id = int(patient_id)
+    call_status = call_status or "pending"
+    if not isinstance(call_status, str):
+        raise ValueError(f"call_status must be a string, got {type(call_status).__name__}")
+    if len(call_status) > CALL_STATUS_MAX_LENGTH:
+        raise ValueError(f"call_status longer than {CALL_STATUS_MAX_LENGTH} characters")
+    return patient_id, audio_file_url, call_status
+
+
+def iter_ndjson(lines):
+    """
+    Parse an NDJSON stream (str or bytes lines). Blank lines are skipped;
+    malformed lines yield a ValueError in place of the row so the caller can
+    report them without losing the row's position.
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"invalid JSON: {e}")
+
+
+async def aiter_ndjson(chunks):
+    """iter_ndjson for an async stream of byte chunks (e.g. Request.stream())."""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for row in iter_ndjson(lines):
+            yield row
+    for row in iter_ndjson([pending]):
+        yield row
+
+
+def _csv_field(value):
+    if value is None:
+        return ""  # unquoted empty field is NULL in COPY csv format
+    if isinstance(value, int):
+        return str(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _copy_calls(cursor, rows):
+    buf = io.StringIO()
+    for row in rows:
+        buf.write(",".join(_csv_field(v) for v in row))
+        buf.write("\n")
+    buf.seek(0)
+    cursor.copy_expert(
+        "COPY calls (call_id, patient_id, audio_file_url, call_status) FROM STDIN WITH (FORMAT csv)",
+        buf
+    )
+
+
+def _insert_batch(conn, batch):
+    """
+    Load one batch in the caller's transaction.
+    Call ids are drawn from the calls sequence up front so each input row
+    knows its id before COPY runs (COPY cannot return ids). Rows pointing at
+    missing patients are filtered out beforehand and reported individually;
+    if COPY still rejects the batch, rows are retried one by one so only the
+    offending rows fail.
+    Per-row call_events notifications are switched off for the transaction.
+    """
+    result = BulkInsertResult()
+    parsed = []
+    for index, row in enumerate(batch):
+        try:
+            if isinstance(row, Exception):
+                raise row
+            parsed.append((index, normalize_call_row(row)))
+        except (TypeError, ValueError) as e:
+            result.errors.append({"index": index, "patient_id": None, "error": str(e)})
+
+    cursor = conn.cursor()
+    patient_ids = list({values[0] for _, values in parsed if values[0] is not None})
+    known = set()
+    if patient_ids:
+        cursor.execute("SELECT patient_id FROM patients WHERE patient_id = ANY(%s);", (patient_ids,))
+        known = {r[0] for r in cursor.fetchall()}
+
+    valid = []
+    for index, values in parsed:
+        if values[0] is not None and values[0] not in known:
+            result.errors.append({"index": index, "patient_id": values[0],
+                                  "error": f"patient {values[0]} does not exist"})
+        else:
+            valid.append((index, values))
+
+    call_ids = [None] * len(batch)
+    if valid:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence('calls', 'call_id')) FROM generate_series(1, %s);",
+            (len(valid),)
+        )
+        ids = [r[0] for r in cursor.fetchall()]
+        cursor.execute("SET LOCAL calls.notify = 'off';")
+        cursor.execute("SAVEPOINT bulk_calls;")
+        try:
+            _copy_calls(cursor, [(call_id,) + values for call_id, (_, values) in zip(ids, valid)])
+        except (pg_errors.DataError, pg_errors.IntegrityError):
+            # A patient vanished between the check and the COPY, or a value the
+            # checks above did not catch was rejected: isolate rows one by one.
+            cursor.execute("ROLLBACK TO SAVEPOINT bulk_calls;")
+            ids = _insert_rows_individually(cursor, valid, result)
+        cursor.execute("RELEASE SAVEPOINT bulk_calls;")
+        for call_id, (index, _) in zip(ids, valid):
+            call_ids[index] = call_id
+    cursor.close()
+
+    result.call_ids = call_ids
+    result.errors.sort(key=lambda e: e["index"])
+    return result
+
+
+def _insert_rows_individually(cursor, valid, result):
+    ids = []
+    for index, values in valid:
+        cursor.execute("SAVEPOINT bulk_call_row;")
+        try:
+            cursor.execute(
+                "INSERT INTO calls (patient_id, audio_file_url, call_status) VALUES (%s, %s, %s) RETURNING call_id;",
+                values
+            )
+            ids.append(cursor.fetchone()[0])
+            cursor.execute("RELEASE SAVEPOINT bulk_call_row;")
+        except (pg_errors.DataError, pg_errors.IntegrityError) as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT bulk_call_row;")
+            ids.append(None)
+            if isinstance(e, pg_errors.ForeignKeyViolation):
+                error = f"patient {values[0]} does not exist"
+            else:
+                error = e.diag.message_primary or str(e).strip()
+            result.errors.append({"index": index, "patient_id": values[0], "error": error})
+    return ids
+
+
+def _batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bulk_insert_calls(rows, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Insert many calls via COPY, one transaction per batch.
+    rows: iterable of (patient_id, audio_file_url, call_status) tuples or dicts
+    (e.g. iter_ndjson(file)). Returns a BulkInsertResult whose call_ids follow
+    input order; rows with unknown patients are reported, not fatal.
+    """
+    result = BulkInsertResult()
+    pool = get_pool()
+    for batch in _batches(rows, batch_size):
+        with pool.connection() as conn:
+            result.merge(_insert_batch(conn, batch), offset=len(result.call_ids))
+    return result
+
+
+async def bulk_insert_calls_async(rows, batch_size=DEFAULT_BATCH_SIZE, async_pool=None):
+    """
+    Async counterpart of bulk_insert_calls; rows may be an async iterable so
+    request bodies can be streamed batch by batch.
+    """
+    async_pool = async_pool or get_async_pool()
+    result = BulkInsertResult()
+    batch = []
+
+    async def flush():
+        part = await async_pool.run(_insert_batch, list(batch))
+        result.merge(part, offset=len(result.call_ids))
+        batch.clear()
+
+    if hasattr(rows, "__aiter__"):
+        async for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                await flush()
+    else:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                await flush()
+    if batch:
+        await flush()
+    return result
+
+
+CALL_COLUMNS = ("call_id", "patient_id", "phone_number", "audio_file_url", "call_status", "created_at")
+
+
+def fetch_calls(conn, call_ids):
+    """Fetch calls with their patient's phone number in one query, keyed by call_id."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT c.call_id, c.patient_id, p.phone_number, c.audio_file_url, c.call_status, c.created_at "
+        "FROM calls c LEFT JOIN patients p ON p.patient_id = c.patient_id "
+        "WHERE c.call_id = ANY(%s);",
+        (list(call_ids),)
+    )
+    rows = {row[0]: dict(zip(CALL_COLUMNS, row)) for row in cursor.fetchall()}
+    cursor.close()
+    return rows
+
+
+def latest_call_status(conn, patient_id):
+    """call_status of the patient's most recent call (hot / non-hot), or None."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT call_status FROM calls WHERE patient_id = %s ORDER BY created_at DESC LIMIT 1;",
+        (patient_id,)
+    )
+    row = cursor.fetchone()
+    cursor.close()
+    return row[0] if row else None
+
+
+def set_call_audio_url(conn, call_id, audio_file_url):
+    """Point a call at its recording; raises LookupError if the call does not exist."""
+    cursor = conn.cursor()
+    cursor.execute("UPDATE calls SET audio_file_url = %s WHERE call_id = %s;", (audio_file_url, call_id))
+    updated = cursor.rowcount
+    cursor.close()
+    if not updated:
+        raise LookupError(f"No call found with call_id={call_id}")
+
+
+def encode_call_cursor(created_at, call_id):
+    raw = f"{created_at.isoformat()}|{call_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_call_cursor(cursor_token):
+    """Inverse of encode_call_cursor; raises ValueError on a malformed token."""
+    try:
+        padded = cursor_token + "=" * (-len(cursor_token) % 4)
+        created_at, call_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), int(call_id)
+    except Exception:
+        raise ValueError("invalid cursor") from None
+
+
+def _call_filters(call_status=None, created_from=None, created_to=None):
+    clauses, params = [], []
+    if call_status is not None:
+        clauses.append("c.call_status = %s")
+        params.append(call_status)
+    if created_from is not None:
+        clauses.append("c.created_at >= %s")
+        params.append(created_from)
+    if created_to is not None:
+        clauses.append("c.created_at < %s")
+        params.append(created_to)
+    return clauses, params
+
+
+def list_calls_page(conn, limit=50, cursor_token=None, call_status=None, created_from=None, created_to=None):
+    """
+    One page of calls, newest first, using keyset pagination on
+    (created_at, call_id) so deep pages cost the same as the first one.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    clauses, params = _call_filters(call_status, created_from, created_to)
+    if cursor_token:
+        clauses.append("(c.created_at, c.call_id) < (%s, %s)")
+        params.extend(decode_call_cursor(cursor_token))
+    where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT c.call_id, c.patient_id, p.phone_number, c.audio_file_url, c.call_status, c.created_at "
+        "FROM calls c LEFT JOIN patients p ON p.patient_id = c.patient_id "
+        f"{where}ORDER BY c.created_at DESC, c.call_id DESC LIMIT %s;",
+        params + [limit + 1]
+    )
+    rows = [dict(zip(CALL_COLUMNS, row)) for row in cursor.fetchall()]
+    cursor.close()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, encode_call_cursor(last["created_at"], last["call_id"])
+    return rows, None
+
+
+def iter_calls(conn, call_status=None, created_from=None, created_to=None, batch_size=2000):
+    """
+    Stream matching calls (oldest first) through a server-side named cursor.
+    Must be consumed inside the connection's transaction.
+    """
+    clauses, params = _call_filters(call_status, created_from, created_to)
+    where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+    cursor = conn.cursor(name="iter_calls")
+    cursor.itersize = batch_size
+    try:
+        cursor.execute(
+            "SELECT c.call_id, c.patient_id, c.audio_file_url, c.call_status, c.created_at "
+            f"FROM calls c {where}ORDER BY c.created_at, c.call_id;",
+            params
+        )
+        for row in cursor:
+            yield row
+    finally:
+        cursor.close()
@@ -1,9 +1,12 @@
-import psycopg2
+from backend.crm.postgres.pool import get_pool
+
 
 def get_connection():
-    return psycopg2.connect(
-        host="localhost",
-        database="crm_db",
-        user="postgres",
-        password="your_password"
-    )
+    """
+    Borrow a crm_db connection from the shared pool.
+    Use as a context manager; the connection is returned to the pool on exit:
+
+        with get_connection() as conn:
+            ...
+    """
+    return get_pool().connection()
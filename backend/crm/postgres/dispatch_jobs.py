@@ -0,0 +1,78 @@
+"""
+Dispatch Job Queries
+Persistence for the call dispatcher's jobs (postgres migration 0009).
+
+Every function takes an open connection, so they run through
+AsyncCRMPool.run like the other CRM queries.
+"""
+import json
+
+INTERRUPTED = "interrupted by a restart while calling"
+
+_COLUMNS = (
+    "call_id, payload, priority, status, attempts, result, error, "
+    "EXTRACT(EPOCH FROM created_at)::FLOAT, EXTRACT(EPOCH FROM updated_at)::FLOAT"
+)
+
+
+def _row_to_dict(row):
+    call_id, payload, priority, status, attempts, result, error, created_at, updated_at = row
+    return {
+        "call_id": call_id, "payload": payload, "priority": priority, "status": status,
+        "attempts": attempts, "result": result, "error": error,
+        "created_at": created_at, "updated_at": updated_at,
+    }
+
+
+def insert_dispatch_job(conn, call_id, payload, priority, status, created_at):
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT INTO dispatch_jobs (call_id, payload, priority, status, created_at, updated_at) "
+        "VALUES (%s, %s::JSONB, %s, %s, to_timestamp(%s), to_timestamp(%s));",
+        (call_id, json.dumps(payload), priority, status, created_at, created_at)
+    )
+    cursor.close()
+
+
+def update_dispatch_job(conn, call_id, status, attempts, result, error, updated_at):
+    cursor = conn.cursor()
+    cursor.execute(
+        "UPDATE dispatch_jobs SET status = %s, attempts = %s, result = %s::JSONB, error = %s, "
+        "updated_at = to_timestamp(%s) WHERE call_id = %s;",
+        (status, attempts, None if result is None else json.dumps(result, default=str), error, updated_at, call_id)
+    )
+    cursor.close()
+
+
+def delete_dispatch_job(conn, call_id):
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM dispatch_jobs WHERE call_id = %s;", (call_id,))
+    cursor.close()
+
+
+def get_dispatch_job(conn, call_id):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {_COLUMNS} FROM dispatch_jobs WHERE call_id = %s;", (call_id,))
+    row = cursor.fetchone()
+    cursor.close()
+    return None if row is None else _row_to_dict(row)
+
+
+def recover_dispatch_jobs(conn):
+    """
+    Jobs to re-queue after a restart: every queued or retrying one, oldest
+    first. Jobs that were running are failed instead - the bot may already
+    have placed the call, and dialling a patient twice is worse than once.
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        "UPDATE dispatch_jobs SET status = 'failed', error = %s, updated_at = CURRENT_TIMESTAMP "
+        "WHERE status = 'running';",
+        (INTERRUPTED,)
+    )
+    cursor.execute(
+        f"SELECT {_COLUMNS} FROM dispatch_jobs WHERE status IN ('queued', 'retrying') ORDER BY created_at;"
+    )
+    rows = [_row_to_dict(row) for row in cursor.fetchall()]
+    cursor.close()
+    return rows
@@ -0,0 +1,161 @@
+"""
+Call Event Notifications
+One shared LISTEN connection fanning call_events notifications (postgres
+migration 0007) out to any number of in-process subscribers.
+
+The listener owns a dedicated autocommit connection outside the pool; the
+event loop watches its socket (loop.add_reader), so no thread or poll query
+is needed. Each subscriber gets a bounded asyncio.Queue; routing is a dict
+lookup by call_id / patient_id, so the cost per notification does not grow
+with the number of unrelated subscribers. A subscriber that falls behind
+loses its oldest events rather than slowing everyone else down.
+
+Configuration (environment):
+    CALL_EVENTS_QUEUE_SIZE    events buffered per subscriber (default 100)
+"""
+import asyncio
+import json
+import os
+from collections import defaultdict
+
+import psycopg2
+from psycopg2 import extensions
+
+from backend.crm.postgres.pool import PoolConfig
+
+CHANNEL = "call_events"
+RECONNECT_MAX_SECONDS = 30
+
+
+class Subscription:
+    def __init__(self, listener, call_id=None, patient_id=None, maxsize=100):
+        self.listener = listener
+        self.call_id = call_id
+        self.patient_id = patient_id
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def deliver(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout=None):
+        """Next event, or None after timeout seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.listener.unsubscribe(self)
+
+
+class CallEventListener:
+    def __init__(self, dsn=None, channel=CHANNEL, queue_size=None):
+        self.dsn = dsn or PoolConfig.from_env().dsn
+        self.channel = channel
+        self.queue_size = queue_size or int(os.environ.get("CALL_EVENTS_QUEUE_SIZE", 100))
+        self._by_call = defaultdict(set)
+        self._by_patient = defaultdict(set)
+        self._all = set()
+        self._conn = None
+        self._task = None
+        self._broken = None
+        self.stats = {"notifications": 0, "deliveries": 0, "reconnects": 0}
+
+    def subscribe(self, call_id=None, patient_id=None):
+        """Subscribe to events, optionally filtered by call_id and/or patient_id."""
+        subscription = Subscription(self, call_id, patient_id, self.queue_size)
+        if call_id is not None:
+            self._by_call[call_id].add(subscription)
+        elif patient_id is not None:
+            self._by_patient[patient_id].add(subscription)
+        else:
+            self._all.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        for index, key in ((self._by_call, subscription.call_id), (self._by_patient, subscription.patient_id)):
+            if key is not None and subscription in index.get(key, ()):
+                index[key].discard(subscription)
+                if not index[key]:
+                    del index[key]
+        self._all.discard(subscription)
+
+    @property
+    def subscriber_count(self):
+        return len(self._all) + sum(map(len, self._by_call.values())) + sum(map(len, self._by_patient.values()))
+
+    def dispatch(self, event):
+        """Route one decoded event to every matching subscriber."""
+        self.stats["notifications"] += 1
+        targets = set(self._all)
+        targets.update(self._by_call.get(event.get("call_id"), ()))
+        targets.update(self._by_patient.get(event.get("patient_id"), ()))
+        for subscription in targets:
+            # A call_id subscription with a patient filter too must match both.
+            if subscription.patient_id is not None and subscription.patient_id != event.get("patient_id"):
+                continue
+            subscription.deliver(event)
+            self.stats["deliveries"] += 1
+
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn)
+        conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        cursor = conn.cursor()
+        cursor.execute(f"LISTEN {self.channel};")
+        cursor.close()
+        return conn
+
+    def _on_readable(self):
+        try:
+            self._conn.poll()
+        except psycopg2.Error as e:
+            if not self._broken.done():
+                self._broken.set_result(e)
+            return
+        while self._conn.notifies:
+            notify = self._conn.notifies.pop(0)
+            try:
+                event = json.loads(notify.payload)
+            except ValueError:
+                continue
+            self.dispatch(event)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        delay = 1
+        while True:
+            try:
+                self._conn = await asyncio.to_thread(self._connect)
+            except psycopg2.Error as e:
+                print(f"Call event listener could not connect: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+                continue
+            delay = 1
+            self._broken = loop.create_future()
+            loop.add_reader(self._conn.fileno(), self._on_readable)
+            try:
+                error = await self._broken
+                print(f"Call event listener lost its connection: {error}")
+            finally:
+                loop.remove_reader(self._conn.fileno())
+                self._conn.close()
+                self._conn = None
+            self.stats["reconnects"] += 1
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,280 @@
+"""
+Calls Partition Maintenance
+Keeps monthly partitions of the calls table ahead of time and archives old ones.
+
+    ensure   create partitions for the current month and the next N months, plus
+             any later month with rows stranded in calls_default, moving
+             those rows into their new partition
+    list     show partitions with their ranges and row estimates
+    archive  export partitions older than the retention window to gzip-compressed
+             CSV on local disk, then detach and drop each one
+
+Archiving never holds a lock on calls while exporting: each partition is
+copied out from a read-only snapshot while still attached, then detached and
+dropped in its own short transaction, and the file only gets its final name
+once that transaction has committed. DETACH ... CONCURRENTLY is not an option
+because calls has a default partition, so the detach instead gives up after
+CALLS_ARCHIVE_LOCK_TIMEOUT_MS rather than queueing traffic behind it.
+
+Usage:
+    python -m backend.crm.postgres.partitions ensure [--months-ahead 3]
+    python -m backend.crm.postgres.partitions list
+    python -m backend.crm.postgres.partitions archive --retention-months 12 [--out-dir archive/calls]
+
+Configuration (environment):
+    CALLS_ARCHIVE_DIR               default --out-dir (default archive/calls)
+    CALLS_ARCHIVE_LOCK_TIMEOUT_MS   lock wait for each detach/drop (default 5000)
+"""
+import argparse
+import gzip
+import os
+import re
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+from backend.crm.postgres.pool import connection
+
+DEFAULT_MONTHS_AHEAD = 3
+DEFAULT_ARCHIVE_DIR = os.environ.get("CALLS_ARCHIVE_DIR", "archive/calls")
+ARCHIVE_LOCK_TIMEOUT_MS = int(os.environ.get("CALLS_ARCHIVE_LOCK_TIMEOUT_MS", "5000"))
+
+_BOUNDS = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def add_months(day, months):
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def is_partitioned(conn):
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = 'calls' AND c.relnamespace = 'public'::regnamespace;"
+    )
+    result = cursor.fetchone() is not None
+    cursor.close()
+    return result
+
+
+def list_partitions(conn):
+    """Return [(name, range_start, range_end, estimated_rows)] ordered by range; the default partition has no range."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::BIGINT "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'public.calls'::regclass;"
+    )
+    partitions = []
+    for name, bound, rows in cursor.fetchall():
+        match = _BOUNDS.search(bound)
+        if match:
+            start, end = (datetime.fromisoformat(value).date() for value in match.groups())
+        else:
+            start = end = None
+        partitions.append((name, start, end, max(rows, 0)))
+    cursor.close()
+    partitions.sort(key=lambda p: (p[1] is None, p[1] or date.min))
+    return partitions
+
+
+def default_partition(partitions):
+    return next((name for name, start, _, _ in partitions if start is None), None)
+
+
+def stranded_months(conn, default):
+    """First day of every month that has rows in the default partition."""
+    cursor = conn.cursor()
+    cursor.execute(f'SELECT DISTINCT date_trunc(\'month\', created_at)::DATE FROM "{default}" ORDER BY 1;')
+    months = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    return months
+
+
+def create_partition(conn, month, default=None):
+    """
+    Create the partition for month. PostgreSQL refuses while the default
+    partition holds rows of that month, so those rows are moved out to a
+    temporary table first and into the new partition afterwards, all in
+    conn's transaction. Returns the number of rows moved.
+    """
+    cursor = conn.cursor()
+    moved = 0
+    if default is not None:
+        start, end = month, add_months(month, 1)
+        holding = f"calls_moving_{month:%Y_%m}"
+        cursor.execute(f'CREATE TEMP TABLE "{holding}" (LIKE calls) ON COMMIT DROP;')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{default}" WHERE created_at >= %s AND created_at < %s RETURNING *) '
+            f'INSERT INTO "{holding}" SELECT * FROM moved;',
+            (start, end)
+        )
+        moved = cursor.rowcount
+    cursor.execute("SELECT create_calls_partition(%s);", (month,))
+    name = cursor.fetchone()[0]
+    if moved:
+        # Straight into the partition: the calls-level rollup triggers do not
+        # fire (the counts already include these rows), and no call event is
+        # published for rows that are not new.
+        cursor.execute("SET LOCAL calls.notify = 'off';")
+        cursor.execute(f'INSERT INTO "{name}" SELECT * FROM "{holding}";')
+        cursor.execute("SET LOCAL calls.notify = 'on';")
+    cursor.close()
+    return moved
+
+
+def ensure_partitions(conn, months_ahead=DEFAULT_MONTHS_AHEAD, today=None):
+    """
+    Create any missing monthly partitions up to months_ahead, and for later
+    months that already have rows in the default partition (inserted while
+    maintenance lagged, or with a far-future created_at). Rows older than
+    the oldest monthly partition are left where they are; see
+    stranded_rows(). No-op if calls is not partitioned.
+    """
+    if not is_partitioned(conn):
+        return []
+    this_month = (today or date.today()).replace(day=1)
+    partitions = list_partitions(conn)
+    existing = {p[0] for p in partitions}
+    default = default_partition(partitions)
+    months = {add_months(this_month, offset) for offset in range(months_ahead + 1)}
+    if default is not None:
+        oldest = min((start for _, start, _, _ in partitions if start is not None), default=this_month)
+        months.update(month for month in stranded_months(conn, default) if month >= oldest)
+    created = []
+    for month in sorted(months):
+        name = f"calls_{month:%Y_%m}"
+        if name not in existing:
+            create_partition(conn, month, default)
+            created.append(name)
+    return created
+
+
+def stranded_rows(conn):
+    """Rows still in the default partition (older than every monthly partition)."""
+    default = default_partition(list_partitions(conn))
+    if default is None:
+        return 0
+    cursor = conn.cursor()
+    cursor.execute(f'SELECT count(*) FROM "{default}";')
+    count = cursor.fetchone()[0]
+    cursor.close()
+    return count
+
+
+def expired_partitions(conn, retention_months, today=None):
+    """Names of monthly partitions whose range ends before the retention window."""
+    cutoff = add_months((today or date.today()).replace(day=1), -retention_months)
+    return [name for name, start, end, _ in list_partitions(conn) if end is not None and end <= cutoff]
+
+
+def partition_fingerprint(cursor, name):
+    """(row count, sum of row hashes): changes with (practically) any insert, update or delete."""
+    cursor.execute(f'SELECT count(*), COALESCE(sum(hashtext(t::TEXT)::BIGINT), 0) FROM "{name}" t;')
+    return tuple(cursor.fetchone())
+
+
+def export_partition(conn, name, path):
+    """
+    COPY one (still attached) partition to a gzip CSV from a read-only
+    snapshot. Must be the first statement of conn's transaction. Only takes
+    ACCESS SHARE locks, so calls stays fully available. Returns the
+    fingerprint of the exported rows, taken in the same snapshot.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY;")
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as out:
+        cursor.copy_expert(f'COPY "{name}" TO STDOUT WITH (FORMAT csv, HEADER true)', out)
+    fingerprint = partition_fingerprint(cursor, name)
+    cursor.close()
+    return fingerprint
+
+
+def detach_and_drop(conn, name, exported, lock_timeout_ms=ARCHIVE_LOCK_TIMEOUT_MS):
+    """
+    Detach and drop an exported partition in conn's (short) transaction.
+    Writes to the partition are blocked first and its fingerprint re-checked,
+    so rows inserted, updated or deleted after the export are never dropped
+    unarchived.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SET LOCAL lock_timeout = %s;", (f"{lock_timeout_ms}ms",))
+    cursor.execute(f'LOCK TABLE "{name}" IN SHARE MODE;')
+    if partition_fingerprint(cursor, name) != exported:
+        raise RuntimeError(f"{name} changed during export; re-run archive")
+    cursor.execute(f'ALTER TABLE calls DETACH PARTITION "{name}";')
+    cursor.execute(f'DROP TABLE "{name}";')
+    cursor.close()
+
+
+def archive_partitions(retention_months, out_dir=DEFAULT_ARCHIVE_DIR, today=None, connect=connection):
+    """
+    Archive every monthly partition whose range ends before the retention
+    window to <out_dir>/<partition>.csv.gz, one partition at a time: export
+    from a read-only snapshot, then detach and drop in a separate short
+    transaction, then rename the file into place. A failure at any step
+    leaves that partition attached and no file behind.
+    connect() yields a connection that commits on exit (pool.connection).
+    Returns [(name, path)].
+    """
+    with connect() as conn:
+        names = expired_partitions(conn, retention_months, today)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    archived = []
+    for name in names:
+        path = out_dir / f"{name}.csv.gz"
+        tmp_path = path.with_suffix(".gz.tmp")
+        try:
+            with connect() as conn:
+                fingerprint = export_partition(conn, name, tmp_path)
+            with connect() as conn:
+                detach_and_drop(conn, name, fingerprint)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, path)
+        archived.append((name, path))
+    return archived
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain monthly partitions of the calls table")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ensure = sub.add_parser("ensure")
+    ensure.add_argument("--months-ahead", type=int, default=DEFAULT_MONTHS_AHEAD)
+    sub.add_parser("list")
+    archive = sub.add_parser("archive")
+    archive.add_argument("--retention-months", type=int, required=True)
+    archive.add_argument("--out-dir", default=DEFAULT_ARCHIVE_DIR)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "archive":
+            archived = archive_partitions(args.retention_months, args.out_dir)
+            for name, path in archived:
+                print(f"[ARCHIVED] {name} -> {path}")
+            if not archived:
+                print("[INFO] Nothing older than the retention window.")
+            return 0
+        with connection() as conn:
+            if args.command == "ensure":
+                created = ensure_partitions(conn, args.months_ahead)
+                print(f"[SUCCESS] Created {len(created)} partition(s): {', '.join(created) or '-'}")
+                stranded = stranded_rows(conn)
+                if stranded:
+                    print(f"[WARNING] {stranded} row(s) in the default partition predate every monthly partition")
+            else:
+                print(f"{'Partition':<20} {'From':<12} {'To':<12} {'Rows (est.)'}")
+                print("-" * 60)
+                for name, start, end, rows in list_partitions(conn):
+                    print(f"{name:<20} {str(start or 'default'):<12} {str(end or ''):<12} {rows}")
+    except Exception as e:
+        print(f"[ERROR] Partition {args.command} failed: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
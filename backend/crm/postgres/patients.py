@@ -0,0 +1,147 @@
+"""
+CRM Patient Queries
+Phone normalization, lookup/upsert by phone, and keyset-paginated and
+streaming reads of the patients table.
+"""
+import os
+import re
+
+PATIENT_COLUMNS = ("patient_id", "phone_number", "created_at")
+STREAM_BATCH_SIZE = 2000
+DEFAULT_COUNTRY_CODE = os.environ.get("PHONE_DEFAULT_COUNTRY_CODE", "1")
+
+_FORMATTING = re.compile(r"[\s\-().\/]")
+
+
+def normalize_phone(phone, default_country_code=None):
+    """
+    Canonical E.164-style form: '+' followed by 8-15 digits.
+    Accepts '+CC...', '00CC...', national numbers with a leading trunk '0',
+    and bare 10-digit numbers (prefixed with PHONE_DEFAULT_COUNTRY_CODE).
+    Raises ValueError for anything that cannot be a phone number.
+    """
+    if phone is None:
+        raise ValueError("phone number is required")
+    cc = default_country_code or DEFAULT_COUNTRY_CODE
+    raw = _FORMATTING.sub("", str(phone))
+    if raw.startswith("+"):
+        digits = raw[1:]
+    elif raw.startswith("00"):
+        digits = raw[2:]
+    elif len(raw) == 11 and raw.startswith("0"):
+        digits = cc + raw[1:]
+    elif len(raw) == 10:
+        digits = cc + raw
+    else:
+        digits = raw
+    if not digits.isdigit() or not 8 <= len(digits) <= 15 or digits.startswith("0"):
+        raise ValueError(f"invalid phone number: {phone!r}")
+    return "+" + digits
+
+
+def get_or_create_patient(conn, phone):
+    """
+    Return (patient_id, created) for a phone number in one indexed round trip.
+    The no-op DO UPDATE makes RETURNING yield the existing row on conflict,
+    which stays correct under concurrent submissions for the same number.
+    """
+    normalized = normalize_phone(phone)
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT INTO patients (phone_number, phone_normalized) VALUES (%s, %s) "
+        "ON CONFLICT (phone_normalized) DO UPDATE SET phone_normalized = EXCLUDED.phone_normalized "
+        "RETURNING patient_id, (xmax = 0) AS created;",
+        (str(phone).strip(), normalized)
+    )
+    patient_id, created = cursor.fetchone()
+    cursor.close()
+    return patient_id, created
+
+
+def get_patient(conn, patient_id):
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT patient_id, phone_number, created_at FROM patients WHERE patient_id = %s;",
+        (patient_id,)
+    )
+    row = cursor.fetchone()
+    cursor.close()
+    return dict(zip(PATIENT_COLUMNS, row)) if row else None
+
+
+def get_patient_by_phone(conn, phone):
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT patient_id, phone_number, created_at FROM patients WHERE phone_normalized = %s;",
+        (normalize_phone(phone),)
+    )
+    row = cursor.fetchone()
+    cursor.close()
+    return dict(zip(PATIENT_COLUMNS, row)) if row else None
+
+
+def backfill_normalized_phones(conn, batch_size=STREAM_BATCH_SIZE):
+    """
+    Fill phone_normalized for rows that predate it. Rows whose number is
+    invalid or normalizes to a number another patient already owns are left
+    NULL and returned as (patient_id, phone_number, reason) for review.
+    """
+    skipped = []
+    read = conn.cursor(name="backfill_phones")
+    read.execute("SELECT patient_id, phone_number FROM patients WHERE phone_normalized IS NULL AND phone_number IS NOT NULL;")
+    write = conn.cursor()
+    while True:
+        rows = read.fetchmany(batch_size)
+        if not rows:
+            break
+        for patient_id, phone_number in rows:
+            try:
+                normalized = normalize_phone(phone_number)
+            except ValueError as e:
+                skipped.append((patient_id, phone_number, str(e)))
+                continue
+            write.execute(
+                "UPDATE patients SET phone_normalized = %s WHERE patient_id = %s "
+                "AND NOT EXISTS (SELECT 1 FROM patients WHERE phone_normalized = %s);",
+                (normalized, patient_id, normalized)
+            )
+            if write.rowcount == 0:
+                skipped.append((patient_id, phone_number, f"duplicate of an existing {normalized}"))
+    read.close()
+    write.close()
+    return skipped
+
+
+def list_patients_page(conn, limit=50, after_id=None):
+    """
+    One page of patients ordered by patient_id, starting after `after_id`.
+    Returns (rows, next_after_id); next_after_id is None on the last page.
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT patient_id, phone_number, created_at FROM patients "
+        "WHERE patient_id > %s ORDER BY patient_id LIMIT %s;",
+        (after_id if after_id is not None else 0, limit + 1)
+    )
+    rows = [dict(zip(PATIENT_COLUMNS, row)) for row in cursor.fetchall()]
+    cursor.close()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1]["patient_id"]
+    return rows, None
+
+
+def iter_patients(conn, batch_size=STREAM_BATCH_SIZE):
+    """
+    Stream every patient as (patient_id, phone_number, created_at) tuples
+    through a server-side named cursor, so memory stays constant regardless
+    of table size. Must be consumed inside the connection's transaction.
+    """
+    cursor = conn.cursor(name="iter_patients")
+    cursor.itersize = batch_size
+    try:
+        cursor.execute("SELECT patient_id, phone_number, created_at FROM patients ORDER BY patient_id;")
+        for row in cursor:
+            yield row
+    finally:
+        cursor.close()
@@ -0,0 +1,264 @@
+"""
+CRM Connection Pool
+Process-wide, bounded psycopg2 pool for crm_db shared by every CRM helper.
+
+The pool is configured once per process, from the environment by default:
+
+    CRM_DB_DSN                  full libpq DSN (overrides the CRM_DB_* parts below)
+    CRM_DB_HOST / CRM_DB_PORT   default localhost / 5432
+    CRM_DB_NAME                 default crm_db
+    CRM_DB_USER                 default postgres
+    CRM_DB_PASSWORD             default abcd
+    CRM_DB_POOL_MIN             connections opened up front (default 1)
+    CRM_DB_POOL_MAX             hard cap on open connections (default 10)
+    CRM_DB_POOL_TIMEOUT         seconds to wait for a free connection (default 30)
+    CRM_DB_CONNECT_TIMEOUT      seconds for the TCP/auth handshake (default 5)
+
+Usage:
+    from backend.crm.postgres.pool import connection
+
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1;")
+
+The block commits on success and rolls back on error; the connection always
+goes back to the pool. Async code uses get_async_pool() instead.
+"""
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2 import pool as pg_pool
+
+from backend.observability.metrics import track_query
+
+
+class PoolTimeout(pg_pool.PoolError):
+    """Raised when no connection frees up within the checkout timeout."""
+
+
+@dataclass
+class PoolConfig:
+    dsn: str
+    min_size: int = 1
+    max_size: int = 10
+    checkout_timeout: float = 30.0
+    connect_timeout: int = 5
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ
+        dsn = env.get("CRM_DB_DSN") or extensions.make_dsn(
+            host=env.get("CRM_DB_HOST", "localhost"),
+            port=env.get("CRM_DB_PORT", "5432"),
+            dbname=env.get("CRM_DB_NAME", "crm_db"),
+            user=env.get("CRM_DB_USER", "postgres"),
+            password=env.get("CRM_DB_PASSWORD", "abcd"),
+        )
+        return cls(
+            dsn=dsn,
+            min_size=int(env.get("CRM_DB_POOL_MIN", 1)),
+            max_size=int(env.get("CRM_DB_POOL_MAX", 10)),
+            checkout_timeout=float(env.get("CRM_DB_POOL_TIMEOUT", 30)),
+            connect_timeout=int(env.get("CRM_DB_CONNECT_TIMEOUT", 5)),
+        )
+
+
+def _rollback_quietly(conn):
+    if conn.closed:
+        return
+    try:
+        conn.rollback()
+    except psycopg2.Error:
+        pass
+
+
+class CRMPool:
+    """Bounded connection pool that blocks (up to a timeout) instead of failing when exhausted."""
+
+    def __init__(self, config):
+        if config.max_size < 1 or config.min_size > config.max_size:
+            raise ValueError("pool sizes must satisfy 0 <= min_size <= max_size, max_size >= 1")
+        self.config = config
+        self._pool = pg_pool.ThreadedConnectionPool(
+            config.min_size,
+            config.max_size,
+            config.dsn,
+            connect_timeout=config.connect_timeout,
+        )
+        self._slots = threading.BoundedSemaphore(config.max_size)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._checkout_total = 0.0
+        self._checkout_max = 0.0
+
+    def getconn(self):
+        """Borrow a connection; callers must hand it back with putconn()."""
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.config.checkout_timeout):
+            with self._lock:
+                self._timeouts += 1
+            raise PoolTimeout(
+                f"No CRM connection available after {self.config.checkout_timeout}s "
+                f"(max_size={self.config.max_size})"
+            )
+        waited = time.perf_counter() - started
+        try:
+            conn = self._pool.getconn()
+            if conn.closed:
+                # Server restarted or the socket died while the connection sat idle.
+                self._pool.putconn(conn, close=True)
+                conn = self._pool.getconn()
+        except BaseException:
+            self._slots.release()
+            raise
+        latency = time.perf_counter() - started
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            self._checkout_total += latency
+            self._checkout_max = max(self._checkout_max, latency)
+        return conn
+
+    def putconn(self, conn, close=False):
+        """Return a borrowed connection, discarding it if it is broken."""
+        try:
+            if not conn.closed and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                _rollback_quietly(conn)
+            close = close or bool(conn.closed)
+            self._pool.putconn(conn, close=close)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for one unit of work: commit on success, roll back on error."""
+        conn = self.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            _rollback_quietly(conn)
+            raise
+        finally:
+            self.putconn(conn)
+
+    def stats(self):
+        with self._lock:
+            checkouts = self._checkouts
+            return {
+                "max_size": self.config.max_size,
+                "in_use": self._in_use,
+                "available": self.config.max_size - self._in_use,
+                "checkouts": checkouts,
+                "timeouts": self._timeouts,
+                "wait_time_total_s": self._wait_total,
+                "wait_time_avg_s": self._wait_total / checkouts if checkouts else 0.0,
+                "wait_time_max_s": self._wait_max,
+                "checkout_latency_avg_s": self._checkout_total / checkouts if checkouts else 0.0,
+                "checkout_latency_max_s": self._checkout_max,
+            }
+
+    def close(self):
+        self._pool.closeall()
+
+
+class AsyncCRMPool:
+    """
+    asyncio front end for a CRMPool.
+    psycopg2 is blocking, so checkouts and queries run in worker threads and
+    the event loop never waits on a socket. Both variants share one set of
+    connections and one max_size budget.
+    """
+
+    def __init__(self, sync_pool):
+        self.sync_pool = sync_pool
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Run fn(conn, *args, **kwargs) in a worker thread inside one transaction,
+        timed under fn's name (see backend/observability/metrics.py).
+        """
+        def work():
+            with track_query("postgres", fn.__name__), self.sync_pool.connection() as conn:
+                return fn(conn, *args, **kwargs)
+        return await asyncio.to_thread(work)
+
+    @asynccontextmanager
+    async def connection(self):
+        conn = await asyncio.to_thread(self.sync_pool.getconn)
+        try:
+            yield conn
+            await asyncio.to_thread(conn.commit)
+        except BaseException:
+            await asyncio.to_thread(_rollback_quietly, conn)
+            raise
+        finally:
+            self.sync_pool.putconn(conn)
+
+    def stats(self):
+        return self.sync_pool.stats()
+
+
+_pool = None
+_async_pool = None
+_pool_lock = threading.Lock()
+
+
+def configure(config=None):
+    """Create the process-wide pool. May only be called once (until close_pool())."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            raise RuntimeError("CRM connection pool is already configured")
+        _pool = CRMPool(config or PoolConfig.from_env())
+        return _pool
+
+
+def get_pool():
+    """Return the process-wide pool, configuring it from the environment on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = CRMPool(PoolConfig.from_env())
+    return _pool
+
+
+def get_async_pool():
+    global _async_pool
+    sync_pool = get_pool()
+    if _async_pool is None or _async_pool.sync_pool is not sync_pool:
+        _async_pool = AsyncCRMPool(sync_pool)
+    return _async_pool
+
+
+def connection():
+    """Shortcut for get_pool().connection()."""
+    return get_pool().connection()
+
+
+def pool_stats():
+    return get_pool().stats() if _pool is not None else None
+
+
+def close_pool():
+    global _pool, _async_pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = None
+        _async_pool = None
@@ -11,3 +11,6 @@ CREATE TABLE calls (
     call_status VARCHAR(20), -- hot / non-hot
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+
+-- Indexes and later schema changes are applied by backend/migrations (postgres/*.sql):
+--   python -m backend.migrations.runner migrate
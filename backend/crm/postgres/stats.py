@@ -0,0 +1,35 @@
+"""
+CRM Call Statistics
+Reads the incrementally maintained call_status_counts rollup (see migration
+0006); cost is proportional to the number of buckets, not the number of calls.
+Counts for archived partitions are kept, so history survives archival.
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+GRANULARITIES = {"hour": timedelta(hours=24), "day": timedelta(days=30)}
+
+
+def call_status_counts(conn, granularity="hour", start=None, end=None):
+    """
+    Return [{"bucket_start", "counts": {status: n}, "total"}] for buckets in
+    [start, end). Defaults to the last 24 hours (hour) or 30 days (day).
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    end = end or datetime.now()
+    start = start or end - GRANULARITIES[granularity]
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT bucket_start, call_status, call_count FROM call_status_counts "
+        "WHERE granularity = %s AND bucket_start >= date_trunc(%s, %s::TIMESTAMP) AND bucket_start < %s "
+        "AND call_count <> 0 ORDER BY bucket_start, call_status;",
+        (granularity, granularity, start, end)
+    )
+    buckets = OrderedDict()
+    for bucket_start, call_status, call_count in cursor.fetchall():
+        bucket = buckets.setdefault(bucket_start, {"bucket_start": bucket_start, "counts": {}, "total": 0})
+        bucket["counts"][call_status] = call_count
+        bucket["total"] += call_count
+    cursor.close()
+    return list(buckets.values())
@@ -0,0 +1,310 @@
+"""
+Outbound Call Dispatcher
+In-process queue that decouples /api/submit from the medical bot service.
+
+Submissions are stored as jobs and queued; a bounded pool of asyncio workers
+drains the queue into the bot with limited concurrency, retrying failed calls
+with exponential backoff. When the queue is full, submit() raises QueueFull so
+the API can push back on the client instead of piling up outbound calls.
+The queue is a PriorityCallQueue (scheduler.py): hot calls go first and each
+phone number is rate limited. A job remembers the trace it was submitted
+under, and each bot attempt is traced as a child of it.
+
+Given a CRM pool, jobs are also persisted in dispatch_jobs (postgres
+migration 0009): submit_persisted() writes the job before /api/submit answers
+202, a job is marked running before the bot is called, and every later state
+change is written through. On start(), queued and retrying jobs are queued
+again; jobs that were running are failed rather than retried, since the bot
+may already have placed the call. lookup() falls back to the table, so jobs
+stay pollable after a restart or once evicted from memory.
+
+Configuration (environment):
+    DISPATCH_CONCURRENCY     concurrent bot calls (default 4)
+    DISPATCH_QUEUE_SIZE      queued jobs before QueueFull (default 100)
+    DISPATCH_MAX_ATTEMPTS    attempts per job including the first (default 3)
+    DISPATCH_BACKOFF_BASE    first retry delay in seconds, doubled per retry (default 0.5)
+    DISPATCH_BACKOFF_MAX     retry delay cap in seconds (default 30)
+"""
+import asyncio
+import os
+import random
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from backend.crm.postgres.dispatch_jobs import (
+    delete_dispatch_job,
+    get_dispatch_job,
+    insert_dispatch_job,
+    recover_dispatch_jobs,
+    update_dispatch_job,
+)
+from backend.dispatch.scheduler import NON_HOT, PriorityCallQueue, RateLimit
+from backend.observability.tracing import SpanContext, current_span_context, start_span
+
+QUEUED = "queued"
+RUNNING = "running"
+RETRYING = "retrying"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class QueueFull(Exception):
+    """Raised when the dispatch queue cannot accept another job."""
+
+
+@dataclass
+class DispatchConfig:
+    concurrency: int = 4
+    max_queue: int = 100
+    max_attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    max_finished_jobs: int = 10000
+    rate_limit: RateLimit = field(default_factory=RateLimit)
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ
+        return cls(
+            concurrency=int(env.get("DISPATCH_CONCURRENCY", cls.concurrency)),
+            max_queue=int(env.get("DISPATCH_QUEUE_SIZE", cls.max_queue)),
+            max_attempts=int(env.get("DISPATCH_MAX_ATTEMPTS", cls.max_attempts)),
+            backoff_base=float(env.get("DISPATCH_BACKOFF_BASE", cls.backoff_base)),
+            backoff_max=float(env.get("DISPATCH_BACKOFF_MAX", cls.backoff_max)),
+            rate_limit=RateLimit.from_env(),
+        )
+
+
+@dataclass
+class CallJob:
+    call_id: str
+    payload: dict
+    priority: str = NON_HOT
+    status: str = QUEUED
+    attempts: int = 0
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    trace_context: Optional[SpanContext] = None
+
+    def to_dict(self):
+        return {
+            "call_id": self.call_id,
+            "priority": self.priority,
+            "status": self.status,
+            "attempts": self.attempts,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobStore:
+    """In-memory job table; finished jobs are kept up to a bounded count for polling."""
+
+    def __init__(self, max_finished=10000):
+        self.max_finished = max_finished
+        self._jobs = {}
+        self._finished = OrderedDict()
+
+    def add(self, job):
+        self._jobs[job.call_id] = job
+
+    def get(self, call_id):
+        return self._jobs.get(call_id)
+
+    def update(self, job, status, **fields):
+        job.status = status
+        job.updated_at = time.time()
+        for name, value in fields.items():
+            setattr(job, name, value)
+        if status in (COMPLETED, FAILED):
+            self._finished[job.call_id] = None
+            while len(self._finished) > self.max_finished:
+                old_id, _ = self._finished.popitem(last=False)
+                self._jobs.pop(old_id, None)
+
+    def __len__(self):
+        return len(self._jobs)
+
+
+class CallDispatcher:
+    def __init__(self, bot, config=None, store=None, pool=None):
+        """
+        bot: async callable invoked as await bot(**job.payload); its return
+        value (a dict) becomes job.result. Any exception counts as a failed attempt.
+        pool: AsyncCRMPool used to persist jobs in dispatch_jobs; None keeps
+        them in memory only.
+        """
+        self.bot = bot
+        self.config = config or DispatchConfig.from_env()
+        self.store = store or JobStore(self.config.max_finished_jobs)
+        self.pool = pool
+        self._queue = None
+        self._workers = []
+        self._in_flight = 0
+
+    @property
+    def running(self):
+        return bool(self._workers)
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = PriorityCallQueue(self.config.max_queue, self.config.rate_limit)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"call-dispatch-{i}")
+            for i in range(self.config.concurrency)
+        ]
+        if self.pool is not None:
+            await self._recover()
+
+    async def _recover(self):
+        """Queue the jobs a previous process left queued or retrying."""
+        for row in await self.pool.run(recover_dispatch_jobs):
+            job = CallJob(**row)
+            self.store.add(job)
+            if job.status == RETRYING:
+                self._queue.put_later(job, self.backoff(job.attempts))
+            else:
+                self._queue.put_nowait(job, force=True)
+
+    async def stop(self, timeout=10.0):
+        """Let queued jobs drain for up to `timeout` seconds, then cancel the workers."""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, payload, priority=NON_HOT):
+        """Store and enqueue a job without waiting for the bot. Raises QueueFull."""
+        job = self._new_job(payload, priority)
+        self._enqueue(job)
+        return job
+
+    async def submit_persisted(self, payload, priority=NON_HOT):
+        """submit(), writing the job to dispatch_jobs before queuing it (when a pool is set)."""
+        if self.pool is None:
+            return self.submit(payload, priority)
+        job = self._new_job(payload, priority)
+        if self._queue.full():
+            raise self._queue_full()
+        await self.pool.run(insert_dispatch_job, job.call_id, job.payload, job.priority, job.status, job.created_at)
+        try:
+            self._enqueue(job)
+        except QueueFull:
+            await self.pool.run(delete_dispatch_job, job.call_id)
+            raise
+        return job
+
+    def _new_job(self, payload, priority):
+        if not self.running:
+            raise RuntimeError("Dispatcher is not running")
+        return CallJob(call_id=f"CALL_{uuid.uuid4().hex}", payload=dict(payload), priority=priority,
+                       trace_context=current_span_context())
+
+    def _enqueue(self, job):
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise self._queue_full() from None
+        self.store.add(job)
+
+    def _queue_full(self):
+        return QueueFull(f"Dispatch queue is full ({self.config.max_queue} jobs)")
+
+    def get(self, call_id):
+        return self.store.get(call_id)
+
+    async def lookup(self, call_id):
+        """get(), falling back to dispatch_jobs for jobs no longer (or never) held in memory."""
+        job = self.store.get(call_id)
+        if job is None and self.pool is not None:
+            row = await self.pool.run(get_dispatch_job, call_id)
+            job = None if row is None else CallJob(**row)
+        return job
+
+    def stats(self):
+        stats = {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "in_flight": self._in_flight,
+            "retry_pending": self._queue.retry_pending if self._queue else 0,
+            "concurrency": self.config.concurrency,
+            "max_queue": self.config.max_queue,
+        }
+        if self._queue:
+            stats["scheduler"] = self._queue.stats()
+        return stats
+
+    def backoff(self, attempt):
+        """Delay before retry number `attempt` (1-based): exponential with full jitter."""
+        ceiling = min(self.config.backoff_max, self.config.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _persist(self, job):
+        if self.pool is not None:
+            await self.pool.run(update_dispatch_job, job.call_id, job.status, job.attempts,
+                                job.result, job.error, job.updated_at)
+
+    async def _run(self, job):
+        self.store.update(job, RUNNING, attempts=job.attempts + 1)
+        try:
+            await self._persist(job)
+        except Exception as e:
+            # Never call without a durable "running" mark: after a crash the
+            # job would be replayed and the patient phoned twice.
+            self._attempt_failed(job, f"could not record job start: {e}")
+        else:
+            await self._call_bot(job)
+        try:
+            await self._persist(job)
+        except Exception as e:
+            print(f"Dispatch job {job.call_id} status not persisted: {e}")
+        # Only once RETRYING is recorded, so it cannot land after the retry's RUNNING.
+        if job.status == RETRYING:
+            self._schedule_retry(job)
+
+    async def _call_bot(self, job):
+        self._in_flight += 1
+        try:
+            with start_span("call_medical_bot", parent=job.trace_context, call_id=job.call_id,
+                            attempt=job.attempts, priority=job.priority,
+                            since_submit_ms=round((time.time() - job.created_at) * 1000, 3)):
+                result = await self.bot(**job.payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._attempt_failed(job, str(e) or e.__class__.__name__)
+        else:
+            self.store.update(job, COMPLETED, result=result, error=None)
+        finally:
+            self._in_flight -= 1
+
+    def _attempt_failed(self, job, error):
+        if job.attempts >= self.config.max_attempts:
+            self.store.update(job, FAILED, error=error)
+        else:
+            self.store.update(job, RETRYING, error=error)
+
+    def _schedule_retry(self, job):
+        # The job was already admitted, so it bypasses the size check.
+        self._queue.put_later(job, self.backoff(job.attempts))
@@ -0,0 +1,197 @@
+"""
+Priority Call Scheduler
+Heap-ordered queue feeding the dispatcher's workers.
+
+Ready jobs are ordered by (priority, attempts, created_at): hot calls before
+non-hot ones, then calls that have failed fewer times, then the oldest. Jobs
+that may not run yet (retry backoff, or a phone number over its rate limit)
+wait in a second heap keyed by the time they become eligible. Every push and
+pop is O(log n); a job deferred for its phone's rate limit is only looked at
+again once that phone has room.
+
+The number of worker tasks (DISPATCH_CONCURRENCY) is the global cap on
+concurrent calls; this queue only decides which job a free worker gets next.
+
+Queue wait time and depth are exported on /metrics (dispatch_queue_wait_seconds,
+dispatch_queue_depth) and, for this queue alone, in stats().
+
+Configuration (environment):
+    DISPATCH_PHONE_RATE      calls per phone number per window (default 5, 0 = unlimited)
+    DISPATCH_PHONE_WINDOW    rate limit window in seconds (default 60)
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+
+from backend.observability.metrics import (
+    DISPATCH_DEPTH_BUCKETS as DEPTH_BUCKETS,
+    DISPATCH_WAIT_BUCKETS as WAIT_BUCKETS,
+    Histogram,
+    get_metrics,
+)
+
+HOT = "hot"
+NON_HOT = "non-hot"
+PRIORITY_RANK = {HOT: 0, NON_HOT: 1}
+
+
+@dataclass
+class RateLimit:
+    calls: int = 5
+    window: float = 60.0
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ
+        return cls(
+            calls=int(env.get("DISPATCH_PHONE_RATE", cls.calls)),
+            window=float(env.get("DISPATCH_PHONE_WINDOW", cls.window)),
+        )
+
+
+class PriorityCallQueue:
+    """
+    Async queue of CallJob objects with the put/get/task_done/join surface of
+    asyncio.Queue, ordered by priority and gated by per-phone rate limits.
+    """
+
+    def __init__(self, maxsize=0, rate_limit=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.rate_limit = rate_limit or RateLimit.from_env()
+        self.clock = clock
+        self._ready = []      # (rank, attempts, created_at, seq, job)
+        self._delayed = []    # (eligible_at, seq, job)
+        self._seq = itertools.count()
+        self._enqueued_at = {}
+        self._recent = defaultdict(deque)  # phone -> monotonic times of recent dispatches
+        self._retrying = set()
+        self._dispatched = 0
+        self._unfinished = 0
+        self._finished = asyncio.Event()
+        self._finished.set()
+        self._changed = asyncio.Event()
+        self.wait_time = Histogram(WAIT_BUCKETS)
+        self.depth = Histogram(DEPTH_BUCKETS)
+
+    @property
+    def retry_pending(self):
+        return len(self._retrying)
+
+    def qsize(self):
+        """Jobs admitted and not yet handed to a worker (retries in backoff excluded)."""
+        return len(self._ready) + len(self._delayed) - self.retry_pending
+
+    def full(self):
+        return self.maxsize > 0 and self.qsize() >= self.maxsize
+
+    def put_nowait(self, job, force=False):
+        """Admit a new job; raises asyncio.QueueFull at maxsize unless force (jobs recovered after a restart)."""
+        if self.full() and not force:
+            raise asyncio.QueueFull
+        self._admit(job)
+        self._push_ready(job)
+
+    def put_later(self, job, delay):
+        """Re-admit a job after `delay` seconds (retries); never rejected."""
+        self._admit(job)
+        self._retrying.add(job.call_id)
+        heapq.heappush(self._delayed, (self.clock() + delay, next(self._seq), job))
+        self._changed.set()
+
+    def _admit(self, job):
+        self._unfinished += 1
+        self._finished.clear()
+        self._enqueued_at[job.call_id] = self.clock()
+        depth = self.qsize()
+        self.depth.observe(depth)
+        get_metrics().dispatch_depth.observe(depth)
+
+    def _push_ready(self, job):
+        rank = PRIORITY_RANK.get(job.priority, PRIORITY_RANK[NON_HOT])
+        heapq.heappush(self._ready, (rank, job.attempts, job.created_at, next(self._seq), job))
+        self._changed.set()
+
+    def _phone_available_at(self, phone, now):
+        """Earliest time `phone` may be dialled again (now if it has room)."""
+        if not phone or self.rate_limit.calls <= 0:
+            return now
+        recent = self._recent[phone]
+        while recent and recent[0] <= now - self.rate_limit.window:
+            recent.popleft()
+        if not recent:
+            del self._recent[phone]
+            return now
+        if len(recent) < self.rate_limit.calls:
+            return now
+        return recent[0] + self.rate_limit.window
+
+    def _promote_due(self, now):
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, job = heapq.heappop(self._delayed)
+            self._retrying.discard(job.call_id)
+            self._push_ready(job)
+
+    def _next_ready(self):
+        """Pop the best job whose phone has room, deferring the ones that do not."""
+        now = self.clock()
+        self._promote_due(now)
+        while self._ready:
+            job = heapq.heappop(self._ready)[-1]
+            phone = job.payload.get("phone_number")
+            available_at = self._phone_available_at(phone, now)
+            if available_at > now:
+                heapq.heappush(self._delayed, (available_at, next(self._seq), job))
+                continue
+            if phone and self.rate_limit.calls > 0:
+                self._recent[phone].append(now)
+            self._dispatched += 1
+            if self._dispatched % 1000 == 0:
+                self._forget_idle_phones(now)
+            waited = now - self._enqueued_at.pop(job.call_id, now)
+            self.wait_time.observe(waited)
+            get_metrics().dispatch_wait.observe(waited, job.priority)
+            return job
+        return None
+
+    def _forget_idle_phones(self, now):
+        cutoff = now - self.rate_limit.window
+        for phone in [p for p, recent in self._recent.items() if recent[-1] <= cutoff]:
+            del self._recent[phone]
+
+    async def get(self):
+        while True:
+            job = self._next_ready()
+            if job is not None:
+                return job
+            self._changed.clear()
+            timeout = self._delayed[0][0] - self.clock() if self._delayed else None
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def task_done(self):
+        self._unfinished -= 1
+        if self._unfinished <= 0:
+            self._unfinished = 0
+            self._finished.set()
+
+    async def join(self):
+        await self._finished.wait()
+
+    def stats(self):
+        ready_by_priority = defaultdict(int)
+        for entry in self._ready:
+            ready_by_priority[entry[-1].priority] += 1
+        return {
+            "ready": dict(ready_by_priority),
+            "deferred": len(self._delayed) - self.retry_pending,
+            "retry_pending": self.retry_pending,
+            "tracked_phones": len(self._recent),
+            "queue_depth": self.depth.to_dict(),
+            "wait_seconds": self.wait_time.to_dict(),
+        }
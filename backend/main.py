@@ -1,9 +1,15 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional
+from datetime import datetime
+from contextlib import asynccontextmanager
+from bson import ObjectId
+from bson.errors import InvalidId
+import asyncio
+import json
 import os
 import sys
 from pathlib import Path
@@ -11,7 +17,79 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-app = FastAPI()
+from backend.audio.store import (
+    RangeNotSatisfiable,
+    UploadTooLarge,
+    audio_url,
+    get_audio_store,
+    parse_audio_url,
+    parse_range,
+)
+from backend.cache.lookups import cached_call, cached_latest_transcript, invalidate_calls
+from backend.cache.store import get_cache
+from backend.crm.postgres.calls import (
+    aiter_ndjson,
+    bulk_insert_calls_async,
+    latest_call_status,
+    list_calls_page,
+    set_call_audio_url,
+)
+from backend.crm.postgres.notifications import CallEventListener
+from backend.crm.postgres.partitions import ensure_partitions
+from backend.crm.postgres.patients import get_or_create_patient, list_patients_page, normalize_phone
+from backend.crm.postgres.pool import get_async_pool
+from backend.crm.postgres.stats import call_status_counts
+from backend.dispatch.dispatcher import CallDispatcher, QueueFull
+from backend.dispatch.scheduler import HOT, NON_HOT
+from backend.migrations.runner import migrate_all
+from backend.observability.metrics import get_metrics
+from backend.observability.middleware import MetricsMiddleware, ProfilingMiddleware, TracingMiddleware
+from backend.observability.profiling import get_profiler
+from backend.observability.tracing import current_span, get_tracer, otlp_request, trace_summary
+from backend.services.call_details import MAX_BATCH_IDS, get_call_details
+from backend.services.call_lifecycle import OutboxRelay, complete_call, finish_call
+from backend.services.transcript_search import build_search_backend, search_transcripts
+from backend.transcription.mongodb.live import LiveTranscriptSession, MalformedFrame, SegmentOutOfOrder, decode_frame
+from backend.transcription.mongodb.repository import (
+    close_transcript_repository,
+    get_transcript_repository,
+    serialize_transcript,
+)
+from backend.transcription.mongodb.writer import BufferedTranscriptWriter
+
+async def maintain_call_partitions(interval: float = 24 * 3600):
+    """Keep future monthly partitions of calls in place while the app runs"""
+    while True:
+        try:
+            await get_async_pool().run(ensure_partitions)
+        except Exception as e:
+            print(f"Partition maintenance failed: {e}")
+        await asyncio.sleep(interval)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if os.environ.get("MIGRATE_ON_STARTUP") == "1":
+        await asyncio.to_thread(migrate_all)
+    dispatcher = CallDispatcher(bot=call_medical_bot, pool=get_async_pool())
+    await dispatcher.start()
+    app.state.dispatcher = dispatcher
+    app.state.transcript_writer = BufferedTranscriptWriter(get_transcript_repository().collection)
+    app.state.transcript_search = build_search_backend(get_transcript_repository())
+    app.state.outbox_relay = OutboxRelay()
+    app.state.outbox_relay.start()
+    app.state.call_events = CallEventListener()
+    await app.state.call_events.start()
+    partition_task = asyncio.create_task(maintain_call_partitions())
+    yield
+    partition_task.cancel()
+    await dispatcher.stop()
+    await app.state.outbox_relay.stop()
+    await app.state.call_events.stop()
+    await app.state.transcript_writer.close()
+    await close_transcript_repository()
+    get_tracer().flush()
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -22,6 +100,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so CORS preflights and error responses are traced and measured too
+app.add_middleware(TracingMiddleware)
+app.add_middleware(MetricsMiddleware)
+# Only installed when PROFILE_SAMPLE_RATE or PROFILE_ALLOWED_CLIENTS is set
+if get_profiler().enabled:
+    app.add_middleware(ProfilingMiddleware)
+
 # Mount static files (for serving images and CSS/JS)
 static_path = Path(__file__).parent.parent / "static"
 if static_path.exists():
@@ -36,6 +121,24 @@ class PatientSubmission(BaseModel):
     symptoms: str
     message: Optional[str] = None
 
+class TranscriptSubmission(BaseModel):
+    call_id: int
+    transcript_text: str
+    language: str = "en"
+
+class CompletedCall(BaseModel):
+    patient_id: Optional[int] = None
+    audio_file_url: Optional[str] = None
+    call_status: str = "completed"
+    transcript_text: Optional[str] = None
+    language: str = "en"
+
+class CallCompletion(BaseModel):
+    call_status: str = "completed"
+    transcript_text: Optional[str] = None
+    language: str = "en"
+    reason: Optional[str] = None
+
 # Routes
 @app.get("/")
 async def root():
@@ -67,37 +170,69 @@ async def get_carousel_images():
         ]
     }
 
-@app.post("/api/submit")
-async def submit_patient_info(submission: PatientSubmission):
+@app.post("/api/submit", status_code=202)
+async def submit_patient_info(submission: PatientSubmission, request: Request):
     """
-    Handle patient submission and trigger bot call
+    Handle patient submission and queue the bot call.
+    Returns as soon as the job is queued; poll /api/dispatch/{call_id} for progress.
     """
     try:
         # Validate required fields
         if not submission.name or not submission.phone:
             raise HTTPException(status_code=400, detail="Name and phone are required")
+        try:
+            phone = normalize_phone(submission.phone)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        # Here you would integrate with your bot calling service
-        # For now, we'll simulate the call
-        bot_response = await call_medical_bot(
-            patient_name=submission.name,
-            phone_number=submission.phone,
-            email=submission.email,
-            symptoms=submission.symptoms,
-            message=submission.message
-        )
+        # One indexed upsert maps the caller to their patient row
+        patient_id, created = await get_async_pool().run(get_or_create_patient, phone)
+        # Patients whose last call was classified hot are called back first
+        last_status = None if created else await get_async_pool().run(latest_call_status, patient_id)
+        priority = HOT if last_status == HOT else NON_HOT
+        
+        job = await request.app.state.dispatcher.submit_persisted({
+            "patient_id": patient_id,
+            "patient_name": submission.name,
+            "phone_number": phone,
+            "email": submission.email,
+            "symptoms": submission.symptoms,
+            "message": submission.message
+        }, priority=priority)
+        current_span().set_attribute("call_id", job.call_id)
+        current_span().set_attribute("patient_id", patient_id)
         
         return {
             "status": "success",
             "message": "Form submitted successfully. The medical bot will call you shortly.",
-            "call_id": bot_response.get("call_id"),
+            "call_id": job.call_id,
+            "job_status": job.status,
+            "priority": job.priority,
+            "patient_id": patient_id,
             "patient_name": submission.name,
-            "phone": submission.phone
+            "phone": phone
         }
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Submission failed: {str(e)}")
 
-async def call_medical_bot(patient_name: str, phone_number: str, email: Optional[str], symptoms: str, message: Optional[str]):
+@app.get("/api/dispatch/{call_id}")
+async def get_dispatch_status(call_id: str, request: Request):
+    """Poll the status of a queued bot call"""
+    job = await request.app.state.dispatcher.lookup(call_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown call_id {call_id}")
+    return job.to_dict()
+
+@app.get("/api/dispatch")
+async def get_dispatch_stats(request: Request):
+    """Queue depth and worker utilisation of the call dispatcher"""
+    return request.app.state.dispatcher.stats()
+
+async def call_medical_bot(patient_name: str, phone_number: str, email: Optional[str], symptoms: str, message: Optional[str], patient_id: Optional[int] = None):
     """
     Trigger the medical bot to call the patient
     This is where you integrate with your bot service
@@ -113,6 +248,383 @@ async def call_medical_bot(patient_name: str, phone_number: str, email: Optional
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Bot call failed: {str(e)}")
 
+@app.post("/api/calls/bulk")
+async def bulk_create_calls(request: Request, batch_size: int = 1000):
+    """
+    Bulk-load call records.
+    Body is NDJSON (one {"patient_id", "audio_file_url", "call_status"} object per line,
+    streamed in batches) or a JSON array of the same objects.
+    Returns call ids in input order (null for rejected rows) plus per-row errors.
+    """
+    if not 1 <= batch_size <= 10000:
+        raise HTTPException(status_code=400, detail="batch_size must be between 1 and 10000")
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        rows = await request.json()
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of call records")
+    else:
+        rows = aiter_ndjson(request.stream())
+    try:
+        result = await bulk_insert_calls_async(rows, batch_size=batch_size)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Bulk insert failed: {str(e)}")
+    return result.to_dict()
+
+@app.get("/api/patients")
+async def get_patients(limit: int = Query(50, ge=1, le=1000), after: Optional[int] = None):
+    """Patients ordered by patient_id; pass next_after back as `after` for the next page"""
+    patients, next_after = await get_async_pool().run(list_patients_page, limit, after)
+    return {"patients": patients, "next_after": next_after}
+
+def parse_id_list(ids: str):
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if not parsed:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    if len(parsed) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    return parsed
+
+@app.get("/api/calls")
+async def get_calls(
+    ids: Optional[str] = None,
+    include_text: bool = False,
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    call_status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    """
+    With ids (comma-separated): batch call details with transcripts;
+    transcript_text is omitted unless include_text=true.
+    Without ids: newest-first call listing, keyset-paginated via the returned
+    next_cursor and filterable by call_status and [created_from, created_to).
+    """
+    if ids is not None:
+        calls = await get_call_details(parse_id_list(ids), include_text=include_text)
+        return {"calls": calls}
+    try:
+        calls, next_cursor = await get_async_pool().run(
+            list_calls_page, limit, cursor,
+            call_status=call_status, created_from=created_from, created_to=created_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"calls": calls, "next_cursor": next_cursor}
+
+@app.post("/api/calls", status_code=201)
+async def create_completed_call(call: CompletedCall, request: Request):
+    """
+    Record a finished call in one transaction: the call row with its final
+    status, its status event and the transcript (delivered to MongoDB by the outbox relay)
+    """
+    try:
+        call_id = await get_async_pool().run(
+            complete_call, call.patient_id, call.audio_file_url, call.transcript_text,
+            call.language, call.call_status
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Saving call failed: {str(e)}")
+    current_span().set_attribute("call_id", call_id)
+    request.app.state.outbox_relay.notify()
+    return {"call_id": call_id, "call_status": call.call_status}
+
+@app.post("/api/calls/{call_id}/complete")
+async def complete_existing_call(call_id: int, completion: CallCompletion, request: Request):
+    """Move an existing call to its final status and queue its transcript, in one transaction"""
+    current_span().set_attribute("call_id", call_id)
+    try:
+        previous = await get_async_pool().run(
+            finish_call, call_id, completion.transcript_text, completion.language,
+            completion.call_status, completion.reason
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Completing call failed: {str(e)}")
+    invalidate_calls(call_id)
+    request.app.state.outbox_relay.notify()
+    return {"call_id": call_id, "previous_status": previous, "call_status": completion.call_status}
+
+@app.get("/api/calls/{call_id}")
+async def get_call(call_id: int, include_text: bool = True):
+    """Call metadata, patient phone and transcripts for one call"""
+    calls = await get_call_details([call_id], include_text=include_text)
+    if not calls:
+        raise HTTPException(status_code=404, detail=f"No call found with call_id {call_id}")
+    return calls[0]
+
+@app.post("/api/calls/{call_id}/audio", status_code=201)
+async def upload_call_audio(call_id: int, request: Request):
+    """
+    Stream a recording (raw request body) into the content-addressed audio
+    store and point the call's audio_file_url at it
+    """
+    if await asyncio.to_thread(cached_call, call_id) is None:
+        raise HTTPException(status_code=404, detail=f"No call found with call_id {call_id}")
+    try:
+        digest, size = await get_audio_store().save_stream(request.stream())
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    url = audio_url(digest, request.headers.get("content-type"))
+    try:
+        await get_async_pool().run(set_call_audio_url, call_id, url)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    invalidate_calls(call_id)
+    return {"call_id": call_id, "audio_file_url": url, "sha256": digest, "size": size}
+
+@app.get("/api/calls/{call_id}/audio")
+async def get_call_audio(call_id: int, request: Request):
+    """Serve a call's recording, honouring single HTTP Range requests for seeking"""
+    call = await asyncio.to_thread(cached_call, call_id)
+    if call is None:
+        raise HTTPException(status_code=404, detail=f"No call found with call_id {call_id}")
+    parsed = parse_audio_url(call["audio_file_url"])
+    store = get_audio_store()
+    if parsed is None or not store.exists(parsed[0]):
+        raise HTTPException(status_code=404, detail=f"No stored recording for call_id {call_id}")
+    digest, media_type = parsed
+    size = store.size(digest)
+    headers = {"Accept-Ranges": "bytes", "ETag": f'"{digest}"'}
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except RangeNotSatisfiable:
+        return JSONResponse(
+            status_code=416, content={"detail": "Range not satisfiable"},
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        (start, end), status_code = byte_range, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        store.iter_range(digest, start, end), status_code=status_code, media_type=media_type, headers=headers
+    )
+
+@app.post("/api/transcripts", status_code=201)
+async def create_transcript(transcript: TranscriptSubmission, request: Request):
+    """Store a transcript through the buffered writer and wait for the acknowledgement"""
+    current_span().set_attribute("call_id", transcript.call_id)
+    try:
+        inserted_id = await request.app.state.transcript_writer.save_transcript(
+            transcript.call_id, transcript.transcript_text, transcript.language
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Transcript save failed: {str(e)}")
+    request.app.state.transcript_search.index({
+        "_id": inserted_id,
+        "call_id": transcript.call_id,
+        "transcript_text": transcript.transcript_text,
+        "language": transcript.language,
+    })
+    return {"call_id": transcript.call_id, "transcript_id": str(inserted_id)}
+
+@app.websocket("/ws/transcripts/{call_id}")
+async def ingest_transcript_segments(websocket: WebSocket, call_id: int, language: str = "en"):
+    """
+    Live transcript ingest. The server first sends {"type": "ready", "last_seq"};
+    the producer then sends {"seq", "text"} segments starting at last_seq + 1
+    and finally {"type": "end"}. Segments are appended in batches and each
+    batch is confirmed with a cumulative {"type": "ack", "last_seq"}. Frames
+    that are not JSON objects get {"type": "error"} and are skipped. Buffered
+    segments are written however the connection ends.
+    """
+    await websocket.accept()
+    session = LiveTranscriptSession(await get_transcript_repository().collection(), call_id, language)
+    await websocket.send_json({"type": "ready", "last_seq": await session.resume()})
+    try:
+        while True:
+            due = session.time_until_flush()
+            try:
+                raw = await asyncio.wait_for(websocket.receive_text(), None if due is None else max(due, 0))
+            except asyncio.TimeoutError:
+                await websocket.send_json({"type": "ack", "last_seq": await session.flush()})
+                continue
+            except KeyError:
+                raw = None  # binary frame
+            try:
+                message = decode_frame(raw)
+            except MalformedFrame as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            if message.get("type") == "end":
+                await websocket.send_json({"type": "ack", "last_seq": await session.finish(), "final": True})
+                await websocket.close()
+                return
+            try:
+                added = session.add(int(message["seq"]), str(message["text"]))
+            except (KeyError, TypeError, ValueError):
+                await websocket.send_json({"type": "error", "detail": "Expected {\"seq\": int, \"text\": str}"})
+                continue
+            except SegmentOutOfOrder as e:
+                await websocket.send_json({"type": "error", "detail": str(e), "next_seq": session.next_seq})
+                continue
+            if session.should_flush() or (not added and session.time_until_flush() is None):
+                await websocket.send_json({"type": "ack", "last_seq": await session.flush()})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await session.flush()
+
+@app.get("/api/transcripts/search")
+async def search_transcript_text(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    language: Optional[str] = None,
+):
+    """
+    Ranked full-text search over transcripts ("fever", "\"chest pain\""),
+    optionally only those in one language, each hit joined to its call's
+    status and patient
+    """
+    return await search_transcripts(request.app.state.transcript_search, q, limit, offset, language)
+
+def parse_transcript_id(transcript_id: str) -> ObjectId:
+    try:
+        return ObjectId(transcript_id)
+    except InvalidId:
+        raise HTTPException(status_code=400, detail=f"Invalid transcript id: {transcript_id}")
+
+@app.get("/api/transcripts/by-id/{transcript_id}")
+async def get_transcript_metadata(transcript_id: str):
+    """Transcript metadata (call_id, language, text_length, encoding) without fetching the body"""
+    doc = await get_transcript_repository().get_metadata(parse_transcript_id(transcript_id))
+    if doc is None:
+        raise HTTPException(status_code=404, detail=f"Transcript {transcript_id} not found")
+    return serialize_transcript(doc)
+
+@app.get("/api/transcripts/by-id/{transcript_id}/text")
+async def stream_transcript_text(transcript_id: str):
+    """Stream a transcript's text as plain UTF-8, decompressing chunk by chunk"""
+    try:
+        pieces = await get_transcript_repository().stream_text(parse_transcript_id(transcript_id))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return StreamingResponse(
+        (piece.encode("utf-8") async for piece in pieces), media_type="text/plain; charset=utf-8"
+    )
+
+@app.get("/api/transcripts/{call_id}")
+async def get_transcripts(call_id: int, include_text: bool = True):
+    """Return every transcript stored for a call, oldest first (metadata only with include_text=false)"""
+    docs = await get_transcript_repository().find_by_call_id(call_id, include_text=include_text)
+    return {"call_id": call_id, "transcripts": [serialize_transcript(doc) for doc in docs]}
+
+@app.get("/api/transcripts/{call_id}/latest")
+async def get_latest_transcript(call_id: int):
+    """Return the most recent transcript for a call"""
+    doc = await cached_latest_transcript(call_id, get_transcript_repository())
+    if doc is None:
+        raise HTTPException(status_code=404, detail=f"No transcript found for call_id {call_id}")
+    return serialize_transcript(doc)
+
+SSE_HEARTBEAT_SECONDS = 15
+
+@app.get("/api/events/calls")
+async def stream_call_events(request: Request, call_id: Optional[int] = None, patient_id: Optional[int] = None):
+    """
+    Server-Sent Events stream of new calls and call_status changes, optionally
+    filtered by call_id and/or patient_id; replaces polling the calls table
+    """
+    subscription = request.app.state.call_events.subscribe(call_id=call_id, patient_id=patient_id)
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=SSE_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield f"event: call_status\ndata: {json.dumps(event)}\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/stats/events")
+async def get_event_stats(request: Request):
+    """Subscriber count and notification counters of the shared call event listener"""
+    listener = request.app.state.call_events
+    return dict(listener.stats, subscribers=listener.subscriber_count)
+
+@app.get("/api/stats/calls")
+async def get_call_stats(
+    granularity: str = "hour",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """Call counts by call_status per hour or per day, served from the rollup table"""
+    try:
+        buckets = await get_async_pool().run(call_status_counts, granularity, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"granularity": granularity, "buckets": buckets}
+
+@app.get("/api/stats/cache")
+async def get_cache_stats():
+    """Hit, miss and eviction counters of the lookup cache"""
+    return get_cache().stats()
+
+@app.get("/metrics")
+async def get_metrics_text():
+    """Request, in-flight and database latency metrics in the Prometheus text format"""
+    return Response(content=get_metrics().render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/traces/{call_id}")
+async def get_call_traces(call_id: str, format: str = Query("summary", pattern="^(summary|otlp)$")):
+    """
+    Recent traces touching a call (dispatch call_id or CRM call_id), from the
+    in-memory collector: per-span offsets and durations, or raw OTLP/JSON
+    """
+    tracer = get_tracer()
+    collector = tracer.collector
+    if collector is None:
+        raise HTTPException(status_code=404, detail="In-memory tracing is off (set TRACING_EXPORTER=memory)")
+    traces = [collector.spans(trace_id) for trace_id in collector.trace_ids_for_call(call_id)]
+    traces = [spans for spans in traces if spans]
+    if not traces:
+        raise HTTPException(status_code=404, detail=f"No traces recorded for call_id {call_id}")
+    if format == "otlp":
+        return otlp_request([span for spans in traces for span in spans], tracer.config.service_name)
+    return {"call_id": call_id, "traces": [trace_summary(spans) for spans in traces]}
+
+def require_profile_access(request: Request):
+    profiler = get_profiler()
+    if not profiler.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is off")
+    if not profiler.client_allowed(request.client.host if request.client else None):
+        raise HTTPException(status_code=403, detail="Client is not allowed to read profiles")
+    return profiler
+
+@app.get("/api/profiles")
+async def list_profiles(request: Request):
+    """Recent request profiles, newest first (route, trigger, status, duration, sample count)"""
+    profiler = require_profile_access(request)
+    return {"profiles": [
+        dict(meta, url=f"/api/profiles/{meta['id']}") for meta in profiler.store.recent()
+    ]}
+
+@app.get("/api/profiles/{profile_id}")
+async def download_profile(profile_id: str, request: Request):
+    """One profile in collapsed-stack format (flamegraph.pl, speedscope)"""
+    meta = require_profile_access(request).store.get(profile_id)
+    if meta is None or not Path(meta["file"]).exists():
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return FileResponse(meta["file"], media_type="text/plain; charset=utf-8", filename=f"{profile_id}.folded")
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
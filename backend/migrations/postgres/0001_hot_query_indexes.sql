@@ -0,0 +1,6 @@
+-- Indexes for the CRM's hot lookups: calls by patient, by status and by time,
+-- and patients by phone number.
+CREATE INDEX IF NOT EXISTS idx_calls_patient_id_created_at ON calls (patient_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_calls_call_status_created_at ON calls (call_status, created_at);
+CREATE INDEX IF NOT EXISTS idx_calls_created_at ON calls (created_at);
+CREATE INDEX IF NOT EXISTS idx_patients_phone_number ON patients (phone_number);
@@ -0,0 +1,6 @@
+-- Listings page through calls newest first on (created_at, call_id), optionally
+-- filtered by call_status; widen the single-column indexes to match the keyset.
+CREATE INDEX IF NOT EXISTS idx_calls_created_at_call_id ON calls (created_at, call_id);
+CREATE INDEX IF NOT EXISTS idx_calls_status_created_at_call_id ON calls (call_status, created_at, call_id);
+DROP INDEX IF EXISTS idx_calls_created_at;
+DROP INDEX IF EXISTS idx_calls_call_status_created_at;
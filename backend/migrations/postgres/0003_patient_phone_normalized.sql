@@ -0,0 +1,6 @@
+-- Canonical (E.164-style) phone number per patient so repeat callers map to one
+-- row. Existing rows stay NULL until `python manage_patients.py backfill-phones`.
+ALTER TABLE patients ALTER COLUMN phone_number TYPE VARCHAR(32);
+ALTER TABLE patients ADD COLUMN IF NOT EXISTS phone_normalized VARCHAR(16);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_patients_phone_normalized ON patients (phone_normalized);
+DROP INDEX IF EXISTS idx_patients_phone_number;
@@ -0,0 +1,25 @@
+-- Call lifecycle: every status change is recorded, and transcripts are handed to
+-- MongoDB through a transactional outbox drained by the outbox relay.
+CREATE TABLE IF NOT EXISTS call_status_events (
+    event_id BIGSERIAL PRIMARY KEY,
+    call_id INT NOT NULL REFERENCES calls(call_id),
+    from_status VARCHAR(20),
+    to_status VARCHAR(20) NOT NULL,
+    reason TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_call_status_events_call_id ON call_status_events (call_id, event_id);
+
+CREATE TABLE IF NOT EXISTS transcript_outbox (
+    outbox_id BIGSERIAL PRIMARY KEY,
+    call_id INT NOT NULL REFERENCES calls(call_id),
+    transcript_text TEXT NOT NULL,
+    language VARCHAR(10) NOT NULL DEFAULT 'en',
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    attempts INT NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_error TEXT,
+    delivered_at TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_transcript_outbox_pending
+    ON transcript_outbox (next_attempt_at, outbox_id) WHERE delivered_at IS NULL;
@@ -0,0 +1,60 @@
+-- Turn calls into a table range-partitioned by month on created_at.
+-- The primary key must include the partition key, so call_id alone is no longer
+-- unique at the constraint level (the sequence still guarantees it) and tables
+-- that referenced calls(call_id) drop their foreign keys.
+ALTER TABLE call_status_events DROP CONSTRAINT IF EXISTS call_status_events_call_id_fkey;
+ALTER TABLE transcript_outbox DROP CONSTRAINT IF EXISTS transcript_outbox_call_id_fkey;
+
+ALTER TABLE calls RENAME TO calls_legacy;
+
+CREATE TABLE calls (
+    call_id INT NOT NULL DEFAULT nextval('calls_call_id_seq'),
+    patient_id INT REFERENCES patients(patient_id),
+    audio_file_url TEXT,
+    call_status VARCHAR(20), -- hot / non-hot
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (call_id, created_at)
+) PARTITION BY RANGE (created_at);
+
+ALTER SEQUENCE calls_call_id_seq OWNED BY calls.call_id;
+
+-- Creates the monthly partition holding `month` if it does not exist yet.
+CREATE OR REPLACE FUNCTION create_calls_partition(month DATE) RETURNS TEXT AS $$
+DECLARE
+    start_at DATE := date_trunc('month', month)::DATE;
+    partition_name TEXT := format('calls_%s', to_char(start_at, 'YYYY_MM'));
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF calls FOR VALUES FROM (%L) TO (%L)',
+        partition_name, start_at, (start_at + INTERVAL '1 month')::DATE
+    );
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    month DATE := date_trunc('month', COALESCE((SELECT MIN(created_at) FROM calls_legacy), CURRENT_TIMESTAMP))::DATE;
+BEGIN
+    WHILE month <= date_trunc('month', CURRENT_TIMESTAMP + INTERVAL '3 months') LOOP
+        PERFORM create_calls_partition(month);
+        month := (month + INTERVAL '1 month')::DATE;
+    END LOOP;
+END;
+$$;
+
+-- Safety net for rows outside every monthly partition; ensure_partitions() moves them
+-- into their month's partition when it creates it (see partitions.py).
+CREATE TABLE calls_default PARTITION OF calls DEFAULT;
+
+INSERT INTO calls (call_id, patient_id, audio_file_url, call_status, created_at)
+SELECT call_id, patient_id, audio_file_url, call_status, COALESCE(created_at, CURRENT_TIMESTAMP)
+FROM calls_legacy;
+
+DROP TABLE calls_legacy;
+
+-- Indexes declared on the parent are created on every partition.
+CREATE INDEX idx_calls_patient_id_created_at ON calls (patient_id, created_at);
+CREATE INDEX idx_calls_created_at_call_id ON calls (created_at, call_id);
+CREATE INDEX idx_calls_status_created_at_call_id ON calls (call_status, created_at, call_id);
+CREATE INDEX idx_calls_created_at_brin ON calls USING brin (created_at);
@@ -0,0 +1,78 @@
+-- Hourly and daily call counts per call_status, kept current by statement-level
+-- triggers so dashboards read O(buckets) rows instead of scanning calls.
+-- Transition tables aggregate a whole statement (e.g. a bulk COPY) into one
+-- upsert per bucket.
+CREATE TABLE IF NOT EXISTS call_status_counts (
+    granularity VARCHAR(4) NOT NULL CHECK (granularity IN ('hour', 'day')),
+    bucket_start TIMESTAMP NOT NULL,
+    call_status VARCHAR(20) NOT NULL,
+    call_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, bucket_start, call_status)
+);
+
+CREATE OR REPLACE FUNCTION call_status_counts_on_insert() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO call_status_counts AS c (granularity, bucket_start, call_status, call_count)
+    SELECT g.granularity, date_trunc(g.granularity, n.created_at),
+           COALESCE(n.call_status, 'unknown'), COUNT(*)
+    FROM new_rows n CROSS JOIN (VALUES ('hour'), ('day')) AS g(granularity)
+    GROUP BY 1, 2, 3
+    ORDER BY 1, 2, 3
+    ON CONFLICT (granularity, bucket_start, call_status)
+    DO UPDATE SET call_count = c.call_count + EXCLUDED.call_count;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION call_status_counts_on_update() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO call_status_counts AS c (granularity, bucket_start, call_status, call_count)
+    SELECT g.granularity, date_trunc(g.granularity, r.created_at), r.call_status, SUM(r.delta)
+    FROM (
+        SELECT created_at, COALESCE(call_status, 'unknown') AS call_status, 1 AS delta FROM new_rows
+        UNION ALL
+        SELECT created_at, COALESCE(call_status, 'unknown'), -1 FROM old_rows
+    ) r CROSS JOIN (VALUES ('hour'), ('day')) AS g(granularity)
+    GROUP BY 1, 2, 3
+    HAVING SUM(r.delta) <> 0
+    ORDER BY 1, 2, 3
+    ON CONFLICT (granularity, bucket_start, call_status)
+    DO UPDATE SET call_count = c.call_count + EXCLUDED.call_count;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION call_status_counts_on_delete() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO call_status_counts AS c (granularity, bucket_start, call_status, call_count)
+    SELECT g.granularity, date_trunc(g.granularity, o.created_at),
+           COALESCE(o.call_status, 'unknown'), -COUNT(*)
+    FROM old_rows o CROSS JOIN (VALUES ('hour'), ('day')) AS g(granularity)
+    GROUP BY 1, 2, 3
+    ORDER BY 1, 2, 3
+    ON CONFLICT (granularity, bucket_start, call_status)
+    DO UPDATE SET call_count = c.call_count + EXCLUDED.call_count;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS calls_status_counts_insert ON calls;
+DROP TRIGGER IF EXISTS calls_status_counts_update ON calls;
+DROP TRIGGER IF EXISTS calls_status_counts_delete ON calls;
+CREATE TRIGGER calls_status_counts_insert AFTER INSERT ON calls
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION call_status_counts_on_insert();
+CREATE TRIGGER calls_status_counts_update AFTER UPDATE ON calls
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION call_status_counts_on_update();
+CREATE TRIGGER calls_status_counts_delete AFTER DELETE ON calls
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION call_status_counts_on_delete();
+
+-- Backfill from existing calls (the table lock keeps concurrent writers out until commit).
+LOCK TABLE calls IN SHARE MODE;
+TRUNCATE call_status_counts;
+INSERT INTO call_status_counts (granularity, bucket_start, call_status, call_count)
+SELECT g.granularity, date_trunc(g.granularity, c.created_at), COALESCE(c.call_status, 'unknown'), COUNT(*)
+FROM calls c CROSS JOIN (VALUES ('hour'), ('day')) AS g(granularity)
+GROUP BY 1, 2, 3;
@@ -0,0 +1,27 @@
+-- Publish every new call and every call_status change on the call_events
+-- channel, so the API can push updates (LISTEN) instead of clients polling.
+-- NOTIFY is transactional: listeners only see committed changes.
+-- Bulk loaders can opt out for their transaction with SET LOCAL calls.notify = 'off'.
+CREATE OR REPLACE FUNCTION notify_call_event() RETURNS TRIGGER AS $$
+BEGIN
+    IF current_setting('calls.notify', true) = 'off' THEN
+        RETURN NULL;
+    END IF;
+    PERFORM pg_notify('call_events', json_build_object(
+        'call_id', NEW.call_id,
+        'patient_id', NEW.patient_id,
+        'call_status', NEW.call_status,
+        'previous_status', CASE WHEN TG_OP = 'UPDATE' THEN OLD.call_status END,
+        'created_at', NEW.created_at
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS calls_notify_insert ON calls;
+DROP TRIGGER IF EXISTS calls_notify_status ON calls;
+CREATE TRIGGER calls_notify_insert AFTER INSERT ON calls
+    FOR EACH ROW EXECUTE FUNCTION notify_call_event();
+CREATE TRIGGER calls_notify_status AFTER UPDATE OF call_status ON calls
+    FOR EACH ROW WHEN (OLD.call_status IS DISTINCT FROM NEW.call_status)
+    EXECUTE FUNCTION notify_call_event();
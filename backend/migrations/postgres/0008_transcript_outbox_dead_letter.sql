@@ -0,0 +1,9 @@
+-- Outbox rows that keep failing stop being retried after RELAY_MAX_ATTEMPTS and
+-- are parked as dead letters (last_error says why) instead of looping forever.
+ALTER TABLE transcript_outbox ADD COLUMN IF NOT EXISTS dead_lettered_at TIMESTAMP;
+
+DROP INDEX IF EXISTS idx_transcript_outbox_pending;
+CREATE INDEX IF NOT EXISTS idx_transcript_outbox_pending
+    ON transcript_outbox (next_attempt_at, outbox_id) WHERE delivered_at IS NULL AND dead_lettered_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_transcript_outbox_dead_lettered
+    ON transcript_outbox (dead_lettered_at) WHERE dead_lettered_at IS NOT NULL;
@@ -0,0 +1,15 @@
+-- Outbound bot calls queued by /api/submit. A job is written here before the
+-- 202, so queued and retrying jobs survive a restart and can still be polled.
+CREATE TABLE IF NOT EXISTS dispatch_jobs (
+    call_id VARCHAR(64) PRIMARY KEY,
+    payload JSONB NOT NULL,
+    priority VARCHAR(10) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    attempts INT NOT NULL DEFAULT 0,
+    result JSONB,
+    error TEXT,
+    created_at TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_dispatch_jobs_unfinished
+    ON dispatch_jobs (status) WHERE status IN ('queued', 'running', 'retrying');
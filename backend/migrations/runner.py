@@ -0,0 +1,161 @@
+"""
+Schema Migration Runner
+Applies ordered, versioned migrations to crm_db (PostgreSQL) and
+transcription_db (MongoDB).
+
+Migrations live next to this file:
+    postgres/NNNN_name.sql     plain SQL, run in one transaction
+    mongodb/NNNN_name.json     list of {"collection", "keys", "name", "options"} index specs,
+                               or {"collection", "drop": name} to drop an index
+
+Applied versions are recorded in a schema_migrations table (Postgres) and a
+schema_migrations collection (Mongo), so running the runner again is a no-op.
+Concurrent runners (several app workers starting at once) are serialized with
+a Postgres advisory lock.
+
+Usage:
+    python -m backend.migrations.runner status
+    python -m backend.migrations.runner migrate [--store postgres|mongodb|all]
+
+The FastAPI app also runs pending migrations at startup when
+MIGRATE_ON_STARTUP=1.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from backend.crm.postgres.pool import connection
+from backend.transcription.mongodb.connection import MongoConfig, get_client
+
+MIGRATIONS_DIR = Path(__file__).parent
+ADVISORY_LOCK_ID = 70_411_001  # arbitrary, shared by every runner
+
+
+def discover(store):
+    """Return [(version, path)] for a store, ordered by version."""
+    suffix = ".sql" if store == "postgres" else ".json"
+    migrations = []
+    for path in sorted((MIGRATIONS_DIR / store).glob(f"*{suffix}")):
+        migrations.append((path.stem, path))
+    return migrations
+
+
+# ----------- PostgreSQL -----------
+
+def _pg_applied(cursor):
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        " version VARCHAR(255) PRIMARY KEY,"
+        " applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP);"
+    )
+    cursor.execute("SELECT version FROM schema_migrations;")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def migrate_postgres(conn_factory=None):
+    """Apply pending SQL migrations, each in its own transaction. Returns applied versions."""
+    conn_factory = conn_factory or connection
+    applied_now = []
+    for version, path in discover("postgres"):
+        with conn_factory() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT pg_advisory_xact_lock(%s);", (ADVISORY_LOCK_ID,))
+            if version in _pg_applied(cursor):
+                cursor.close()
+                continue
+            cursor.execute(path.read_text())
+            cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s);", (version,))
+            cursor.close()
+        applied_now.append(version)
+    return applied_now
+
+
+def postgres_status(conn_factory=None):
+    with (conn_factory or connection)() as conn:
+        cursor = conn.cursor()
+        applied = _pg_applied(cursor)
+        cursor.close()
+    return [(version, version in applied) for version, _ in discover("postgres")]
+
+
+# ----------- MongoDB -----------
+
+def _mongo_db(db=None):
+    if db is not None:
+        return db
+    config = MongoConfig.from_env()
+    return get_client(config)[config.database]
+
+
+def apply_mongo_migration(db, specs):
+    for spec in specs:
+        if "drop" in spec:
+            # Skipped when already gone, so a crash mid-way is still safe to rerun.
+            if spec["drop"] in db[spec["collection"]].index_information():
+                db[spec["collection"]].drop_index(spec["drop"])
+            continue
+        keys = [(field, direction) for field, direction in spec["keys"]]
+        db[spec["collection"]].create_index(keys, name=spec["name"], **spec.get("options", {}))
+
+
+def migrate_mongodb(db=None):
+    """Apply pending index migrations. create_index is idempotent, so a crash mid-way is safe to rerun."""
+    db = _mongo_db(db)
+    applied = {doc["_id"] for doc in db["schema_migrations"].find({}, {"_id": 1})}
+    applied_now = []
+    for version, path in discover("mongodb"):
+        if version in applied:
+            continue
+        apply_mongo_migration(db, json.loads(path.read_text()))
+        db["schema_migrations"].update_one(
+            {"_id": version},
+            {"$setOnInsert": {"applied_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        applied_now.append(version)
+    return applied_now
+
+
+def mongodb_status(db=None):
+    db = _mongo_db(db)
+    applied = {doc["_id"] for doc in db["schema_migrations"].find({}, {"_id": 1})}
+    return [(version, version in applied) for version, _ in discover("mongodb")]
+
+
+def migrate_all():
+    return {"postgres": migrate_postgres(), "mongodb": migrate_mongodb()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply crm_db / transcription_db migrations")
+    parser.add_argument("command", choices=["status", "migrate"])
+    parser.add_argument("--store", choices=["postgres", "mongodb", "all"], default="all")
+    args = parser.parse_args(argv)
+
+    stores = ["postgres", "mongodb"] if args.store == "all" else [args.store]
+    for store in stores:
+        print("=" * 60)
+        print(f"{store} migrations")
+        print("=" * 60)
+        try:
+            if args.command == "migrate":
+                applied = migrate_postgres() if store == "postgres" else migrate_mongodb()
+                if applied:
+                    for version in applied:
+                        print(f"[APPLIED] {version}")
+                else:
+                    print("[INFO] Already up to date.")
+            else:
+                rows = postgres_status() if store == "postgres" else mongodb_status()
+                for version, done in rows:
+                    print(f"  {'[x]' if done else '[ ]'} {version}")
+        except Exception as e:
+            print(f"[ERROR] {store} migration failed: {e}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Metrics
+Process-wide counters, gauges and latency histograms, rendered in the
+Prometheus text exposition format by GET /metrics.
+
+    http_requests_total{method, route, status}
+    http_request_duration_seconds{method, route}        histogram
+    http_requests_in_flight{method, route}              gauge
+    db_query_duration_seconds{store, operation}         histogram
+    db_query_errors_total{store, operation}
+    db_slow_queries_total{store, operation}
+    dispatch_queue_wait_seconds{priority}               histogram
+    dispatch_queue_depth                                histogram
+
+Routes are labelled with their path template (/api/calls/{call_id}), never the
+raw path, so the number of label sets stays bounded. Database timings are
+labelled with the unit of work: the function handed to AsyncCRMPool.run
+(get_or_create_patient, complete_call, ...) or the transcript operation
+(save_transcript, find_by_call_id, ...). The dispatch families are fed by
+PriorityCallQueue: how long a job waited before a worker took it, and the
+queue depth seen by each job as it was admitted.
+
+Configuration (environment):
+    SLOW_QUERY_MS    print database operations slower than this (default 250, 0 = off)
+"""
+import bisect
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from backend.observability.tracing import start_span
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DISPATCH_WAIT_BUCKETS = (0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600)
+DISPATCH_DEPTH_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+@dataclass
+class MetricsConfig:
+    slow_query_ms: float = 250.0
+
+    @classmethod
+    def from_env(cls):
+        return cls(slow_query_ms=float(os.environ.get("SLOW_QUERY_MS", cls.slow_query_ms)))
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus style) with count and sum."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self):
+        cumulative = list(itertools.accumulate(self.counts))
+        buckets = {str(bound): n for bound, n in zip(self.buckets, cumulative)}
+        buckets["+Inf"] = cumulative[-1]
+        return {"buckets": buckets, "count": self.count, "sum": round(self.sum, 6)}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class MetricFamily:
+    """One named counter, gauge or histogram with a value per label set; thread-safe."""
+
+    def __init__(self, name, kind, help_text, label_names, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.kind = kind
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = buckets
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def observe(self, value, *labels):
+        with self._lock:
+            histogram = self._values.get(labels)
+            if histogram is None:
+                histogram = self._values[labels] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def snapshot(self):
+        with self._lock:
+            if self.kind == "histogram":
+                return {labels: h.to_dict() for labels, h in self._values.items()}
+            return dict(self._values)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted(self.snapshot().items()):
+            if self.kind != "histogram":
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {value}")
+                continue
+            for bound, count in value["buckets"].items():
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {value['sum']}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {value['count']}")
+        return lines
+
+
+class Metrics:
+    """The application's metric families plus the timing helpers that feed them."""
+
+    def __init__(self, config=None):
+        self.config = config or MetricsConfig.from_env()
+        self.http_requests = MetricFamily(
+            "http_requests_total", "counter", "HTTP requests by route and status", ("method", "route", "status")
+        )
+        self.http_duration = MetricFamily(
+            "http_request_duration_seconds", "histogram", "HTTP request latency", ("method", "route")
+        )
+        self.http_in_flight = MetricFamily(
+            "http_requests_in_flight", "gauge", "HTTP requests being served", ("method", "route")
+        )
+        self.db_duration = MetricFamily(
+            "db_query_duration_seconds", "histogram", "Database operation latency", ("store", "operation")
+        )
+        self.db_errors = MetricFamily(
+            "db_query_errors_total", "counter", "Database operations that raised", ("store", "operation")
+        )
+        self.db_slow = MetricFamily(
+            "db_slow_queries_total", "counter", "Database operations over SLOW_QUERY_MS", ("store", "operation")
+        )
+        self.dispatch_wait = MetricFamily(
+            "dispatch_queue_wait_seconds", "histogram", "Time call jobs waited for a dispatch worker",
+            ("priority",), buckets=DISPATCH_WAIT_BUCKETS
+        )
+        self.dispatch_depth = MetricFamily(
+            "dispatch_queue_depth", "histogram", "Dispatch queue depth when a job was admitted",
+            (), buckets=DISPATCH_DEPTH_BUCKETS
+        )
+
+    def families(self):
+        return [
+            self.http_requests, self.http_duration, self.http_in_flight,
+            self.db_duration, self.db_errors, self.db_slow,
+            self.dispatch_wait, self.dispatch_depth,
+        ]
+
+    def render(self):
+        """All families in the Prometheus text format (version 0.0.4)."""
+        return "\n".join(line for family in self.families() for line in family.render()) + "\n"
+
+    @contextmanager
+    def track_query(self, store, operation):
+        """
+        Time one database operation; usable around sync code and across awaits.
+        Inside a traced request the operation is also recorded as a child span.
+        """
+        started = time.perf_counter()
+        try:
+            with start_span(f"{store} {operation}", child_only=True, **{"db.system": store}):
+                yield
+        except Exception:
+            self.db_errors.inc(store, operation)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.db_duration.observe(elapsed, store, operation)
+            if self.config.slow_query_ms and elapsed * 1000 >= self.config.slow_query_ms:
+                self.db_slow.inc(store, operation)
+                print(f"[SLOW QUERY] {store} {operation} took {elapsed * 1000:.1f} ms")
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = Metrics()
+    return _metrics
+
+
+def set_metrics(metrics):
+    """Swap the process-wide metrics (e.g. a fresh instance per test)."""
+    global _metrics
+    _metrics = metrics
+
+
+def track_query(store, operation):
+    """Shortcut for get_metrics().track_query(store, operation)."""
+    return get_metrics().track_query(store, operation)
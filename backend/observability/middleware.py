@@ -0,0 +1,122 @@
+"""
+HTTP Instrumentation Middleware
+Plain ASGI middleware (no per-request Request/Response objects) that feeds
+the request metrics in metrics.py, opens the root span of each traced
+request (tracing.py) and profiles requests on demand (profiling.py).
+"""
+import time
+
+from starlette.routing import Match
+
+from backend.observability.metrics import get_metrics
+from backend.observability.profiling import get_profiler
+from backend.observability.tracing import SPAN_KIND_SERVER, STATUS_ERROR, get_tracer, parse_traceparent
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope):
+    """Path template of the route that will serve scope ("/api/calls/{call_id}")."""
+    if "route_template" in scope:
+        return scope["route_template"]
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match is Match.FULL:
+            partial = route.path
+            break
+        if match is Match.PARTIAL and partial is None:
+            partial = route.path
+    scope["route_template"] = partial or UNMATCHED_ROUTE
+    return scope["route_template"]
+
+
+class MetricsMiddleware:
+    """Counts, times and gauges HTTP requests by method and route template."""
+
+    def __init__(self, app, metrics=None):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        metrics = self.metrics or get_metrics()
+        method = scope["method"]
+        route = route_template(scope)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.http_in_flight.inc(method, route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.http_duration.observe(time.perf_counter() - started, method, route)
+            metrics.http_in_flight.inc(method, route, amount=-1)
+            metrics.http_requests.inc(method, route, str(status))
+
+
+class TracingMiddleware:
+    """Runs each HTTP request inside a server span, continuing an incoming traceparent."""
+
+    def __init__(self, app, tracer=None):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        tracer = self.tracer or get_tracer()
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        parent = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        route = route_template(scope)
+
+        with tracer.span(f"{scope['method']} {route}", parent=parent, kind=SPAN_KIND_SERVER,
+                         **{"http.method": scope["method"], "http.route": route}) as span:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = STATUS_ERROR
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
+
+
+class ProfilingMiddleware:
+    """Profiles the requests the profiler picks and tags their responses with X-Profile-Id."""
+
+    def __init__(self, app, profiler=None):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        profiler = self.profiler or get_profiler()
+        trigger = profiler.trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+        session = profiler.begin(scope, trigger, route_template(scope))
+        status = 500
+
+        async def send_with_profile_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", session.meta["id"].encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            session.finish(status)
@@ -0,0 +1,244 @@
+"""
+Request Profiling
+Opt-in sampling profiler for individual HTTP requests, for chasing latency
+spikes that do not reproduce on demand.
+
+A request is profiled when it carries the profile header (X-Profile: 1 by
+default) and comes from an allowed client, or when it is picked at random by
+PROFILE_SAMPLE_RATE. While it runs, a sampler thread looks at the request's
+task every PROFILE_INTERVAL_MS: if the task is on the event loop the loop
+thread's Python stack is recorded, otherwise the chain of coroutines it is
+suspended in, ending in "[awaiting]". The result is wall-clock time split by
+where the request was running or waiting (database round trips, pool waits
+and so on), not just CPU time. Work the request hands to worker threads shows
+up as the await that waits for it.
+
+Each profile is written in the collapsed-stack format ("frame;frame;frame
+count" per line) read by flamegraph.pl, speedscope and inferno. Only the most
+recent PROFILE_KEEP profiles are kept; GET /api/profiles lists them.
+
+Profiling is opt-in: when neither a sample rate nor allowed clients are
+configured, the middleware is not installed, the profile endpoints answer 404
+and requests pay nothing. On a development machine,
+PROFILE_ALLOWED_CLIENTS=loopback (127.0.0.1 and ::1) is enough; do not use it
+behind a reverse proxy on the same host, where every request looks like
+loopback.
+
+Configuration (environment):
+    PROFILE_SAMPLE_RATE       fraction of requests to profile (default 0)
+    PROFILE_HEADER            request header that asks for a profile (default X-Profile)
+    PROFILE_ALLOWED_CLIENTS   comma-separated client IPs whose header is honoured and
+                              who may list/download profiles; "loopback" stands for
+                              127.0.0.1,::1 (default none)
+    PROFILE_INTERVAL_MS       sampling interval (default 5)
+    PROFILE_DIR               where profiles are written (default profiles)
+    PROFILE_KEEP              profiles kept on disk (default 50)
+"""
+import asyncio
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+
+ROOT = str(Path(__file__).resolve().parent.parent.parent)
+AWAITING = "[awaiting]"
+LOOPBACK_CLIENTS = frozenset({"127.0.0.1", "::1"})
+
+
+@dataclass
+class ProfilingConfig:
+    sample_rate: float = 0.0
+    header: str = "X-Profile"
+    allowed_clients: frozenset = field(default_factory=frozenset)
+    interval_ms: float = 5.0
+    directory: str = "profiles"
+    keep: int = 50
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ
+        clients = {client.strip() for client in env.get("PROFILE_ALLOWED_CLIENTS", "").split(",") if client.strip()}
+        if "loopback" in clients:
+            clients = (clients - {"loopback"}) | LOOPBACK_CLIENTS
+        return cls(
+            sample_rate=float(env.get("PROFILE_SAMPLE_RATE", cls.sample_rate)),
+            header=env.get("PROFILE_HEADER", cls.header),
+            allowed_clients=frozenset(clients),
+            interval_ms=float(env.get("PROFILE_INTERVAL_MS", cls.interval_ms)),
+            directory=env.get("PROFILE_DIR", cls.directory),
+            keep=int(env.get("PROFILE_KEEP", cls.keep)),
+        )
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0 or bool(self.allowed_clients)
+
+
+@lru_cache(maxsize=4096)
+def _short_path(filename):
+    if filename.startswith(ROOT):
+        return os.path.relpath(filename, ROOT)
+    return "/".join(Path(filename).parts[-2:])
+
+
+def _label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+def running_stack(frame):
+    """Labels of a thread's frames, outermost first."""
+    labels = []
+    while frame is not None:
+        labels.append(_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def suspended_stack(task):
+    """Labels of the coroutines a suspended task is awaiting through, outermost first."""
+    labels = []
+    coro = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        labels.append(_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    labels.append(AWAITING)
+    return labels
+
+
+class ProfileSession:
+    """Samples one request's task from a background thread until finish()."""
+
+    def __init__(self, store, task, interval, meta):
+        self.store = store
+        self.task = task
+        self.loop = task.get_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.interval = interval
+        self.meta = meta
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name=f"profile-{meta['id']}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def finish(self, status):
+        self.meta["status"] = status
+        self.meta["duration_ms"] = round((time.perf_counter() - self._started) * 1000, 3)
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+        self.store.save(self)
+
+    def _sample(self):
+        try:
+            if asyncio.current_task(self.loop) is self.task:
+                stack = running_stack(sys._current_frames().get(self.loop_thread_id))
+            else:
+                stack = suspended_stack(self.task)
+        except Exception:
+            # The task moved on while we were walking it; skip this tick.
+            return
+        if stack:
+            self.samples[";".join(stack)] += 1
+
+
+class ProfileStore:
+    """Writes finished profiles and remembers the most recent ones."""
+
+    def __init__(self, directory, keep=50):
+        self.directory = Path(directory)
+        self.keep = keep
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def save(self, session):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{session.meta['id']}.folded"
+        lines = [f"{stack} {count}" for stack, count in session.samples.most_common()]
+        path.write_text("\n".join(lines) + "\n" if lines else "")
+        meta = dict(session.meta, samples=sum(session.samples.values()), file=str(path))
+        with self._lock:
+            self._recent.append(meta)
+            evicted = [self._recent.popleft() for _ in range(len(self._recent) - self.keep)]
+        for old in evicted:
+            try:
+                os.unlink(old["file"])
+            except OSError:
+                pass
+
+    def recent(self):
+        """Profile metadata, newest first."""
+        with self._lock:
+            return list(reversed(self._recent))
+
+    def get(self, profile_id):
+        with self._lock:
+            return next((meta for meta in self._recent if meta["id"] == profile_id), None)
+
+
+class Profiler:
+    def __init__(self, config=None):
+        self.config = config or ProfilingConfig.from_env()
+        self.store = ProfileStore(self.config.directory, self.config.keep)
+        self._header = self.config.header.lower().encode("latin-1")
+
+    @property
+    def enabled(self):
+        return self.config.enabled
+
+    def client_allowed(self, host):
+        return host in self.config.allowed_clients
+
+    def trigger(self, scope):
+        """Why this request should be profiled ("header" or "sampled"), or None."""
+        if self.config.allowed_clients:
+            client = scope.get("client")
+            if client and self.client_allowed(client[0]):
+                for name, value in scope["headers"]:
+                    if name == self._header and value not in (b"", b"0", b"false"):
+                        return "header"
+        if self.config.sample_rate and random.random() < self.config.sample_rate:
+            return "sampled"
+        return None
+
+    def begin(self, scope, trigger, route):
+        meta = {
+            "id": f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{secrets.token_hex(4)}",
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route,
+            "trigger": trigger,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "interval_ms": self.config.interval_ms,
+        }
+        return ProfileSession(self.store, asyncio.current_task(), self.config.interval_ms / 1000, meta).start()
+
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler():
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = Profiler()
+    return _profiler
@@ -0,0 +1,370 @@
+"""
+Tracing
+Lightweight spans for following one call through the system:
+POST /api/submit -> dispatcher -> call_medical_bot, and the CRM and
+transcript writes made for that call.
+
+The current span lives in a contextvar, so it follows the request into tasks
+it creates and into asyncio.to_thread workers (AsyncCRMPool.run) without any
+plumbing. The dispatcher's workers are long-lived tasks, so a job carries the
+span context it was submitted under and its bot call is traced as a child of
+that. Incoming requests may continue an existing trace with a W3C
+`traceparent` header.
+
+Spans carry a call_id attribute wherever one is known; the in-memory
+collector indexes traces by it. Database operations timed by
+metrics.track_query become child spans only inside a traced operation, so
+background loops (outbox relay, partition maintenance) do not start traces.
+
+Finished spans are exported as OTLP/JSON (the OTLP HTTP JSON encoding of
+ExportTraceServiceRequest), either kept in memory for GET /api/traces/{call_id}
+or appended to a file, one request object per line.
+
+Configuration (environment):
+    TRACING_EXPORTER        comma-separated: "memory", "file" (default: none, tracing off)
+    TRACING_FILE            default traces.otlp.jsonl
+    TRACING_FILE_BATCH      spans per written line (default 100)
+    TRACING_MEMORY_TRACES   traces kept by the in-memory collector (default 1000)
+    TRACING_SERVICE_NAME    default medical-bot-api
+"""
+import contextvars
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+@dataclass
+class TracingConfig:
+    exporters: tuple = ()
+    file_path: str = "traces.otlp.jsonl"
+    file_batch: int = 100
+    memory_traces: int = 1000
+    service_name: str = "medical-bot-api"
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ
+        return cls(
+            exporters=tuple(name.strip() for name in env.get("TRACING_EXPORTER", "").split(",") if name.strip()),
+            file_path=env.get("TRACING_FILE", cls.file_path),
+            file_batch=int(env.get("TRACING_FILE_BATCH", cls.file_batch)),
+            memory_traces=int(env.get("TRACING_MEMORY_TRACES", cls.memory_traces)),
+            service_name=env.get("TRACING_SERVICE_NAME", cls.service_name),
+        )
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    trace_id: str
+    span_id: str
+
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+def parse_traceparent(header):
+    """SpanContext from a W3C traceparent header, or None if absent or malformed."""
+    match = _TRACEPARENT.match(header or "")
+    return SpanContext(match.group(1), match.group(2)) if match else None
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+@dataclass
+class Span:
+    name: str
+    context: SpanContext
+    parent_id: str = None
+    kind: int = SPAN_KIND_INTERNAL
+    attributes: dict = field(default_factory=dict)
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = None
+    status: int = STATUS_OK
+    status_message: str = ""
+    tracer: object = field(default=None, repr=False)
+
+    recording = True
+
+    def set_attribute(self, key, value):
+        if value is not None:
+            self.attributes[key] = value
+
+    def record_error(self, error):
+        self.status = STATUS_ERROR
+        self.status_message = f"{error.__class__.__name__}: {error}"
+
+    def end(self, error=None):
+        if self.end_ns is not None:
+            return
+        if error is not None:
+            self.record_error(error)
+        self.end_ns = time.time_ns()
+        if self.tracer is not None:
+            self.tracer.export(self)
+
+    @property
+    def duration_ms(self):
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status, "message": self.status_message},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """Stands in for a span when tracing is off; also its own context manager."""
+
+    recording = False
+    context = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def record_error(self, error):
+        pass
+
+    def end(self, error=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def otlp_request(spans, service_name):
+    """ExportTraceServiceRequest (OTLP/JSON) for a list of finished spans."""
+    return {"resourceSpans": [{
+        "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+        "scopeSpans": [{"scope": {"name": "backend.observability.tracing"},
+                        "spans": [span.to_otlp() for span in spans]}],
+    }]}
+
+
+class InMemoryCollector:
+    """Keeps the most recent traces, indexed by every call_id seen on their spans."""
+
+    def __init__(self, max_traces=1000):
+        self.max_traces = max_traces
+        self._traces = OrderedDict()
+        self._trace_calls = {}
+        self._by_call = {}
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        trace_id = span.context.trace_id
+        call_id = span.attributes.get("call_id")
+        with self._lock:
+            self._traces.setdefault(trace_id, []).append(span)
+            if call_id is not None:
+                self._trace_calls.setdefault(trace_id, set()).add(str(call_id))
+                self._by_call.setdefault(str(call_id), OrderedDict())[trace_id] = None
+            while len(self._traces) > self.max_traces:
+                old_id, _ = self._traces.popitem(last=False)
+                for old_call in self._trace_calls.pop(old_id, ()):
+                    traces = self._by_call.get(old_call)
+                    if traces is not None:
+                        traces.pop(old_id, None)
+                        if not traces:
+                            del self._by_call[old_call]
+
+    def trace_ids_for_call(self, call_id):
+        with self._lock:
+            return list(self._by_call.get(str(call_id), ()))
+
+    def spans(self, trace_id):
+        with self._lock:
+            return sorted(self._traces.get(trace_id, ()), key=lambda span: span.start_ns)
+
+    def flush(self):
+        pass
+
+
+class FileExporter:
+    """Appends finished spans to a file as OTLP/JSON, one request object per batch."""
+
+    def __init__(self, path, service_name, batch_size=100):
+        self.path = path
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        with self._lock:
+            self._pending.append(span)
+            if len(self._pending) < self.batch_size:
+                return
+            batch, self._pending = self._pending, []
+        self._write(batch)
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._write(batch)
+
+    def _write(self, spans):
+        line = json.dumps(otlp_request(spans, self.service_name), separators=(",", ":"))
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class Tracer:
+    def __init__(self, config=None, exporters=None):
+        self.config = config or TracingConfig.from_env()
+        if exporters is None:
+            exporters = []
+            if "memory" in self.config.exporters:
+                exporters.append(InMemoryCollector(self.config.memory_traces))
+            if "file" in self.config.exporters:
+                exporters.append(FileExporter(self.config.file_path, self.config.service_name,
+                                              self.config.file_batch))
+        self.exporters = list(exporters)
+        self.enabled = bool(self.exporters)
+
+    @property
+    def collector(self):
+        """The in-memory collector, if one is configured."""
+        return next((e for e in self.exporters if isinstance(e, InMemoryCollector)), None)
+
+    def begin(self, name, parent=None, kind=SPAN_KIND_INTERNAL, child_only=False, **attributes):
+        """
+        Start a span without making it current; the caller must end() it.
+        parent defaults to the current span. With child_only, nothing is
+        recorded unless there is a parent.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        if parent is None:
+            current = _current_span.get()
+            parent = current.context if current is not None else None
+        if parent is None and child_only:
+            return NOOP_SPAN
+        context = SpanContext(parent.trace_id if parent else secrets.token_hex(16), secrets.token_hex(8))
+        span = Span(name, context, parent.span_id if parent else None, kind, tracer=self)
+        for key, value in attributes.items():
+            span.set_attribute(key, value)
+        return span
+
+    @contextmanager
+    def _scope(self, span):
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def span(self, name, parent=None, kind=SPAN_KIND_INTERNAL, child_only=False, **attributes):
+        """Context manager running its block inside a new current span."""
+        span = self.begin(name, parent, kind, child_only, **attributes)
+        return self._scope(span) if span.recording else NOOP_SPAN
+
+    def export(self, span):
+        for exporter in self.exporters:
+            exporter.export(span)
+
+    def flush(self):
+        for exporter in self.exporters:
+            exporter.flush()
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer()
+    return _tracer
+
+
+def set_tracer(tracer):
+    """Swap the process-wide tracer (e.g. one with an InMemoryCollector in tests)."""
+    global _tracer
+    _tracer = tracer
+
+
+def start_span(name, parent=None, kind=SPAN_KIND_INTERNAL, child_only=False, **attributes):
+    """Shortcut for get_tracer().span(...)."""
+    return get_tracer().span(name, parent, kind, child_only, **attributes)
+
+
+def current_span():
+    """The active span, or a no-op span outside of any trace."""
+    return _current_span.get() or NOOP_SPAN
+
+
+def current_span_context():
+    span = _current_span.get()
+    return span.context if span is not None else None
+
+
+def trace_summary(spans):
+    """Spans of one trace as plain dicts, oldest first, with durations for spotting the slow hop."""
+    if not spans:
+        return None
+    start = min(span.start_ns for span in spans)
+    end = max(span.end_ns or span.start_ns for span in spans)
+    return {
+        "trace_id": spans[0].context.trace_id,
+        "duration_ms": round((end - start) / 1e6, 3),
+        "spans": [{
+            "name": span.name,
+            "span_id": span.context.span_id,
+            "parent_span_id": span.parent_id,
+            "offset_ms": round((span.start_ns - start) / 1e6, 3),
+            "duration_ms": round(span.duration_ms, 3),
+            "status": "error" if span.status == STATUS_ERROR else "ok",
+            "error": span.status_message or None,
+            "attributes": dict(span.attributes),
+        } for span in spans],
+    }
@@ -0,0 +1,37 @@
+"""
+Call Details
+Joins CRM call rows with their transcripts.
+
+However many calls are requested, this costs at most one SQL query (calls
+joined to patients, only for ids not already cached) and one Mongo $in
+query, issued concurrently.
+"""
+import asyncio
+
+from backend.cache.lookups import cached_calls_async
+from backend.transcription.mongodb.repository import get_transcript_repository, serialize_transcript
+
+MAX_BATCH_IDS = 500
+
+
+async def get_call_details(call_ids, include_text=True):
+    """
+    Return a list of call dicts (in the order of call_ids, unknown ids skipped),
+    each with a "transcripts" list. include_text=False leaves transcript_text
+    out of the Mongo projection for list views.
+    """
+    call_ids = list(dict.fromkeys(call_ids))
+    if not call_ids:
+        return []
+    calls, transcripts = await asyncio.gather(
+        cached_calls_async(call_ids),
+        get_transcript_repository().find_by_call_ids(call_ids, include_text=include_text),
+    )
+    details = []
+    for call_id in call_ids:
+        if call_id not in calls:
+            continue
+        call = dict(calls[call_id])  # cached rows are shared; never mutate them
+        call["transcripts"] = [serialize_transcript(doc) for doc in transcripts.get(call_id, [])]
+        details.append(call)
+    return details
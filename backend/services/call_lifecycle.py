@@ -0,0 +1,222 @@
+"""
+Call Lifecycle
+Records a finished call in one PostgreSQL transaction and hands its
+transcript to MongoDB through a transactional outbox.
+
+complete_call() inserts the call with its final status, its status event and
+an outbox row in a single commit, so a crash can never leave a call half
+written. The outbox relay then copies pending transcripts into MongoDB,
+retrying with backoff until Mongo acknowledges them. Mongo writes are upserts
+keyed by outbox_id, so a redelivery after a crash never duplicates a
+transcript. Long transcripts are compressed on the way (storage.py) but always
+kept inline: separately inserted chunks could not be made idempotent.
+
+Delivery is tracked per row: when Mongo rejects some documents of a batch the
+rest are still marked delivered and only the rejected rows back off. A row
+that has failed RELAY_MAX_ATTEMPTS times is dead-lettered (dead_lettered_at
+set, postgres migration 0008) and no longer retried.
+
+Configuration (environment):
+    RELAY_MAX_ATTEMPTS    delivery attempts before a row is dead-lettered (default 10)
+"""
+import asyncio
+import os
+from dataclasses import replace
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from backend.cache.lookups import invalidate_transcripts
+from backend.crm.postgres.pool import get_async_pool
+from backend.observability.metrics import track_query
+from backend.transcription.mongodb.connection import get_collection
+from backend.transcription.mongodb.storage import StorageConfig, encode_transcript
+
+RELAY_BATCH_SIZE = 200
+RELAY_POLL_INTERVAL = 1.0
+RELAY_BACKOFF_MAX_SECONDS = 300
+RELAY_MAX_ATTEMPTS = int(os.environ.get("RELAY_MAX_ATTEMPTS", "10"))
+
+
+def complete_call(conn, patient_id, audio_file_url, transcript_text, language="en",
+                  status="completed", reason=None):
+    """Insert a finished call, its status event and its transcript outbox row. Returns call_id."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT INTO calls (patient_id, audio_file_url, call_status) VALUES (%s, %s, %s) RETURNING call_id;",
+        (patient_id, audio_file_url, status)
+    )
+    call_id = cursor.fetchone()[0]
+    cursor.execute(
+        "INSERT INTO call_status_events (call_id, from_status, to_status, reason) VALUES (%s, NULL, %s, %s);",
+        (call_id, status, reason)
+    )
+    if transcript_text is not None:
+        cursor.execute(
+            "INSERT INTO transcript_outbox (call_id, transcript_text, language) VALUES (%s, %s, %s);",
+            (call_id, transcript_text, language)
+        )
+    cursor.close()
+    return call_id
+
+
+def transition_call_status(conn, call_id, status, reason=None):
+    """
+    Change a call's status and record the transition in the same transaction.
+    Returns the previous status, or raises LookupError if the call does not exist.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT call_status FROM calls WHERE call_id = %s FOR UPDATE;", (call_id,))
+    row = cursor.fetchone()
+    if row is None:
+        cursor.close()
+        raise LookupError(f"No call found with call_id={call_id}")
+    previous = row[0]
+    cursor.execute("UPDATE calls SET call_status = %s WHERE call_id = %s;", (status, call_id))
+    cursor.execute(
+        "INSERT INTO call_status_events (call_id, from_status, to_status, reason) VALUES (%s, %s, %s, %s);",
+        (call_id, previous, status, reason)
+    )
+    cursor.close()
+    return previous
+
+
+def finish_call(conn, call_id, transcript_text, language="en", status="completed", reason=None):
+    """Complete an existing (e.g. pending) call: status transition plus transcript outbox row, one commit."""
+    previous = transition_call_status(conn, call_id, status, reason)
+    if transcript_text is not None:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO transcript_outbox (call_id, transcript_text, language) VALUES (%s, %s, %s);",
+            (call_id, transcript_text, language)
+        )
+        cursor.close()
+    return previous
+
+
+def bulk_write_failures(error, count):
+    """
+    Map a bulk_write exception to {request index: error message}. A
+    BulkWriteError names the rejected requests (the rest were applied);
+    anything else (network, timeout) counts against every request.
+    """
+    if isinstance(error, BulkWriteError):
+        write_errors = error.details.get("writeErrors", [])
+        if write_errors:
+            return {e["index"]: e.get("errmsg", str(error))[:1000] for e in write_errors}
+    return {index: str(error)[:1000] for index in range(count)}
+
+
+def relay_outbox_batch(conn, collection=None, batch_size=RELAY_BATCH_SIZE, max_attempts=RELAY_MAX_ATTEMPTS):
+    """
+    Deliver one batch of pending transcripts to MongoDB.
+    Rows are claimed with FOR UPDATE SKIP LOCKED so several relays can run
+    side by side. Rows Mongo accepted are marked delivered; rejected rows back
+    off, or are dead-lettered once they reach max_attempts.
+    Returns (delivered, failed).
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT outbox_id, call_id, transcript_text, language, "
+        "created_at AT TIME ZONE current_setting('TimeZone'), attempts "
+        "FROM transcript_outbox "
+        "WHERE delivered_at IS NULL AND dead_lettered_at IS NULL AND next_attempt_at <= CURRENT_TIMESTAMP "
+        "ORDER BY outbox_id LIMIT %s FOR UPDATE SKIP LOCKED;",
+        (batch_size,)
+    )
+    rows = cursor.fetchall()
+    if not rows:
+        cursor.close()
+        return 0, 0
+
+    collection = collection if collection is not None else get_collection()
+    storage = replace(StorageConfig.from_env(), chunk_size=0)
+    requests = [
+        UpdateOne(
+            {"outbox_id": outbox_id},
+            {"$setOnInsert": encode_transcript({
+                "outbox_id": outbox_id,
+                "call_id": call_id,
+                "transcript_text": text,
+                "language": language,
+                "created_at": created_at,
+            }, storage)[0]},
+            upsert=True
+        )
+        for outbox_id, call_id, text, language, created_at, _ in rows
+    ]
+    failures = {}
+    try:
+        with track_query("mongodb", "relay_transcripts"):
+            collection.bulk_write(requests, ordered=False)
+    except Exception as e:
+        failures = bulk_write_failures(e, len(rows))
+    delivered = [row for index, row in enumerate(rows) if index not in failures]
+    failed = [(rows[index][0], message) for index, message in sorted(failures.items())]
+    if failed:
+        # The upserts make retrying a row that did reach Mongo harmless.
+        cursor.execute(
+            "UPDATE transcript_outbox o SET attempts = o.attempts + 1, last_error = f.error, "
+            "next_attempt_at = CURRENT_TIMESTAMP + LEAST(POWER(2, o.attempts), %s) * INTERVAL '1 second', "
+            "dead_lettered_at = CASE WHEN o.attempts + 1 >= %s THEN CURRENT_TIMESTAMP END "
+            "FROM unnest(%s::BIGINT[], %s::TEXT[]) AS f(outbox_id, error) "
+            "WHERE o.outbox_id = f.outbox_id "
+            "RETURNING o.outbox_id, o.call_id, o.attempts, o.dead_lettered_at IS NOT NULL;",
+            (RELAY_BACKOFF_MAX_SECONDS, max_attempts, [f[0] for f in failed], [f[1] for f in failed])
+        )
+        for outbox_id, call_id, attempts, dead in cursor.fetchall():
+            if dead:
+                print(f"[DEAD LETTER] outbox_id={outbox_id} call_id={call_id} gave up after {attempts} attempts")
+    if delivered:
+        cursor.execute(
+            "UPDATE transcript_outbox SET delivered_at = CURRENT_TIMESTAMP, attempts = attempts + 1, "
+            "last_error = NULL WHERE outbox_id = ANY(%s);",
+            ([row[0] for row in delivered],)
+        )
+        invalidate_transcripts(*{row[1] for row in delivered})
+    cursor.close()
+    return len(delivered), len(failed)
+
+
+class OutboxRelay:
+    """Background task that drains transcript_outbox into MongoDB."""
+
+    def __init__(self, poll_interval=RELAY_POLL_INTERVAL, batch_size=RELAY_BATCH_SIZE):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.delivered = 0
+        self.failed = 0
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="transcript-outbox-relay")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def notify(self):
+        """Wake the relay early, e.g. right after complete_call() commits."""
+        self._wakeup.set()
+
+    async def _run(self):
+        pool = get_async_pool()
+        while True:
+            try:
+                delivered, failed = await pool.run(relay_outbox_batch, batch_size=self.batch_size)
+            except Exception as e:
+                print(f"Outbox relay error: {e}")
+                delivered, failed = 0, 0
+            self.delivered += delivered
+            self.failed += failed
+            if delivered == self.batch_size:
+                continue  # more backlog waiting
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
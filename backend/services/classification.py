@@ -0,0 +1,216 @@
+"""
+Hot / Non-hot Classification
+Batch job labelling calls from their transcript text and writing the label to
+calls.call_status.
+
+Transcripts still waiting to be classified are streamed from MongoDB in _id
+order, chunk by chunk. Each chunk
+is scored in a worker process: keyword n-gram hits become a sparse
+document x term count matrix, and the score is log(1 + tf) weighted per term
+(a fixed, IDF-like weight from HOT_TERMS). Scores at or above the threshold
+are hot. Labels go back to PostgreSQL with one UPDATE ... FROM (VALUES ...)
+per chunk; a call keeps "hot" once any of its transcripts scored hot, and
+"non-hot" only overwrites an unlabelled status.
+
+Progress is tracked per transcript rather than by an _id checkpoint, which
+would miss transcripts committed late with a smaller _id (buffered writer
+batches, outbox relays) and live transcripts that grow after being scored.
+Once a chunk's labels are committed, each of its transcripts gets
+classified_at, guarded on the updated_at it was scored at; the live append
+(live.py) removes classified_at and bumps updated_at. A run picks up every
+transcript without classified_at (index: mongodb migration 0006), so an
+interrupted run resumes where it stopped and grown transcripts are re-scored.
+
+Usage:
+    python -m backend.services.classification [--chunk-size 2000] [--workers 4]
+        [--threshold 3.0] [--restart]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+from psycopg2.extras import execute_values
+from pymongo import UpdateOne
+
+from backend.cache.lookups import invalidate_calls
+from backend.crm.postgres.pool import connection
+from backend.dispatch.scheduler import HOT, NON_HOT
+from backend.services.transcript_search import tokenize
+from backend.transcription.mongodb.connection import get_collection
+from backend.transcription.mongodb.storage import read_text_sync
+
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_THRESHOLD = float(os.environ.get("HOT_SCORE_THRESHOLD", 3.0))
+
+HOT_TERMS = {
+    "chest pain": 3.0, "shortness of breath": 3.0, "difficulty breathing": 3.0, "can't breathe": 3.0,
+    "unconscious": 3.0, "passed out": 3.0, "fainted": 2.5, "seizure": 3.0, "stroke": 3.0,
+    "heart attack": 3.0, "suicidal": 3.0, "overdose": 3.0, "severe bleeding": 3.0, "bleeding": 2.0,
+    "numbness": 2.0, "slurred speech": 3.0, "severe": 1.5, "emergency": 2.0, "allergic reaction": 2.5,
+    "swelling": 1.0, "high fever": 2.0, "vomiting blood": 3.0, "confusion": 1.5, "worst headache": 2.5,
+    "pregnant": 1.0, "fever": 0.75, "dizziness": 0.75, "vomiting": 0.75,
+}
+
+# Terms are tokenized like transcripts (stopwords dropped), so "shortness of
+# breath" is matched as the bigram ("shortness", "breath").
+VOCABULARY = {}
+for _term, _weight in HOT_TERMS.items():
+    VOCABULARY.setdefault(tuple(tokenize(_term)), (len(VOCABULARY), _weight))
+WEIGHTS = np.zeros(len(VOCABULARY))
+for _index, _weight in VOCABULARY.values():
+    WEIGHTS[_index] = _weight
+MAX_NGRAM = max(len(ngram) for ngram in VOCABULARY)
+TEXT_FIELDS = {"call_id": 1, "updated_at": 1, "transcript_text": 1, "encoding": 1, "body": 1, "chunk_count": 1}
+UNCLASSIFIED = {"classified_at": None}
+
+
+def term_counts(texts):
+    """Sparse hit counts of VOCABULARY n-grams as a dense (len(texts), terms) matrix."""
+    rows, cols = [], []
+    for row, text in enumerate(texts):
+        tokens = tokenize(text or "")
+        for n in range(1, MAX_NGRAM + 1):
+            for start in range(len(tokens) - n + 1):
+                hit = VOCABULARY.get(tuple(tokens[start:start + n]))
+                if hit is not None:
+                    rows.append(row)
+                    cols.append(hit[0])
+    counts = np.zeros((len(texts), len(VOCABULARY)))
+    np.add.at(counts, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), 1)
+    return counts
+
+
+def score_texts(texts):
+    return np.log1p(term_counts(texts)) @ WEIGHTS
+
+
+def classify_chunk(call_ids, texts, threshold):
+    """Worker entry point: one label per call, hot if any of its transcripts is."""
+    labels = {}
+    for call_id, score in zip(call_ids, score_texts(texts)):
+        if score >= threshold:
+            labels[call_id] = HOT
+        else:
+            labels.setdefault(call_id, NON_HOT)
+    return list(labels.items())
+
+
+def write_labels(conn, labels):
+    """Apply one chunk of (call_id, label) pairs in a single UPDATE; returns the changed call ids."""
+    if not labels:
+        return []
+    cursor = conn.cursor()
+    updated = execute_values(
+        cursor,
+        "UPDATE calls AS c SET call_status = v.label "
+        "FROM (VALUES %s) AS v(call_id, label) "
+        "WHERE c.call_id = v.call_id "
+        "AND c.call_status IS DISTINCT FROM v.label "
+        "AND (v.label = 'hot' OR c.call_status IS NULL OR c.call_status NOT IN ('hot', 'non-hot')) "
+        "RETURNING c.call_id;",
+        labels,
+        template="(%s::integer, %s::varchar)",
+        page_size=len(labels),
+        fetch=True
+    )
+    cursor.close()
+    return [row[0] for row in updated]
+
+
+def mark_classified(collection, scored, now=None):
+    """
+    Set classified_at on each (_id, updated_at) scored. A transcript whose
+    updated_at moved since it was read (a live append) is left unmarked, so
+    the next run scores its new text.
+    """
+    now = now or datetime.now(timezone.utc)
+    collection.bulk_write(
+        [UpdateOne({"_id": _id, "updated_at": updated_at}, {"$set": {"classified_at": now}})
+         for _id, updated_at in scored],
+        ordered=False
+    )
+
+
+def iter_chunks(collection, chunk_size):
+    """Yield (scored, call_ids, texts) chunks of unclassified transcripts; scored is [(_id, updated_at)]."""
+    cursor = collection.find(UNCLASSIFIED, TEXT_FIELDS).sort("_id", 1).batch_size(chunk_size)
+    scored, call_ids, texts = [], [], []
+    for doc in cursor:
+        scored.append((doc["_id"], doc.get("updated_at")))
+        call_ids.append(doc["call_id"])
+        texts.append(read_text_sync(collection, doc))
+        if len(call_ids) >= chunk_size:
+            yield scored, call_ids, texts
+            scored, call_ids, texts = [], [], []
+    if call_ids:
+        yield scored, call_ids, texts
+
+
+def run(chunk_size=DEFAULT_CHUNK_SIZE, workers=None, threshold=DEFAULT_THRESHOLD, restart=False):
+    """
+    Classify every transcript without classified_at (all of them with
+    restart). Chunks are scored in parallel; each chunk's transcripts are
+    marked only after its labels are committed.
+    """
+    collection = get_collection()
+    if restart:
+        collection.update_many({"classified_at": {"$exists": True}}, {"$unset": {"classified_at": ""}})
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    done_this_run = 0
+    labelled = 0
+    pending = []
+
+    def apply(future, scored):
+        nonlocal done_this_run, labelled
+        labels = future.result()
+        with connection() as conn:
+            updated = write_labels(conn, labels)
+        invalidate_calls(*updated)
+        mark_classified(collection, scored)
+        done_this_run += len(scored)
+        labelled += len(updated)
+        rate = done_this_run / max(time.perf_counter() - started, 1e-9)
+        print(f"[INFO] {done_this_run} transcripts, {labelled} calls labelled, {rate:,.0f} transcripts/s")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for scored, call_ids, texts in iter_chunks(collection, chunk_size):
+            pending.append((pool.submit(classify_chunk, call_ids, texts, threshold), scored))
+            while len(pending) > workers * 2:
+                apply(*pending.pop(0))
+        while pending:
+            apply(*pending.pop(0))
+
+    elapsed = time.perf_counter() - started
+    return {
+        "transcripts": done_this_run,
+        "labelled": labelled,
+        "seconds": round(elapsed, 3),
+        "transcripts_per_second": round(done_this_run / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Label calls hot / non-hot from their transcripts")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--restart", action="store_true", help="re-score every transcript, not just unclassified ones")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = run(args.chunk_size, args.workers, args.threshold, args.restart)
+    except Exception as e:
+        print(f"[ERROR] Classification failed: {e}")
+        return 1
+    print(f"[SUCCESS] Classified {summary['transcripts']} transcripts in {summary['seconds']}s "
+          f"({summary['transcripts_per_second']} transcripts/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
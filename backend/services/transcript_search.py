@@ -0,0 +1,172 @@
+"""
+Transcript Search
+Ranked full-text search over transcripts, joined back to CRM calls.
+
+Two interchangeable backends:
+    MongoTranscriptSearch   $text query on the transcript_text / search_text
+                            text index (mongodb migration 0007; compressed
+                            transcripts are matched on search_text); stemming
+                            follows each document's search_language
+    InvertedIndexSearch     in-process TF-IDF inverted index for test
+                            environments without MongoDB
+
+Both treat `language` the same way: only transcripts stored with exactly that
+language are returned (Mongo also stems the query for it).
+
+Select with TRANSCRIPT_SEARCH_BACKEND=mongo (default) or memory.
+"""
+import heapq
+import math
+import os
+import re
+from collections import Counter, defaultdict
+
+from backend.cache.lookups import cached_calls_async
+from backend.transcription.mongodb.storage import text_search_language
+
+SNIPPET_CHARS = 160
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_PHRASE = re.compile(r'"([^"]+)"')
+STOPWORDS = frozenset("a an and are as at be but by for from has have i in is it my of on or so the they to was with".split())
+
+
+def tokenize(text):
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def parse_query(q):
+    """Split a query into (terms, phrases); quoted phrases must match exactly, like Mongo $text."""
+    phrases = [p.strip().lower() for p in _PHRASE.findall(q) if p.strip()]
+    terms = tokenize(_PHRASE.sub(" ", q)) + [t for p in phrases for t in tokenize(p)]
+    return list(dict.fromkeys(terms)), phrases
+
+
+def make_snippet(text, terms, width=SNIPPET_CHARS):
+    lowered = text.lower()
+    positions = [lowered.find(t) for t in terms if lowered.find(t) >= 0]
+    start = max(0, min(positions) - width // 4) if positions else 0
+    snippet = text[start:start + width]
+    return ("..." if start else "") + snippet + ("..." if start + width < len(text) else "")
+
+
+class MongoTranscriptSearch:
+    def __init__(self, repository):
+        self.repository = repository
+
+    def index(self, doc):
+        """Mongo maintains its text index on write; nothing to do."""
+
+    async def search(self, q, limit=20, offset=0, language=None):
+        collection = await self.repository.collection()
+        query = {"$text": {"$search": q}}
+        if language:
+            query["$text"]["$language"] = text_search_language(language)
+            query["language"] = language
+        cursor = (
+            collection.find(
+                query,
+                {"call_id": 1, "language": 1, "created_at": 1, "transcript_text": 1, "search_text": 1,
+                 "score": {"$meta": "textScore"}},
+            )
+            .sort([("score", {"$meta": "textScore"})])
+            .skip(offset)
+            .limit(limit + 1)
+        )
+        docs = [doc async for doc in cursor]
+        terms, _ = parse_query(q)
+        hits = [
+            {
+                "transcript_id": str(doc["_id"]),
+                "call_id": doc["call_id"],
+                "language": doc.get("language"),
+                "created_at": doc.get("created_at"),
+                "score": doc["score"],
+                "snippet": make_snippet(doc.get("transcript_text") or doc.get("search_text", ""), terms),
+            }
+            for doc in docs[:limit]
+        ]
+        return hits, len(docs) > limit
+
+
+class InvertedIndexSearch:
+    """TF-IDF over an in-memory inverted index; mirrors MongoTranscriptSearch's results."""
+
+    def __init__(self):
+        self._postings = defaultdict(dict)  # term -> {doc_index: term frequency}
+        self._docs = []
+
+    def __len__(self):
+        return len(self._docs)
+
+    def index(self, doc):
+        doc_index = len(self._docs)
+        text = doc.get("transcript_text") or doc.get("search_text", "")
+        self._docs.append({
+            "transcript_id": str(doc.get("_id", doc_index)),
+            "call_id": doc["call_id"],
+            "language": doc.get("language"),
+            "created_at": doc.get("created_at"),
+            "text": text,
+        })
+        for term, count in Counter(tokenize(text)).items():
+            self._postings[term][doc_index] = count
+
+    async def search(self, q, limit=20, offset=0, language=None):
+        return self.search_sync(q, limit, offset, language)
+
+    def search_sync(self, q, limit=20, offset=0, language=None):
+        terms, phrases = parse_query(q)
+        total = len(self._docs)
+        scores = defaultdict(float)
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + total / len(postings))
+            for doc_index, tf in postings.items():
+                scores[doc_index] += (1 + math.log(tf)) * idf
+
+        def keep(doc_index):
+            doc = self._docs[doc_index]
+            if language and doc["language"] != language:
+                return False
+            return all(p in doc["text"].lower() for p in phrases)
+
+        ranked = heapq.nlargest(
+            offset + limit + 1,
+            ((score, doc_index) for doc_index, score in scores.items() if keep(doc_index)),
+        )
+        page = ranked[offset:offset + limit]
+        hits = []
+        for score, doc_index in page:
+            doc = self._docs[doc_index]
+            hits.append({
+                "transcript_id": doc["transcript_id"],
+                "call_id": doc["call_id"],
+                "language": doc["language"],
+                "created_at": doc["created_at"],
+                "score": score,
+                "snippet": make_snippet(doc["text"], terms),
+            })
+        return hits, len(ranked) > offset + limit
+
+
+def build_search_backend(repository):
+    if os.environ.get("TRANSCRIPT_SEARCH_BACKEND", "mongo") == "memory":
+        return InvertedIndexSearch()
+    return MongoTranscriptSearch(repository)
+
+
+async def search_transcripts(backend, q, limit=20, offset=0, language=None):
+    """Ranked, paginated hits, each joined to its call's status and patient."""
+    hits, has_more = await backend.search(q, limit=limit, offset=offset, language=language)
+    calls = await cached_calls_async(list({hit["call_id"] for hit in hits})) if hits else {}
+    for hit in hits:
+        call = calls.get(hit["call_id"])
+        hit["call"] = None if call is None else {
+            "call_status": call["call_status"],
+            "patient_id": call["patient_id"],
+            "phone_number": call["phone_number"],
+            "created_at": call["created_at"],
+        }
+    return {"results": hits, "limit": limit, "offset": offset, "has_more": has_more}
@@ -1,11 +1,93 @@
+"""
+Transcription DB Connection
+Shared, lazily created MongoDB client for transcription_db.
+
+Nothing connects at import time; the client is built on first use and then
+reused for the life of the process. Configuration comes from the environment:
+
+    TRANSCRIPT_DB_URI                    default mongodb://localhost:27017/
+    TRANSCRIPT_DB_NAME                   default transcription_db
+    TRANSCRIPT_DB_MAX_POOL               max sockets per server (default 100)
+    TRANSCRIPT_DB_MIN_POOL               sockets kept warm (default 0)
+    TRANSCRIPT_DB_SERVER_SELECTION_MS    default 5000
+"""
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
 from pymongo import MongoClient
 
-client = MongoClient("mongodb://localhost:27017/")
-db = client["transcription_db"]
-collection = db["transcripts"]
+from backend.cache.lookups import invalidate_transcripts
+from backend.observability.metrics import track_query
+from backend.transcription.mongodb.storage import insert_encoded_sync
+
+
+@dataclass
+class MongoConfig:
+    uri: str = "mongodb://localhost:27017/"
+    database: str = "transcription_db"
+    collection: str = "transcripts"
+    max_pool_size: int = 100
+    min_pool_size: int = 0
+    server_selection_timeout_ms: int = 5000
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ
+        return cls(
+            uri=env.get("TRANSCRIPT_DB_URI", cls.uri),
+            database=env.get("TRANSCRIPT_DB_NAME", cls.database),
+            max_pool_size=int(env.get("TRANSCRIPT_DB_MAX_POOL", cls.max_pool_size)),
+            min_pool_size=int(env.get("TRANSCRIPT_DB_MIN_POOL", cls.min_pool_size)),
+            server_selection_timeout_ms=int(
+                env.get("TRANSCRIPT_DB_SERVER_SELECTION_MS", cls.server_selection_timeout_ms)
+            ),
+        )
+
+    def client_kwargs(self):
+        return {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+        }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client(config=None):
+    """Return the process-wide MongoClient, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                config = config or MongoConfig.from_env()
+                _client = MongoClient(config.uri, **config.client_kwargs())
+    return _client
+
+
+def get_collection(config=None):
+    config = config or MongoConfig.from_env()
+    return get_client(config)[config.database][config.collection]
+
+
+def close_client():
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
 
-def save_transcript(call_id, text):
-    collection.insert_one({
-        "call_id": call_id,
-        "transcript_text": text
-    })
+def save_transcript(call_id, text, language="en"):
+    with track_query("mongodb", "save_transcript"):
+        inserted_id = insert_encoded_sync(get_collection(), {
+            "call_id": call_id,
+            "transcript_text": text,
+            "language": language,
+            "created_at": datetime.now(timezone.utc)
+        })
+    invalidate_transcripts(call_id)
+    return inserted_id
@@ -0,0 +1,165 @@
+"""
+Live Transcript Ingest
+Appends ordered transcript segments to one transcript document per call while
+the call is in progress.
+
+Segments are numbered by the producer (seq 0, 1, 2, ...). A session buffers
+them and writes each batch with a single update: the text is appended to
+transcript_text and last_seq advances. The update is guarded on last_seq, so
+a batch that was already applied (a retry after a lost acknowledgement, or a
+second producer) is a no-op and never duplicates text. After reconnecting, a
+producer reads last_seq (the resume point) and resends everything after it.
+
+The live document is {"call_id", "source": "live", "transcript_text",
+"language", "search_language", "last_seq", "created_at", "updated_at"}
+(search_language as in storage.py); MongoDB migration 0005
+keeps one per call. It stays a plain-text document (not compressed) so it can
+be appended to in place.
+
+Configuration (environment):
+    LIVE_TRANSCRIPT_FLUSH_SEGMENTS    flush after this many buffered segments (default 20)
+    LIVE_TRANSCRIPT_FLUSH_MS          flush when the oldest buffered segment is this old (default 500)
+"""
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from pymongo import ReturnDocument
+
+from backend.cache.lookups import invalidate_transcripts
+from backend.observability.metrics import track_query
+from backend.transcription.mongodb.storage import text_search_language
+
+LIVE_SOURCE = "live"
+
+
+@dataclass
+class LiveIngestConfig:
+    flush_segments: int = 20
+    flush_interval: float = 0.5
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ
+        return cls(
+            flush_segments=int(env.get("LIVE_TRANSCRIPT_FLUSH_SEGMENTS", cls.flush_segments)),
+            flush_interval=int(env.get("LIVE_TRANSCRIPT_FLUSH_MS", cls.flush_interval * 1000)) / 1000,
+        )
+
+
+class SegmentOutOfOrder(Exception):
+    """Raised when a segment skips ahead of the next expected seq."""
+
+
+class MalformedFrame(ValueError):
+    """Raised for a websocket frame that is not a JSON object."""
+
+
+def decode_frame(raw):
+    """Parse one text frame from the producer; raises MalformedFrame unless it is a JSON object."""
+    try:
+        message = json.loads(raw)
+    except (TypeError, ValueError) as e:
+        raise MalformedFrame(f"Frame is not valid JSON: {e}") from None
+    if not isinstance(message, dict):
+        raise MalformedFrame("Expected a JSON object")
+    return message
+
+
+def _append_pipeline(first_seq, last_seq, text, language, now):
+    """Update pipeline appending text only if the batch starts right after last_seq."""
+    current = {"$ifNull": ["$transcript_text", ""]}
+    applies = {"$eq": [{"$ifNull": ["$last_seq", -1]}, first_seq - 1]}
+    separator = {"$cond": [{"$gt": [{"$strLenCP": current}, 0]}, " ", ""]}
+    return [{"$set": {
+        "source": LIVE_SOURCE,
+        "language": {"$ifNull": ["$language", language]},
+        "search_language": {"$ifNull": ["$search_language", text_search_language(language)]},
+        "created_at": {"$ifNull": ["$created_at", now]},
+        "transcript_text": {"$cond": [applies, {"$concat": [current, separator, text]}, current]},
+        "updated_at": {"$cond": [applies, now, "$updated_at"]},
+        # New text needs scoring again (classification.py).
+        "classified_at": {"$cond": [applies, "$$REMOVE", "$classified_at"]},
+        "last_seq": {"$cond": [applies, last_seq, {"$ifNull": ["$last_seq", -1]}]},
+    }}]
+
+
+class LiveTranscriptSession:
+    def __init__(self, collection, call_id, language="en", config=None):
+        self.collection = collection
+        self.call_id = call_id
+        self.language = language
+        self.config = config or LiveIngestConfig.from_env()
+        self.last_seq = -1
+        self._segments = []
+        self._oldest = None
+
+    async def resume(self):
+        """Load the persisted last_seq; returns the resume point (-1 when nothing is stored)."""
+        with track_query("mongodb", "resume_live_transcript"):
+            doc = await self.collection.find_one(
+                {"call_id": self.call_id, "source": LIVE_SOURCE}, {"last_seq": 1}
+            )
+        self.last_seq = doc["last_seq"] if doc else -1
+        return self.last_seq
+
+    @property
+    def next_seq(self):
+        return self.last_seq + len(self._segments) + 1
+
+    def add(self, seq, text):
+        """
+        Buffer one segment. Returns False for a duplicate (already stored or
+        buffered), raises SegmentOutOfOrder on a gap.
+        """
+        if seq < self.next_seq:
+            return False
+        if seq > self.next_seq:
+            raise SegmentOutOfOrder(f"Expected seq {self.next_seq}, got {seq}")
+        if not self._segments:
+            self._oldest = time.monotonic()
+        self._segments.append(text)
+        return True
+
+    def should_flush(self):
+        return len(self._segments) >= self.config.flush_segments or (
+            self._segments and self.time_until_flush() <= 0
+        )
+
+    def time_until_flush(self):
+        """Seconds until the buffered batch is due, or None when nothing is buffered."""
+        if not self._segments:
+            return None
+        return self._oldest + self.config.flush_interval - time.monotonic()
+
+    async def flush(self):
+        """Append the buffered segments in one update; returns the acknowledged last_seq."""
+        if not self._segments:
+            return self.last_seq
+        first_seq = self.last_seq + 1
+        last_seq = first_seq + len(self._segments) - 1
+        with track_query("mongodb", "append_live_segments"):
+            doc = await self.collection.find_one_and_update(
+                {"call_id": self.call_id, "source": LIVE_SOURCE},
+                _append_pipeline(first_seq, last_seq, " ".join(self._segments), self.language,
+                                 datetime.now(timezone.utc)),
+                projection={"last_seq": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        self._segments = []
+        self._oldest = None
+        # If another writer got further first, adopt its position rather than ours.
+        self.last_seq = doc["last_seq"]
+        invalidate_transcripts(self.call_id)
+        return self.last_seq
+
+    async def finish(self):
+        last_seq = await self.flush()
+        await self.collection.update_one(
+            {"call_id": self.call_id, "source": LIVE_SOURCE},
+            {"$set": {"completed_at": datetime.now(timezone.utc)}}
+        )
+        return last_seq
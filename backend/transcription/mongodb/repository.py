@@ -0,0 +1,150 @@
+"""
+Async Transcript Repository
+Non-blocking access to the transcripts collection for the FastAPI app.
+
+One AsyncMongoClient is shared by every request. It is created lazily on the
+first awaited operation (so it binds to the running event loop) and its
+connection pool is sized from MongoConfig (TRANSCRIPT_DB_MAX_POOL /
+TRANSCRIPT_DB_MIN_POOL).
+
+Long transcripts are stored compressed and possibly chunked (see storage.py).
+Reads that include text return the legacy shape with a plain transcript_text;
+metadata-only reads project the body out and never fetch it.
+"""
+import asyncio
+from datetime import datetime, timezone
+
+from pymongo import AsyncMongoClient, DESCENDING
+
+from backend.cache.lookups import invalidate_transcripts
+from backend.observability.metrics import track_query
+from backend.transcription.mongodb.connection import MongoConfig
+from backend.transcription.mongodb.storage import (
+    METADATA_PROJECTION,
+    StorageConfig,
+    insert_encoded,
+    iter_text,
+    materialize,
+)
+
+
+def serialize_transcript(doc):
+    """Make a transcript document JSON friendly (ObjectId and datetime to strings)."""
+    if doc is None:
+        return None
+    doc = dict(doc)
+    if "_id" in doc:
+        doc["_id"] = str(doc["_id"])
+    if isinstance(doc.get("created_at"), datetime):
+        doc["created_at"] = doc["created_at"].isoformat()
+    return doc
+
+
+class TranscriptRepository:
+    def __init__(self, config=None):
+        self.config = config or MongoConfig.from_env()
+        self.storage = StorageConfig.from_env()
+        self._client = None
+        self._lock = asyncio.Lock()
+
+    async def collection(self):
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    self._client = AsyncMongoClient(self.config.uri, **self.config.client_kwargs())
+        return self._client[self.config.database][self.config.collection]
+
+    @property
+    def connected(self):
+        return self._client is not None
+
+    def pool_config(self):
+        return {
+            "max_pool_size": self.config.max_pool_size,
+            "min_pool_size": self.config.min_pool_size,
+            "server_selection_timeout_ms": self.config.server_selection_timeout_ms,
+        }
+
+    async def insert(self, call_id, transcript_text, language="en"):
+        collection = await self.collection()
+        with track_query("mongodb", "save_transcript"):
+            inserted_id = await insert_encoded(collection, {
+                "call_id": call_id,
+                "transcript_text": transcript_text,
+                "language": language,
+                "created_at": datetime.now(timezone.utc)
+            }, self.storage)
+        invalidate_transcripts(call_id)
+        return inserted_id
+
+    async def find_by_call_id(self, call_id, include_text=True):
+        collection = await self.collection()
+        projection = None if include_text else METADATA_PROJECTION
+        with track_query("mongodb", "find_by_call_id"):
+            cursor = collection.find({"call_id": call_id}, projection).sort("created_at", 1)
+            docs = [doc async for doc in cursor]
+            if include_text:
+                docs = [await materialize(collection, doc) for doc in docs]
+        return docs
+
+    async def find_by_call_ids(self, call_ids, include_text=True):
+        """All transcripts for several calls in one $in query, grouped by call_id."""
+        collection = await self.collection()
+        projection = None if include_text else METADATA_PROJECTION
+        grouped = {call_id: [] for call_id in call_ids}
+        with track_query("mongodb", "find_by_call_ids"):
+            cursor = collection.find({"call_id": {"$in": list(call_ids)}}, projection).sort(
+                [("call_id", 1), ("created_at", 1)]
+            )
+            async for doc in cursor:
+                if include_text:
+                    doc = await materialize(collection, doc)
+                grouped.setdefault(doc["call_id"], []).append(doc)
+        return grouped
+
+    async def latest_for_call(self, call_id):
+        collection = await self.collection()
+        with track_query("mongodb", "latest_for_call"):
+            doc = await collection.find_one({"call_id": call_id}, sort=[("created_at", DESCENDING)])
+            return None if doc is None else await materialize(collection, doc)
+
+    async def get_metadata(self, transcript_id):
+        """One transcript without its body (text_length, encoding, chunk_count, ...)."""
+        collection = await self.collection()
+        with track_query("mongodb", "get_transcript_metadata"):
+            return await collection.find_one({"_id": transcript_id}, METADATA_PROJECTION)
+
+    async def stream_text(self, transcript_id):
+        """
+        Async iterator over one transcript's text, decompressing chunk by chunk.
+        Raises LookupError if the transcript does not exist.
+        """
+        collection = await self.collection()
+        with track_query("mongodb", "get_transcript_metadata"):
+            doc = await collection.find_one({"_id": transcript_id}, METADATA_PROJECTION)
+        if doc is None:
+            raise LookupError(f"Transcript {transcript_id} not found")
+        return iter_text(collection, doc)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+_repository = None
+
+
+def get_transcript_repository():
+    """Return the process-wide repository (no connection is made until first use)."""
+    global _repository
+    if _repository is None:
+        _repository = TranscriptRepository()
+    return _repository
+
+
+async def close_transcript_repository():
+    global _repository
+    if _repository is not None:
+        await _repository.close()
+    _repository = None
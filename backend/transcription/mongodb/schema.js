@@ -4,3 +4,6 @@
   language: String,
   created_at: Date
 }
+
+// Indexes are managed by backend/migrations (mongodb/*.json), e.g.
+// db.transcripts.createIndex({ call_id: 1, created_at: 1 })
@@ -0,0 +1,228 @@
+"""
+Transcript Storage Format
+Compression and chunking for long transcripts.
+
+    short text     stored as before: {"transcript_text": "..."}
+    long text      compressed into {"encoding": "zlib"|"zstd", "body": Binary}
+    very long text compressed stream split into ordered documents in the
+                   transcript_chunks collection ({transcript_id, seq, data});
+                   the transcript keeps {"encoding", "chunk_count"}
+
+Every transcript also records text_length (characters). Compressed ones keep
+the first TRANSCRIPT_SEARCH_CHARS characters in plain search_text, which the
+text index (mongodb migration 0007) covers alongside transcript_text, so long
+transcripts stay searchable. The index stems each document by search_language,
+the stored language mapped onto one MongoDB text search supports ("none" for
+the rest), so a transcript in any language can be written. Readers stream chunks
+lazily and decompress them incrementally, so a long transcript is never held
+compressed and decompressed in memory at once, and metadata-only reads
+(METADATA_PROJECTION) never transfer the body at all.
+
+Configuration (environment):
+    TRANSCRIPT_CODEC                 zstd (needs the zstandard package) or zlib (default)
+    TRANSCRIPT_COMPRESS_THRESHOLD    bytes of UTF-8 text before compressing (default 4096)
+    TRANSCRIPT_CHUNK_SIZE            compressed bytes per chunk document (default 262144,
+                                     0 keeps every body inline)
+    TRANSCRIPT_SEARCH_CHARS          characters of a compressed transcript kept searchable
+                                     (default 100000)
+"""
+import codecs
+import os
+import zlib
+from dataclasses import dataclass
+
+from bson import Binary, ObjectId
+
+try:
+    import zstandard
+except ImportError:  # optional: zlib is always available
+    zstandard = None
+
+CHUNKS_COLLECTION = "transcript_chunks"
+# Languages MongoDB text indexes can stem, by ISO 639-1 code.
+TEXT_SEARCH_LANGUAGES = {
+    "da": "danish", "nl": "dutch", "en": "english", "fi": "finnish", "fr": "french",
+    "de": "german", "hu": "hungarian", "it": "italian", "nb": "norwegian", "no": "norwegian",
+    "pt": "portuguese", "ro": "romanian", "ru": "russian", "es": "spanish", "sv": "swedish",
+    "tr": "turkish",
+}
+METADATA_PROJECTION = {"transcript_text": 0, "body": 0, "search_text": 0}
+STORAGE_FIELDS = ("encoding", "body", "chunk_count", "search_text")
+
+
+@dataclass
+class StorageConfig:
+    codec: str = "zlib"
+    compress_threshold: int = 4096
+    chunk_size: int = 256 * 1024
+    search_chars: int = 100_000
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ
+        codec = env.get("TRANSCRIPT_CODEC", cls.codec)
+        if codec == "zstd" and zstandard is None:
+            codec = "zlib"
+        return cls(
+            codec=codec,
+            compress_threshold=int(env.get("TRANSCRIPT_COMPRESS_THRESHOLD", cls.compress_threshold)),
+            chunk_size=int(env.get("TRANSCRIPT_CHUNK_SIZE", cls.chunk_size)),
+            search_chars=int(env.get("TRANSCRIPT_SEARCH_CHARS", cls.search_chars)),
+        )
+
+
+def text_search_language(language):
+    """
+    The text-search language for a transcript language ("en", "pt-BR",
+    "french"); "none" (no stemming, no stop words) when MongoDB does not
+    support it, e.g. "ta" or "hi-IN".
+    """
+    code = (language or "").strip().lower().replace("_", "-").split("-")[0]
+    if code in TEXT_SEARCH_LANGUAGES.values():
+        return code
+    return TEXT_SEARCH_LANGUAGES.get(code, "none")
+
+
+def compress(data, codec):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    return zlib.compress(data, 6)
+
+
+def decompressor(codec):
+    """Incremental decompressor exposing .decompress(chunk)."""
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-encoded transcripts")
+        return zstandard.ZstdDecompressor().decompressobj()
+    return zlib.decompressobj()
+
+
+def encode_transcript(doc, config=None):
+    """
+    Turn a transcript document with plain transcript_text into its stored
+    form. Returns (doc, chunks); chunks lack transcript_id until the caller
+    knows the transcript's _id (see attach_chunks).
+    """
+    config = config or StorageConfig.from_env()
+    doc = dict(doc)
+    text = doc.pop("transcript_text")
+    raw = text.encode("utf-8")
+    doc["text_length"] = len(text)
+    doc["search_language"] = text_search_language(doc.get("language"))
+    if len(raw) < config.compress_threshold:
+        doc["transcript_text"] = text
+        return doc, []
+    packed = compress(raw, config.codec)
+    doc["encoding"] = config.codec
+    doc["search_text"] = text[:config.search_chars]
+    if not config.chunk_size or len(packed) <= config.chunk_size:
+        doc["body"] = Binary(packed)
+        return doc, []
+    chunks = [
+        {"seq": seq, "data": Binary(packed[start:start + config.chunk_size])}
+        for seq, start in enumerate(range(0, len(packed), config.chunk_size))
+    ]
+    doc["chunk_count"] = len(chunks)
+    return doc, chunks
+
+
+def attach_chunks(transcript_id, chunks):
+    return [dict(chunk, transcript_id=transcript_id) for chunk in chunks]
+
+
+def is_encoded(doc):
+    return "encoding" in doc
+
+
+def _decode_pieces(codec, pieces):
+    inflate = decompressor(codec)
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    for piece in pieces:
+        out = text_decoder.decode(inflate.decompress(bytes(piece)))
+        if out:
+            yield out
+    tail = text_decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def chunks_collection(collection):
+    """The chunk collection living next to a transcripts collection."""
+    return collection.database[CHUNKS_COLLECTION]
+
+
+async def iter_text(collection, doc):
+    """
+    Async iterator over a stored transcript's text. Chunks are fetched in seq
+    order through one cursor and decompressed as they arrive. doc may be a
+    metadata-only projection; the body is then fetched on demand.
+    """
+    if not is_encoded(doc):
+        if "transcript_text" not in doc:
+            doc = await collection.find_one({"_id": doc["_id"]}, {"transcript_text": 1})
+        yield doc["transcript_text"]
+        return
+    if "chunk_count" not in doc:
+        if "body" not in doc:
+            doc = dict(doc, **await collection.find_one({"_id": doc["_id"]}, {"body": 1}))
+        for piece in _decode_pieces(doc["encoding"], [doc["body"]]):
+            yield piece
+        return
+    inflate = decompressor(doc["encoding"])
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    cursor = chunks_collection(collection).find({"transcript_id": doc["_id"]}, {"data": 1}).sort("seq", 1)
+    async for chunk in cursor:
+        out = text_decoder.decode(inflate.decompress(bytes(chunk["data"])))
+        if out:
+            yield out
+    tail = text_decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def read_text(collection, doc):
+    return "".join([piece async for piece in iter_text(collection, doc)])
+
+
+async def materialize(collection, doc):
+    """Return doc in the legacy shape: plain transcript_text, no storage fields."""
+    if not is_encoded(doc):
+        return doc
+    text = await read_text(collection, doc)
+    doc = {k: v for k, v in doc.items() if k not in STORAGE_FIELDS}
+    doc["transcript_text"] = text
+    return doc
+
+
+async def insert_encoded(collection, doc, config=None):
+    """
+    Insert one transcript in stored form. Chunks go in first so the transcript
+    never becomes visible before its body is complete.
+    """
+    doc, chunks = encode_transcript(doc, config)
+    doc.setdefault("_id", ObjectId())
+    if chunks:
+        await chunks_collection(collection).insert_many(attach_chunks(doc["_id"], chunks), ordered=True)
+    await collection.insert_one(doc)
+    return doc["_id"]
+
+
+def insert_encoded_sync(collection, doc, config=None):
+    """Blocking counterpart of insert_encoded for the sync MongoClient."""
+    doc, chunks = encode_transcript(doc, config)
+    doc.setdefault("_id", ObjectId())
+    if chunks:
+        chunks_collection(collection).insert_many(attach_chunks(doc["_id"], chunks), ordered=True)
+    collection.insert_one(doc)
+    return doc["_id"]
+
+
+def read_text_sync(collection, doc):
+    """Blocking counterpart of read_text for scripts using the sync client."""
+    if not is_encoded(doc):
+        return doc["transcript_text"]
+    if "chunk_count" not in doc:
+        return "".join(_decode_pieces(doc["encoding"], [doc["body"]]))
+    cursor = chunks_collection(collection).find({"transcript_id": doc["_id"]}, {"data": 1}).sort("seq", 1)
+    return "".join(_decode_pieces(doc["encoding"], (chunk["data"] for chunk in cursor)))
@@ -0,0 +1,164 @@
+"""
+Buffered Transcript Writer
+Collects transcript documents in memory and writes them with one unordered
+insert_many per flush instead of one insert_one round trip per transcript.
+
+A flush happens when the buffer reaches max_docs documents, max_bytes of BSON,
+or when the oldest buffered document has waited max_interval seconds, whichever
+comes first. Every write() returns a future that resolves to the document's
+_id once Mongo acknowledges it (or raises that document's write error), so
+callers can still await durability.
+
+Documents are encoded with storage.encode_transcript before buffering, so long
+transcripts are compressed; chunk documents for very long ones are inserted
+ahead of the flush's transcripts, and a transcript whose chunks failed is
+failed rather than written without its body.
+
+Configuration (environment):
+    TRANSCRIPT_WRITER_MAX_DOCS       default 500
+    TRANSCRIPT_WRITER_MAX_BYTES      default 4 MiB
+    TRANSCRIPT_WRITER_INTERVAL_MS    default 50
+"""
+import asyncio
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import bson
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from backend.cache.lookups import invalidate_transcripts
+from backend.observability.metrics import track_query
+from backend.observability.tracing import get_tracer
+from backend.transcription.mongodb.storage import (
+    StorageConfig,
+    attach_chunks,
+    chunks_collection,
+    encode_transcript,
+)
+
+
+@dataclass
+class WriterConfig:
+    max_docs: int = 500
+    max_bytes: int = 4 * 1024 * 1024
+    max_interval: float = 0.05
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ
+        return cls(
+            max_docs=int(env.get("TRANSCRIPT_WRITER_MAX_DOCS", cls.max_docs)),
+            max_bytes=int(env.get("TRANSCRIPT_WRITER_MAX_BYTES", cls.max_bytes)),
+            max_interval=int(env.get("TRANSCRIPT_WRITER_INTERVAL_MS", cls.max_interval * 1000)) / 1000,
+        )
+
+
+class WriterClosed(Exception):
+    """Raised when writing to a writer that has been closed."""
+
+
+class BufferedTranscriptWriter:
+    def __init__(self, get_collection, config=None, storage=None):
+        """
+        get_collection: coroutine function returning the async transcripts
+        collection (e.g. TranscriptRepository.collection).
+        """
+        self._get_collection = get_collection
+        self.config = config or WriterConfig.from_env()
+        self.storage = storage or StorageConfig.from_env()
+        self._docs = []
+        self._chunks = []
+        self._futures = []
+        self._bytes = 0
+        self._timer = None
+        self._flushes = set()
+        self._closed = False
+        self.stats = {"documents": 0, "flushes": 0, "errors": 0}
+
+    def write(self, doc):
+        """Buffer a document and return a future for its inserted _id."""
+        if self._closed:
+            raise WriterClosed("Transcript writer is closed")
+        loop = asyncio.get_running_loop()
+        doc, chunks = encode_transcript(doc, self.storage)
+        doc.setdefault("_id", ObjectId())
+        doc.setdefault("created_at", datetime.now(timezone.utc))
+        future = loop.create_future()
+        span = get_tracer().begin("save_transcript", child_only=True, call_id=doc.get("call_id"))
+        if span.recording:
+            # Covers buffering and the batched insert, as seen by this caller.
+            future.add_done_callback(lambda f: span.end(None if f.cancelled() else f.exception()))
+        self._docs.append(doc)
+        self._chunks.append(attach_chunks(doc["_id"], chunks))
+        self._futures.append(future)
+        self._bytes += len(bson.encode(doc)) + sum(len(chunk["data"]) for chunk in chunks)
+        if len(self._docs) >= self.config.max_docs or self._bytes >= self.config.max_bytes:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.config.max_interval, self._start_flush)
+        return future
+
+    def save_transcript(self, call_id, transcript_text, language="en"):
+        return self.write({
+            "call_id": call_id,
+            "transcript_text": transcript_text,
+            "language": language,
+        })
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._docs:
+            return
+        docs, chunks, futures = self._docs, self._chunks, self._futures
+        self._docs, self._chunks, self._futures, self._bytes = [], [], [], 0
+        task = asyncio.get_running_loop().create_task(self._insert(docs, chunks, futures))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _insert(self, docs, chunks, futures):
+        failed = {}
+        try:
+            with track_query("mongodb", "save_transcript_batch"):
+                collection = await self._get_collection()
+                chunked = [i for i, doc_chunks in enumerate(chunks) if doc_chunks]
+                if chunked:
+                    try:
+                        await chunks_collection(collection).insert_many(
+                            [chunk for i in chunked for chunk in chunks[i]], ordered=False
+                        )
+                    except Exception as e:
+                        failed = {i: e for i in chunked}
+                pending = [i for i in range(len(docs)) if i not in failed]
+                if pending:
+                    try:
+                        await collection.insert_many([docs[i] for i in pending], ordered=False)
+                    except BulkWriteError as e:
+                        for error in e.details.get("writeErrors", []):
+                            failed[pending[error["index"]]] = BulkWriteError({"writeErrors": [error]})
+        except Exception as e:
+            failed = {i: e for i in range(len(docs))}
+        self.stats["flushes"] += 1
+        self.stats["documents"] += len(docs) - len(failed)
+        self.stats["errors"] += len(failed)
+        invalidate_transcripts(*{doc["call_id"] for i, doc in enumerate(docs) if i not in failed})
+        for i, (doc, future) in enumerate(zip(docs, futures)):
+            if future.done():
+                continue
+            if i in failed:
+                future.set_exception(failed[i])
+            else:
+                future.set_result(doc["_id"])
+
+    async def flush(self):
+        """Write everything buffered so far and wait for all in-flight flushes."""
+        self._start_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    async def close(self):
+        self._closed = True
+        await self.flush()
@@ -0,0 +1,223 @@
+"""
+Synthetic Data Generator
+Bulk-loads realistic volumes into crm_db and transcription_db for index and
+query work (see benchmarks/query_scale.py).
+
+    patients      unique +1 phone numbers, created over the time window
+    calls         per patient counts skewed toward a few frequent callers;
+                  statuses weighted like production (mostly completed,
+                  roughly 1 in 12 hot) and timestamps following office hours
+    transcripts   one per call for --transcript-ratio of calls, log-normal
+                  length (median ~250 words), stored through the transcript
+                  storage format so long ones are compressed/chunked
+
+Everything goes through bulk paths: COPY with ids reserved from the table
+sequences, per-transaction suppression of call notifications, and unordered
+insert_many for MongoDB. Missing monthly partitions of calls are created first.
+
+Usage:
+    python benchmarks/generate_data.py --patients 100000 --calls 1000000 [--days 180]
+        [--transcript-ratio 0.9] [--batch-size 10000] [--seed 7]
+"""
+import argparse
+import io
+import math
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from bson import ObjectId
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.crm.postgres.partitions import add_months, is_partitioned
+from backend.crm.postgres.pool import connection
+from backend.transcription.mongodb.connection import get_collection
+from backend.transcription.mongodb.storage import (
+    StorageConfig,
+    attach_chunks,
+    chunks_collection,
+    encode_transcript,
+)
+
+STATUS_WEIGHTS = {"completed": 55, "non-hot": 20, "hot": 8, "failed": 10, "pending": 7}
+# Relative call volume per hour of day (local time), peaking mid-morning.
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 2, 4, 8, 14, 18, 18, 16, 13, 14, 15, 14, 12, 10, 8, 6, 5, 3, 2, 1]
+SYMPTOMS = [
+    "fever", "chest pain", "headache", "cough", "shortness of breath", "nausea", "dizziness",
+    "back pain", "sore throat", "fatigue", "rash", "vomiting", "abdominal pain", "chills",
+]
+FILLER = (
+    "patient says they have been feeling unwell since yesterday and would like to see a doctor "
+    "the symptoms started slowly and got worse during the night no known allergies currently "
+    "taking medication for blood pressure asked about appointment availability this week "
+    "agent confirmed the address and phone number and explained next steps"
+).split()
+
+
+def csv_field(value):
+    if value is None:
+        return ""
+    text = value.isoformat(sep=" ") if isinstance(value, datetime) else str(value)
+    return '"' + text.replace('"', '""') + '"'
+
+
+def copy_rows(cursor, table, columns, rows):
+    buf = io.StringIO()
+    for row in rows:
+        buf.write(",".join(csv_field(v) for v in row) + "\n")
+    buf.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf)
+
+
+def reserve_ids(cursor, table, column, count):
+    cursor.execute(
+        f"SELECT nextval(pg_get_serial_sequence('{table}', '{column}')) FROM generate_series(1, %s);",
+        (count,)
+    )
+    return [r[0] for r in cursor.fetchall()]
+
+
+def random_time(rng, start, days):
+    day = start + timedelta(days=rng.randrange(days))
+    hour = rng.choices(range(24), HOUR_WEIGHTS)[0]
+    return day + timedelta(hours=hour, seconds=rng.randrange(3600))
+
+
+def synthetic_transcript(rng):
+    words = max(20, int(rng.lognormvariate(math.log(250), 0.8)))
+    text = rng.choices(FILLER, k=words)
+    for symptom in rng.sample(SYMPTOMS, rng.randint(1, 3)):
+        text.insert(rng.randrange(len(text) + 1), symptom)
+    return " ".join(text)
+
+
+def ensure_history_partitions(conn, start, end):
+    if not is_partitioned(conn):
+        return
+    cursor = conn.cursor()
+    month = start.replace(day=1)
+    while month <= end:
+        cursor.execute("SELECT create_calls_partition(%s);", (month,))
+        month = add_months(month, 1)
+    cursor.close()
+
+
+def load_patients(count, start, days, batch_size, rng):
+    patient_ids = []
+    base = rng.randrange(10 ** 6)
+    for offset in range(0, count, batch_size):
+        size = min(batch_size, count - offset)
+        with connection() as conn:
+            cursor = conn.cursor()
+            ids = reserve_ids(cursor, "patients", "patient_id", size)
+            rows = []
+            for i, patient_id in enumerate(ids):
+                phone = f"+1{(base + offset + i) % 10 ** 10:010d}"
+                rows.append((patient_id, phone, phone, random_time(rng, start, days)))
+            copy_rows(cursor, "patients", ("patient_id", "phone_number", "phone_normalized", "created_at"), rows)
+            cursor.close()
+        patient_ids.extend(ids)
+    return patient_ids
+
+
+def load_calls(count, patient_ids, start, days, batch_size, rng):
+    """Returns [(call_id, created_at)] for the transcript pass."""
+    statuses, weights = zip(*STATUS_WEIGHTS.items())
+    # Pareto-distributed caller activity: a few patients call far more often.
+    activity = [rng.paretovariate(1.2) for _ in patient_ids]
+    calls = []
+    for offset in range(0, count, batch_size):
+        size = min(batch_size, count - offset)
+        callers = rng.choices(patient_ids, activity, k=size)
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SET LOCAL calls.notify = 'off';")
+            ids = reserve_ids(cursor, "calls", "call_id", size)
+            rows = [
+                (call_id, patient_id, None, rng.choices(statuses, weights)[0], random_time(rng, start, days))
+                for call_id, patient_id in zip(ids, callers)
+            ]
+            copy_rows(cursor, "calls", ("call_id", "patient_id", "audio_file_url", "call_status", "created_at"), rows)
+            cursor.close()
+        calls.extend((row[0], row[4]) for row in rows)
+    return calls
+
+
+def load_transcripts(calls, ratio, batch_size, rng):
+    collection = get_collection()
+    storage = StorageConfig.from_env()
+    inserted = 0
+    batch, chunks = [], []
+    for call_id, created_at in calls:
+        if rng.random() >= ratio:
+            continue
+        doc, doc_chunks = encode_transcript({
+            "call_id": call_id,
+            "transcript_text": synthetic_transcript(rng),
+            "language": "en",
+            "created_at": created_at + timedelta(minutes=rng.randint(2, 30)),
+        }, storage)
+        doc["_id"] = ObjectId()
+        batch.append(doc)
+        chunks.extend(attach_chunks(doc["_id"], doc_chunks))
+        if len(batch) >= batch_size:
+            inserted += flush_transcripts(collection, batch, chunks)
+            batch, chunks = [], []
+    if batch:
+        inserted += flush_transcripts(collection, batch, chunks)
+    return inserted
+
+
+def flush_transcripts(collection, docs, chunks):
+    # Chunks first, as in storage.insert_encoded: no transcript is visible without its body.
+    if chunks:
+        chunks_collection(collection).insert_many(chunks, ordered=False)
+    return len(collection.insert_many(docs, ordered=False).inserted_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=10000)
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=180, help="spread records over the last N days")
+    parser.add_argument("--transcript-ratio", type=float, default=0.9)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    end = datetime.now().replace(minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=args.days)
+    timings = {}
+    try:
+        with connection() as conn:
+            ensure_history_partitions(conn, start.date(), date.today())
+
+        started = time.perf_counter()
+        patient_ids = load_patients(args.patients, start, args.days, args.batch_size, rng)
+        timings["patients"] = (len(patient_ids), time.perf_counter() - started)
+
+        started = time.perf_counter()
+        calls = load_calls(args.calls, patient_ids, start, args.days, args.batch_size, rng)
+        timings["calls"] = (len(calls), time.perf_counter() - started)
+
+        started = time.perf_counter()
+        transcripts = load_transcripts(calls, args.transcript_ratio, min(args.batch_size, 5000), rng)
+        timings["transcripts"] = (transcripts, time.perf_counter() - started)
+    except Exception as e:
+        print(f"[ERROR] Data generation failed: {e}")
+        return 1
+
+    print("=" * 60)
+    print(f"Synthetic data over the last {args.days} days (seed {args.seed})")
+    print("=" * 60)
+    for name, (count, seconds) in timings.items():
+        print(f"{name:<12} {count:>10,} rows in {seconds:7.1f}s  ({count / max(seconds, 1e-9):>10,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
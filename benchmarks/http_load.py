@@ -0,0 +1,282 @@
+"""
+HTTP Load Benchmark
+Drives the API's endpoints at a fixed concurrency (optionally capped at a
+request rate) and reports throughput and latency percentiles per scenario.
+
+Targets:
+    (default)      the app in-process over ASGI, with in-memory database
+                   stand-ins (benchmarks/standins.py)
+    --uvicorn      the app under a uvicorn subprocess, same stand-ins
+    --url URL      an already running server
+    --real-db      skip the stand-ins and use the configured databases
+
+Scenarios: health, carousel, submit, patients, calls, call (GET /api/calls/{id}).
+
+Results are written as JSON (--out) and can be compared against an earlier
+run (--compare baseline.json); scenarios whose p95 grows or whose RPS drops by
+more than --tolerance percent are reported as regressions (exit status 1).
+
+Needs httpx (pip install httpx).
+
+Usage:
+    python benchmarks/http_load.py [--scenarios health,submit] [--concurrency 50]
+        [--requests 2000 | --duration 10] [--rps 500] [--out results.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def scenario_requests(name, rng, stand_in_calls):
+    """Return a function producing (method, path, json_body) for one request."""
+    if name == "health":
+        return lambda: ("GET", "/health", None)
+    if name == "carousel":
+        return lambda: ("GET", "/api/carousel-images", None)
+    if name == "submit":
+        return lambda: ("POST", "/api/submit", {
+            "name": "Load Test",
+            "phone": f"+1444{rng.randrange(10 ** 7):07d}",
+            "symptoms": "fever and headache",
+        })
+    if name == "patients":
+        return lambda: ("GET", "/api/patients?limit=50", None)
+    if name == "calls":
+        return lambda: ("GET", "/api/calls?limit=50", None)
+    if name == "call":
+        return lambda: ("GET", f"/api/calls/{rng.randint(1, stand_in_calls)}", None)
+    raise ValueError(f"Unknown scenario {name}")
+
+
+SCENARIOS = ["health", "carousel", "submit", "patients", "calls", "call"]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Pacer:
+    """Spaces request starts evenly to hold a target rate across all workers."""
+
+    def __init__(self, rps):
+        self.interval = 1 / rps if rps else 0
+        self.next_at = time.perf_counter()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        now = time.perf_counter()
+        self.next_at = max(self.next_at + self.interval, now)
+        if self.next_at > now:
+            await asyncio.sleep(self.next_at - now)
+
+
+async def run_scenario(client, make_request, concurrency, total, duration, rps):
+    latencies, statuses, errors = [], Counter(), Counter()
+    pacer = Pacer(rps)
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    def more():
+        nonlocal issued
+        if deadline is not None:
+            return time.perf_counter() < deadline
+        issued += 1
+        return issued <= total
+
+    async def worker():
+        while more():
+            await pacer.wait()
+            method, path, body = make_request()
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                errors[e.__class__.__name__] += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ok = sum(n for status, n in statuses.items() if status < 400)
+    result = {
+        "requests": sum(statuses.values()) + sum(errors.values()),
+        "ok": ok,
+        "status_counts": {str(k): v for k, v in sorted(statuses.items())},
+        "transport_errors": dict(errors),
+        "seconds": round(elapsed, 3),
+        "rps": round(ok / elapsed, 1) if elapsed else 0.0,
+    }
+    if latencies:
+        result.update({
+            "mean_ms": round(statistics.fmean(latencies), 3),
+            "p50_ms": round(statistics.median(latencies), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "max_ms": round(max(latencies), 3),
+        })
+    return result
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_uvicorn(args):
+    port = free_port()
+    command = [sys.executable, __file__, "--serve", str(port), "--db-latency-ms", str(args.db_latency_ms)]
+    if args.real_db:
+        command.append("--real-db")
+    process = subprocess.Popen(command, cwd=ROOT)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 30s")
+
+
+def serve(port, real_db, db_latency_ms):
+    """Subprocess entry point for --uvicorn."""
+    import uvicorn
+
+    if not real_db:
+        from benchmarks.standins import install
+        install(latency=db_latency_ms / 1000)
+    from backend.main import app
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, current in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or "p95_ms" not in before or "p95_ms" not in current:
+            continue
+        p95_change = (current["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0
+        rps_change = (current["rps"] - before["rps"]) / before["rps"] * 100 if before["rps"] else 0
+        flag = p95_change > tolerance or rps_change < -tolerance
+        print(f"{name:<10} p95 {before['p95_ms']:>8.2f} -> {current['p95_ms']:>8.2f} ms ({p95_change:+6.1f}%)   "
+              f"rps {before['rps']:>8.1f} -> {current['rps']:>8.1f} ({rps_change:+6.1f}%)"
+              f"{'   [REGRESSION]' if flag else ''}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--duration", type=float, default=None, help="seconds per scenario (overrides --requests)")
+    parser.add_argument("--rps", type=float, default=None, help="cap on request rate per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests per scenario")
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--uvicorn", action="store_true")
+    parser.add_argument("--real-db", action="store_true")
+    parser.add_argument("--db-latency-ms", type=float, default=0.5, help="simulated round trip of the stand-ins")
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--compare", default=None)
+    parser.add_argument("--tolerance", type=float, default=10.0, help="percent change counted as a regression")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--serve", type=int, default=None, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    process = None
+    lifespan = None
+    if args.url:
+        target, client = args.url, httpx.AsyncClient(base_url=args.url, timeout=30)
+    elif args.uvicorn:
+        process, url = start_uvicorn(args)
+        target, client = f"uvicorn {url}", httpx.AsyncClient(base_url=url, timeout=30)
+    else:
+        if not args.real_db:
+            from benchmarks.standins import install
+            install(latency=args.db_latency_ms / 1000)
+        from backend.main import app
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        target = "in-process"
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=30)
+
+    results = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "target": target,
+        "stand_ins": not args.real_db and not args.url,
+        "config": {k: getattr(args, k) for k in ("concurrency", "requests", "duration", "rps", "db_latency_ms")},
+        "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "scenarios": {},
+    }
+    try:
+        for name in names:
+            make_request = scenario_requests(name, rng, 5000)
+            if args.warmup:
+                await run_scenario(client, make_request, min(args.concurrency, args.warmup), args.warmup, None, None)
+            results["scenarios"][name] = await run_scenario(
+                client, make_request, args.concurrency, args.requests, args.duration, args.rps
+            )
+    finally:
+        await client.aclose()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print("=" * 78)
+    print(f"HTTP load: {target}, concurrency {args.concurrency}" + (f", {args.rps} rps cap" if args.rps else ""))
+    print("=" * 78)
+    print(f"{'scenario':<10} {'requests':>9} {'ok':>8} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, r in results["scenarios"].items():
+        print(f"{name:<10} {r['requests']:>9} {r['ok']:>8} {r['rps']:>9.1f} "
+              f"{r.get('p50_ms', 0):>9.2f} {r.get('p95_ms', 0):>9.2f} {r.get('p99_ms', 0):>9.2f}")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2))
+        print(f"[SUCCESS] Results written to {args.out}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        print("-" * 78)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"[ERROR] Regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    if arguments.serve:
+        serve(arguments.serve, arguments.real_db, arguments.db_latency_ms)
+    else:
+        sys.exit(asyncio.run(main(arguments)))
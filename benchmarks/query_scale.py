@@ -0,0 +1,236 @@
+"""
+Query Scale Benchmark
+Times the project's real read paths against whatever is loaded (see
+benchmarks/generate_data.py) and captures the plan behind each one.
+
+PostgreSQL patterns call the repo's own query functions through a connection
+wrapper that records the exact SQL they send; that SQL is then run once more
+under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON). MongoDB patterns issue the same
+filters/sorts as TranscriptRepository and record cursor.explain().
+
+    calls_by_patient     latest_call_status (most recent call of a patient)
+    calls_by_id          fetch_calls for 50 ids (batch call details)
+    calls_page           list_calls_page, newest first, one status
+    patients_page        list_patients_page after a random patient_id
+    patient_by_phone     get_patient_by_phone
+    status_counts        call_status_counts by day over 30 days
+    transcripts_by_call  find({call_id}).sort(created_at)
+    transcripts_batch    find({call_id: {$in: 50 ids}})
+    latest_transcript    find_one({call_id}, sort created_at desc)
+    transcript_search    $text search sorted by textScore
+
+Usage:
+    python benchmarks/query_scale.py [--iterations 200] [--out query_scale.json]
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from pymongo import DESCENDING
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.crm.postgres.calls import fetch_calls, latest_call_status, list_calls_page
+from backend.crm.postgres.patients import get_patient_by_phone, list_patients_page
+from backend.crm.postgres.pool import connection
+from backend.crm.postgres.stats import call_status_counts
+from backend.transcription.mongodb.connection import get_collection
+from backend.transcription.mongodb.storage import METADATA_PROJECTION
+
+
+class RecordingCursor:
+    def __init__(self, cursor, log):
+        self._cursor = cursor
+        self._log = log
+
+    def execute(self, sql, params=None):
+        self._log.append(self._cursor.mogrify(sql, params).decode())
+        return self._cursor.execute(sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class RecordingConnection:
+    """Hands out cursors that remember every statement executed through them."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.statements = []
+
+    def cursor(self, *args, **kwargs):
+        return RecordingCursor(self._conn.cursor(*args, **kwargs), self.statements)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(latencies):
+    return {
+        "iterations": len(latencies),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(max(latencies), 3),
+    }
+
+
+def plan_nodes(node, depth=0):
+    """Flatten a Postgres JSON plan into 'Node Type (index/relation)' lines."""
+    target = node.get("Index Name") or node.get("Relation Name")
+    lines = ["  " * depth + node["Node Type"] + (f" ({target})" if target else "")]
+    for child in node.get("Plans", []):
+        lines.extend(plan_nodes(child, depth + 1))
+    return lines
+
+
+def explain_postgres(conn, statement):
+    cursor = conn.cursor()
+    cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement)
+    plan = cursor.fetchone()[0][0]
+    cursor.close()
+    return {
+        "sql": statement,
+        "nodes": plan_nodes(plan["Plan"]),
+        "execution_ms": plan.get("Execution Time"),
+        "planning_ms": plan.get("Planning Time"),
+        "plan": plan,
+    }
+
+
+def mongo_stages(stage):
+    names = [stage.get("stage", "?") + (f" ({stage['indexName']})" if "indexName" in stage else "")]
+    for key in ("inputStage", "queryPlan"):
+        if key in stage:
+            names.extend(mongo_stages(stage[key]))
+    for child in stage.get("inputStages", []):
+        names.extend(mongo_stages(child))
+    return names
+
+
+def explain_mongo(cursor):
+    explain = cursor.explain()
+    winning = explain.get("queryPlanner", {}).get("winningPlan", {})
+    stats = explain.get("executionStats", {})
+    return {
+        "stages": mongo_stages(winning.get("queryPlan", winning)),
+        "n_returned": stats.get("nReturned"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "execution_ms": stats.get("executionTimeMillis"),
+        "explain": json.loads(json.dumps(explain, default=str)),
+    }
+
+
+def sample_ids(conn, table, column, count, rng):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT min({column}), max({column}) FROM {table};")
+    low, high = cursor.fetchone()
+    cursor.close()
+    if low is None:
+        raise RuntimeError(f"{table} is empty; load data with benchmarks/generate_data.py first")
+    return [rng.randint(low, high) for _ in range(count)]
+
+
+def postgres_patterns(conn, rng):
+    patient_ids = sample_ids(conn, "patients", "patient_id", 1000, rng)
+    call_ids = sample_ids(conn, "calls", "call_id", 5000, rng)
+    cursor = conn.cursor()
+    cursor.execute("SELECT phone_normalized FROM patients WHERE patient_id = ANY(%s);", (patient_ids[:200],))
+    phones = [r[0] for r in cursor.fetchall() if r[0]] or ["+10000000000"]
+    cursor.close()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return {
+        "calls_by_patient": lambda c: latest_call_status(c, rng.choice(patient_ids)),
+        "calls_by_id": lambda c: fetch_calls(c, rng.sample(call_ids, 50)),
+        "calls_page": lambda c: list_calls_page(c, 50, call_status=rng.choice(["hot", "completed", "pending"])),
+        "patients_page": lambda c: list_patients_page(c, 50, rng.choice(patient_ids)),
+        "patient_by_phone": lambda c: get_patient_by_phone(c, rng.choice(phones)),
+        "status_counts": lambda c: call_status_counts(c, "day", now - timedelta(days=30), now),
+    }
+
+
+def mongo_patterns(collection, call_ids, rng):
+    return {
+        "transcripts_by_call": lambda: collection.find({"call_id": rng.choice(call_ids)}).sort("created_at", 1),
+        "transcripts_batch": lambda: collection.find(
+            {"call_id": {"$in": rng.sample(call_ids, 50)}}, METADATA_PROJECTION
+        ).sort([("call_id", 1), ("created_at", 1)]),
+        "latest_transcript": lambda: collection.find({"call_id": rng.choice(call_ids)})
+            .sort("created_at", DESCENDING).limit(1),
+        "transcript_search": lambda: collection.find(
+            {"$text": {"$search": rng.choice(["fever", "chest pain", "headache nausea"])}},
+            {"call_id": 1, "score": {"$meta": "textScore"}},
+        ).sort([("score", {"$meta": "textScore"})]).limit(21),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    results = {"started_at": datetime.now(timezone.utc).isoformat(), "iterations": args.iterations, "patterns": {}}
+
+    try:
+        with connection() as conn:
+            for name, run in postgres_patterns(conn, rng).items():
+                latencies = []
+                for _ in range(args.iterations):
+                    started = time.perf_counter()
+                    run(conn)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                recording = RecordingConnection(conn)
+                run(recording)
+                results["patterns"][name] = dict(
+                    summarize(latencies), store="postgres",
+                    explain=[explain_postgres(conn, sql) for sql in recording.statements],
+                )
+            call_ids = sample_ids(conn, "calls", "call_id", 5000, rng)
+
+        collection = get_collection()
+        for name, make_cursor in mongo_patterns(collection, call_ids, rng).items():
+            latencies = []
+            for _ in range(args.iterations):
+                started = time.perf_counter()
+                list(make_cursor())
+                latencies.append((time.perf_counter() - started) * 1000)
+            results["patterns"][name] = dict(summarize(latencies), store="mongodb", explain=explain_mongo(make_cursor()))
+    except Exception as e:
+        print(f"[ERROR] Query benchmark failed: {e}")
+        return 1
+
+    print("=" * 78)
+    print(f"Query scale benchmark, {args.iterations} iterations per pattern")
+    print("=" * 78)
+    for name, r in results["patterns"].items():
+        print(f"{name:<20} {r['store']:<9} p50 {r['p50_ms']:>8.2f} ms  p95 {r['p95_ms']:>8.2f} ms  p99 {r['p99_ms']:>8.2f} ms")
+        if r["store"] == "postgres":
+            for plan in r["explain"]:
+                for line in plan["nodes"]:
+                    print(f"    {line}")
+        else:
+            e = r["explain"]
+            print(f"    {' <- '.join(e['stages'])}  (keys {e['keys_examined']}, docs {e['docs_examined']}, "
+                  f"returned {e['n_returned']})")
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2, default=str))
+        print(f"[SUCCESS] Results with full plans written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
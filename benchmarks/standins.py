@@ -0,0 +1,173 @@
+"""
+In-memory Database Stand-ins
+Replace the CRM pool and the transcript repository with in-process fakes so
+the API can be load-tested without PostgreSQL or MongoDB. Only the calls the
+benchmarked endpoints make are implemented; each one can sleep for a fixed
+latency to mimic a database round trip.
+
+Usage:
+    from benchmarks.standins import install
+    install(latency=0.001, patients=1000, calls=5000)
+    from backend.main import app
+"""
+import asyncio
+import itertools
+import random
+from datetime import datetime, timedelta, timezone
+
+STATUSES = ["pending", "completed", "hot", "non-hot", "failed"]
+
+
+class StandInCRM:
+    """Answers AsyncCRMPool.run(fn, ...) from dicts, dispatching on fn.__name__."""
+
+    def __init__(self, latency=0.0, patients=1000, calls=5000, seed=7):
+        rng = random.Random(seed)
+        self.latency = latency
+        self.sync_pool = object()
+        self.patients = {}
+        self.by_phone = {}
+        for patient_id in range(1, patients + 1):
+            self._add_patient(patient_id, f"+1555{patient_id:07d}")
+        self._patient_ids = itertools.count(patients + 1)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        self.calls = {
+            call_id: {
+                "call_id": call_id,
+                "patient_id": rng.randint(1, patients),
+                "audio_file_url": None,
+                "call_status": rng.choice(STATUSES),
+                "created_at": now - timedelta(minutes=calls - call_id),
+            }
+            for call_id in range(1, calls + 1)
+        }
+        for call in self.calls.values():
+            call["phone_number"] = self.patients[call["patient_id"]]["phone_number"]
+        self._newest_first = sorted(self.calls.values(), key=lambda c: (c["created_at"], c["call_id"]), reverse=True)
+
+    def _add_patient(self, patient_id, phone):
+        self.patients[patient_id] = {"patient_id": patient_id, "phone_number": phone, "phone_normalized": phone}
+        self.by_phone[phone] = patient_id
+
+    async def run(self, fn, *args, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        handler = getattr(self, f"_{fn.__name__}", None)
+        if handler is None:
+            raise NotImplementedError(f"Stand-in CRM does not implement {fn.__name__}")
+        return handler(*args, **kwargs)
+
+    def stats(self):
+        return {"stand_in": True}
+
+    def _get_or_create_patient(self, phone):
+        if phone in self.by_phone:
+            return self.by_phone[phone], False
+        patient_id = next(self._patient_ids)
+        self._add_patient(patient_id, phone)
+        return patient_id, True
+
+    def _latest_call_status(self, patient_id):
+        return None
+
+    def _list_patients_page(self, limit=50, after_id=None):
+        start = (after_id or 0) + 1
+        rows = [self.patients[i] for i in range(start, start + limit) if i in self.patients]
+        return rows, rows[-1]["patient_id"] if len(rows) == limit else None
+
+    def _list_calls_page(self, limit=50, cursor_token=None, **filters):
+        status = filters.get("call_status")
+        rows = [c for c in self._newest_first if status is None or c["call_status"] == status][:limit]
+        return rows, None
+
+    def _fetch_calls(self, call_ids):
+        return {call_id: self.calls[call_id] for call_id in call_ids if call_id in self.calls}
+
+    def _relay_outbox_batch(self, batch_size=None):
+        return 0, 0
+
+    def _ensure_partitions(self, months_ahead=None):
+        return []
+
+    def _insert_dispatch_job(self, call_id, payload, priority, status, created_at):
+        pass
+
+    def _update_dispatch_job(self, call_id, status, attempts, result, error, updated_at):
+        pass
+
+    def _delete_dispatch_job(self, call_id):
+        pass
+
+    def _get_dispatch_job(self, call_id):
+        return None
+
+    def _recover_dispatch_jobs(self):
+        return []
+
+
+class StandInTranscripts:
+    """Async TranscriptRepository surface backed by a dict of call_id -> documents."""
+
+    def __init__(self, latency=0.0, calls=5000):
+        self.latency = latency
+        self.docs = {
+            call_id: [{"_id": f"t{call_id}", "call_id": call_id, "language": "en",
+                       "transcript_text": "Patient says they have a fever and a mild headache."}]
+            for call_id in range(1, calls + 1)
+        }
+
+    async def _wait(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def collection(self):
+        raise NotImplementedError("Stand-in transcripts have no collection")
+
+    async def find_by_call_id(self, call_id, include_text=True):
+        await self._wait()
+        return [self._project(doc, include_text) for doc in self.docs.get(call_id, [])]
+
+    async def find_by_call_ids(self, call_ids, include_text=True):
+        await self._wait()
+        return {call_id: [self._project(doc, include_text) for doc in self.docs.get(call_id, [])]
+                for call_id in call_ids}
+
+    async def latest_for_call(self, call_id):
+        await self._wait()
+        docs = self.docs.get(call_id)
+        return docs[-1] if docs else None
+
+    async def close(self):
+        pass
+
+    @staticmethod
+    def _project(doc, include_text):
+        return dict(doc) if include_text else {k: v for k, v in doc.items() if k != "transcript_text"}
+
+
+class StandInListener:
+    """No-op CallEventListener (no LISTEN connection)."""
+
+    def __init__(self, *args, **kwargs):
+        self.stats = {}
+        self.subscriber_count = 0
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+def install(latency=0.0, patients=1000, calls=5000):
+    """Point the backend at the stand-ins; call before the app starts."""
+    import backend.main
+    from backend.crm.postgres import pool
+    from backend.transcription.mongodb import repository
+
+    crm = StandInCRM(latency, patients, calls)
+    pool._pool = crm.sync_pool
+    pool._async_pool = crm
+    repository._repository = StandInTranscripts(latency, calls)
+    backend.main.CallEventListener = StandInListener
+    return crm
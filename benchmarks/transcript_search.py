@@ -0,0 +1,116 @@
+"""
+Transcript Search Latency Benchmark
+Loads synthetic transcripts and times ranked search queries.
+
+    --backend memory   in-process InvertedIndexSearch (no database needed)
+    --backend mongo    $text search against a scratch collection
+                       (transcripts_search_bench, dropped afterwards)
+
+Usage:
+    python benchmarks/transcript_search.py [--backend memory] [--count 1000000] [--queries 200]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.services.transcript_search import InvertedIndexSearch, MongoTranscriptSearch
+
+SYMPTOMS = [
+    "fever", "chest pain", "headache", "cough", "shortness of breath", "nausea", "dizziness",
+    "back pain", "sore throat", "fatigue", "rash", "vomiting", "abdominal pain", "chills",
+]
+FILLER = (
+    "patient says they have been feeling unwell since yesterday and would like to see a doctor "
+    "the symptoms started slowly and got worse during the night no known allergies"
+).split()
+QUERIES = ["fever", "chest pain", '"chest pain"', "headache nausea", "cough fever chills", "rash", "dizziness fatigue"]
+
+
+def synthetic_transcript(rng):
+    words = rng.sample(FILLER, rng.randint(8, 20))
+    for symptom in rng.sample(SYMPTOMS, rng.randint(1, 3)):
+        words.insert(rng.randrange(len(words) + 1), symptom)
+    return " ".join(words)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def time_queries(backend, count, rng):
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        await backend.search(rng.choice(QUERIES), limit=20)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def load_mongo(count, rng, batch=10000):
+    from backend.transcription.mongodb.connection import MongoConfig
+    from backend.transcription.mongodb.repository import TranscriptRepository
+
+    config = MongoConfig.from_env()
+    config.collection = "transcripts_search_bench"
+    repo = TranscriptRepository(config)
+    collection = await repo.collection()
+    await collection.drop()
+    for start in range(0, count, batch):
+        await collection.insert_many(
+            [{"call_id": i, "transcript_text": synthetic_transcript(rng), "language": "en"}
+             for i in range(start, min(count, start + batch))],
+            ordered=False
+        )
+    await collection.create_index(
+        [("transcript_text", "text"), ("search_text", "text")],
+        default_language="english", language_override="search_language",
+    )
+    return repo, collection
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["memory", "mongo"], default="memory")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    started = time.perf_counter()
+    repo = collection = None
+    if args.backend == "memory":
+        backend = InvertedIndexSearch()
+        for i in range(args.count):
+            backend.index({"call_id": i, "transcript_text": synthetic_transcript(rng), "language": "en"})
+    else:
+        repo, collection = await load_mongo(args.count, rng)
+        backend = MongoTranscriptSearch(repo)
+    load_seconds = time.perf_counter() - started
+
+    try:
+        latencies = await time_queries(backend, args.queries, rng)
+    finally:
+        if collection is not None:
+            await collection.drop()
+            await repo.close()
+
+    print("=" * 60)
+    print(f"Transcript search: {args.backend}, {args.count} transcripts, {args.queries} queries")
+    print("=" * 60)
+    print(f"Load + index: {load_seconds:.1f}s")
+    print(f"p50: {statistics.median(latencies):8.2f} ms")
+    print(f"p95: {percentile(latencies, 95):8.2f} ms")
+    print(f"p99: {percentile(latencies, 99):8.2f} ms")
+    print(f"max: {max(latencies):8.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""
+Transcript Write Throughput Benchmark
+Compares one insert_one per transcript against the BufferedTranscriptWriter.
+Writes into a scratch collection (transcripts_bench) that is dropped afterwards.
+
+Usage:
+    python benchmarks/transcript_writer.py [--count 5000] [--concurrency 100]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.transcription.mongodb.connection import MongoConfig
+from backend.transcription.mongodb.repository import TranscriptRepository
+from backend.transcription.mongodb.writer import BufferedTranscriptWriter, WriterConfig
+
+TEXT = "Patient says they have a fever and a mild headache since yesterday. " * 4
+
+
+async def run_concurrently(count, concurrency, write_one):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await write_one(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return time.perf_counter() - started
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--max-docs", type=int, default=500)
+    args = parser.parse_args()
+
+    config = MongoConfig.from_env()
+    config.collection = "transcripts_bench"
+    repo = TranscriptRepository(config)
+    collection = await repo.collection()
+    await collection.drop()
+
+    try:
+        single = await run_concurrently(
+            args.count, args.concurrency,
+            lambda i: repo.insert(i, TEXT)
+        )
+        await collection.drop()
+
+        writer = BufferedTranscriptWriter(repo.collection, WriterConfig(max_docs=args.max_docs))
+        buffered = await run_concurrently(
+            args.count, args.concurrency,
+            lambda i: writer.save_transcript(i, TEXT)
+        )
+        await writer.close()
+
+        print("=" * 60)
+        print(f"Transcript writes: {args.count} docs, concurrency {args.concurrency}")
+        print("=" * 60)
+        print(f"{'insert_one':<20} {single:8.2f}s  {args.count / single:10.0f} docs/s")
+        print(f"{'buffered insert_many':<20} {buffered:8.2f}s  {args.count / buffered:10.0f} docs/s")
+        print(f"{'flushes':<20} {writer.stats['flushes']}")
+        print(f"Speed-up: {single / buffered:.1f}x")
+    finally:
+        await collection.drop()
+        await repo.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,28 +1,25 @@
-import psycopg2
-from pymongo import MongoClient
 from datetime import datetime, timezone
 from psycopg2 import OperationalError, IntegrityError
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from backend.cache.lookups import invalidate_calls, invalidate_transcripts
+from backend.crm.postgres.pool import connection
+from backend.services.call_lifecycle import complete_call, relay_outbox_batch, transition_call_status
+from backend.transcription.mongodb.connection import get_collection
+from backend.transcription.mongodb.storage import insert_encoded_sync
 
 # ----------- PostgreSQL (CRM) functions -----------
 
 def save_call(patient_id, audio_file_path, call_status='pending'):
     try:
-        conn = psycopg2.connect(
-            host="localhost",
-            database="crm_db",
-            user="postgres",
-            password="abcd"  # <-- replace with your password
-        )
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO calls (patient_id, audio_file_url, call_status) VALUES (%s, %s, %s) RETURNING call_id;",
-            (patient_id, audio_file_path, call_status)
-        )
-        call_id = cursor.fetchone()[0]
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO calls (patient_id, audio_file_url, call_status) VALUES (%s, %s, %s) RETURNING call_id;",
+                (patient_id, audio_file_path, call_status)
+            )
+            call_id = cursor.fetchone()[0]
+            cursor.close()
+        invalidate_calls(call_id)
         return call_id
     except OperationalError as e:
         error_msg = str(e)
@@ -53,22 +50,14 @@ def save_call(patient_id, audio_file_path, call_status='pending'):
 
 def update_call_status(call_id, status):
     try:
-        conn = psycopg2.connect(
-            host="localhost",
-            database="crm_db",
-            user="postgres",
-            password="abcd"  # <-- replace with your password
-        )
-        cursor = conn.cursor()
-        cursor.execute("UPDATE calls SET call_status=%s WHERE call_id=%s;", (status, call_id))
-        rows_affected = cursor.rowcount
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
-        if rows_affected == 0:
+        try:
+            with connection() as conn:
+                transition_call_status(conn, call_id, status)
+        except LookupError:
             print(f"WARNING: No call found with call_id={call_id}. Status not updated.")
-        return rows_affected > 0
+            return False
+        invalidate_calls(call_id)
+        return True
     except OperationalError as e:
         error_msg = str(e)
         if "Connection refused" in error_msg or "could not connect" in error_msg.lower():
@@ -86,16 +75,14 @@ def update_call_status(call_id, status):
 
 def save_transcript(call_id, transcript_text, language="en"):
     try:
-        client = MongoClient("mongodb://localhost:27017/", serverSelectionTimeoutMS=5000)
-        db = client["transcription_db"]
-        collection = db["transcripts"]
-        result = collection.insert_one({
+        inserted_id = insert_encoded_sync(get_collection(), {
             "call_id": call_id,
             "transcript_text": transcript_text,
             "language": language,
             "created_at": datetime.now(timezone.utc)
         })
-        return result.inserted_id
+        invalidate_transcripts(call_id)
+        return inserted_id
     except (ConnectionFailure, ServerSelectionTimeoutError) as e:
         print("ERROR: MongoDB server is not running or not accessible.")
         print("Please ensure MongoDB is installed and the service is running.")
@@ -113,25 +100,23 @@ if __name__ == "__main__":
         # 1. Insert a dummy patient (or use existing patient_id)
         patient_id = 1  # replace with a valid patient_id from your patients table
         
-        # 2. Save audio call in CRM
+        # 2. Record the finished call, its status and its transcript in one CRM transaction
         audio_file_path = "C:\\Users\\Welcome\\PHOENIXIX\\audio_files\\call_123.wav"  # dummy path
-        call_id = save_call(patient_id, audio_file_path)
-        print(f"Inserted call_id in CRM: {call_id}")
-
-        # 3. Save transcription in MongoDB
         transcript_text = "Patient says they have a fever"
-        inserted_id = save_transcript(call_id, transcript_text, "en")
-        print(f"Transcript saved in MongoDB for call_id: {call_id} (MongoDB ID: {inserted_id})")
+        with connection() as conn:
+            call_id = complete_call(conn, patient_id, audio_file_path, transcript_text, "en")
+        print(f"Inserted completed call_id in CRM: {call_id} (transcript queued in outbox)")
 
-        # 4. Update CRM call status
-        update_call_status(call_id, "completed")
-        print(f"CRM call_status updated for call_id: {call_id}")
+        # 3. Relay the transcript to MongoDB (the API runs this continuously in the background)
+        with connection() as conn:
+            delivered, failed = relay_outbox_batch(conn)
+        if failed:
+            print("Transcript delivery to MongoDB failed; it stays in the outbox and will be retried.")
+        else:
+            print(f"Transcript saved in MongoDB for call_id: {call_id} ({delivered} outbox row(s) delivered)")
 
         print("\nDemo workflow completed successfully!")
         
     except Exception as e:
         print(f"\nDemo workflow failed: {e}")
         print("Please check the error messages above for details.")
-
-
-
@@ -1,46 +1,43 @@
 """
 Patient Management Script
-Helps create and list patients in the CRM database.
+Helps create and list patients (and list calls) in the CRM database.
 """
-import psycopg2
 from psycopg2 import OperationalError, IntegrityError
+from datetime import datetime
+import csv
 import sys
-
-def get_connection():
-    """Get database connection"""
-    return psycopg2.connect(
-        host="localhost",
-        database="crm_db",
-        user="postgres",
-        password="abcd"
-    )
+from backend.cache.lookups import cached_patient
+from backend.crm.postgres.calls import iter_calls, list_calls_page
+from backend.crm.postgres.connection import get_connection
+from backend.crm.postgres.patients import (
+    backfill_normalized_phones, get_or_create_patient, iter_patients, list_patients_page, normalize_phone
+)
 
 def create_patient(phone_number=None):
-    """Create a new patient"""
+    """Create a new patient, or return the existing one for a known phone number"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        with get_connection() as conn:
+            if phone_number:
+                patient_id, created = get_or_create_patient(conn, phone_number)
+            else:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "INSERT INTO patients DEFAULT VALUES RETURNING patient_id;"
+                )
+                patient_id, created = cursor.fetchone()[0], True
+                cursor.close()
         
-        if phone_number:
-            cursor.execute(
-                "INSERT INTO patients (phone_number) VALUES (%s) RETURNING patient_id;",
-                (phone_number,)
-            )
+        if created:
+            print(f"[SUCCESS] Created patient with ID: {patient_id}")
         else:
-            cursor.execute(
-                "INSERT INTO patients DEFAULT VALUES RETURNING patient_id;"
-            )
-        
-        patient_id = cursor.fetchone()[0]
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
-        print(f"[SUCCESS] Created patient with ID: {patient_id}")
+            print(f"[INFO] Patient already exists with ID: {patient_id}")
         if phone_number:
-            print(f"  Phone number: {phone_number}")
+            print(f"  Phone number: {normalize_phone(phone_number)}")
         return patient_id
         
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return None
     except OperationalError as e:
         print(f"[ERROR] Database connection failed: {e}")
         return None
@@ -48,15 +45,11 @@ def create_patient(phone_number=None):
         print(f"[ERROR] Failed to create patient: {e}")
         return None
 
-def list_patients():
-    """List all patients"""
+def list_patients(limit=50, after_id=None):
+    """List one page of patients (keyset pagination on patient_id)"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT patient_id, phone_number, created_at FROM patients ORDER BY patient_id;")
-        patients = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        with get_connection() as conn:
+            patients, next_after = list_patients_page(conn, limit, after_id)
         
         if not patients:
             print("[INFO] No patients found in the database.")
@@ -68,45 +61,141 @@ def list_patients():
         print("=" * 60)
         print(f"{'ID':<10} {'Phone Number':<20} {'Created At'}")
         print("-" * 60)
-        for patient_id, phone_number, created_at in patients:
-            phone = phone_number if phone_number else "(none)"
-            print(f"{patient_id:<10} {phone:<20} {created_at}")
-        print("=" * 60 + "\n")
+        for patient in patients:
+            phone = patient["phone_number"] if patient["phone_number"] else "(none)"
+            print(f"{patient['patient_id']:<10} {phone:<20} {patient['created_at']}")
+        print("=" * 60)
+        if next_after is not None:
+            print(f"Next page: python manage_patients.py list --after {next_after} --limit {limit}")
+        print()
         
     except OperationalError as e:
         print(f"[ERROR] Database connection failed: {e}")
     except Exception as e:
         print(f"[ERROR] Failed to list patients: {e}")
 
+def dump_patients(out=sys.stdout):
+    """Write every patient as CSV, streamed through a server-side cursor"""
+    try:
+        with get_connection() as conn:
+            writer = csv.writer(out)
+            writer.writerow(["patient_id", "phone_number", "created_at"])
+            for row in iter_patients(conn):
+                writer.writerow(row)
+    except OperationalError as e:
+        print(f"[ERROR] Database connection failed: {e}", file=sys.stderr)
+    except Exception as e:
+        print(f"[ERROR] Failed to dump patients: {e}", file=sys.stderr)
+
+def list_calls(limit=50, cursor_token=None, call_status=None, created_from=None, created_to=None):
+    """List one page of calls, newest first, with optional status and date filters"""
+    try:
+        with get_connection() as conn:
+            calls, next_cursor = list_calls_page(
+                conn, limit, cursor_token,
+                call_status=call_status, created_from=created_from, created_to=created_to
+            )
+        
+        if not calls:
+            print("[INFO] No calls found.")
+            return
+        
+        print("\n" + "=" * 70)
+        print("Calls in Database")
+        print("=" * 70)
+        print(f"{'Call ID':<10} {'Patient ID':<12} {'Status':<12} {'Created At'}")
+        print("-" * 70)
+        for call in calls:
+            print(f"{call['call_id']:<10} {str(call['patient_id']):<12} {str(call['call_status']):<12} {call['created_at']}")
+        print("=" * 70)
+        if next_cursor is not None:
+            print(f"Next page: python manage_patients.py calls --cursor {next_cursor} --limit {limit}")
+        print()
+        
+    except OperationalError as e:
+        print(f"[ERROR] Database connection failed: {e}")
+    except Exception as e:
+        print(f"[ERROR] Failed to list calls: {e}")
+
+def dump_calls(call_status=None, created_from=None, created_to=None, out=sys.stdout):
+    """Write matching calls as CSV, streamed through a server-side cursor"""
+    try:
+        with get_connection() as conn:
+            writer = csv.writer(out)
+            writer.writerow(["call_id", "patient_id", "audio_file_url", "call_status", "created_at"])
+            for row in iter_calls(conn, call_status, created_from, created_to):
+                writer.writerow(row)
+    except OperationalError as e:
+        print(f"[ERROR] Database connection failed: {e}", file=sys.stderr)
+    except Exception as e:
+        print(f"[ERROR] Failed to dump calls: {e}", file=sys.stderr)
+
 def check_patient_exists(patient_id):
-    """Check if a patient exists"""
+    """Check if a patient exists (read through the lookup cache)"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT patient_id FROM patients WHERE patient_id = %s;", (patient_id,))
-        result = cursor.fetchone()
-        cursor.close()
-        conn.close()
-        return result is not None
+        return cached_patient(patient_id) is not None
     except Exception as e:
         print(f"[ERROR] Failed to check patient: {e}")
         return False
 
+def backfill_phones():
+    """Fill phone_normalized for patients created before phone normalization"""
+    try:
+        with get_connection() as conn:
+            skipped = backfill_normalized_phones(conn)
+        print("[SUCCESS] Normalized phone numbers backfilled.")
+        for patient_id, phone_number, reason in skipped:
+            print(f"  [SKIPPED] patient {patient_id} ({phone_number}): {reason}")
+    except OperationalError as e:
+        print(f"[ERROR] Database connection failed: {e}")
+    except Exception as e:
+        print(f"[ERROR] Failed to backfill phone numbers: {e}")
+
+def get_option(args, name, default=None, convert=str):
+    """Read `--name value` from the argument list"""
+    if name in args:
+        index = args.index(name)
+        if index + 1 < len(args):
+            return convert(args[index + 1])
+    return default
+
 def main():
     if len(sys.argv) < 2:
         print("Usage:")
         print("  python manage_patients.py create [phone_number]  - Create a new patient")
-        print("  python manage_patients.py list                   - List all patients")
+        print("  python manage_patients.py list [--limit N] [--after ID]")
+        print("                                                   - List patients, one page at a time")
+        print("  python manage_patients.py dump                   - Stream all patients as CSV")
+        print("  python manage_patients.py calls [--limit N] [--cursor C] [--status S] [--from DATE] [--to DATE]")
+        print("                                                   - List calls, newest first")
+        print("  python manage_patients.py dump-calls [--status S] [--from DATE] [--to DATE]")
+        print("                                                   - Stream matching calls as CSV")
         print("  python manage_patients.py check <patient_id>     - Check if patient exists")
+        print("  python manage_patients.py backfill-phones        - Normalize phone numbers of existing patients")
         return
     
     command = sys.argv[1].lower()
+    args = sys.argv[2:]
     
     if command == "create":
         phone_number = sys.argv[2] if len(sys.argv) > 2 else None
         create_patient(phone_number)
     elif command == "list":
-        list_patients()
+        list_patients(get_option(args, "--limit", 50, int), get_option(args, "--after", None, int))
+    elif command == "dump":
+        dump_patients()
+    elif command in ("calls", "dump-calls"):
+        filters = {
+            "call_status": get_option(args, "--status"),
+            "created_from": get_option(args, "--from", None, datetime.fromisoformat),
+            "created_to": get_option(args, "--to", None, datetime.fromisoformat),
+        }
+        if command == "calls":
+            list_calls(get_option(args, "--limit", 50, int), get_option(args, "--cursor"), **filters)
+        else:
+            dump_calls(**filters)
+    elif command == "backfill-phones":
+        backfill_phones()
     elif command == "check":
         if len(sys.argv) < 3:
             print("[ERROR] Please provide a patient_id")
@@ -121,7 +210,7 @@ def main():
             print("Create it with: python manage_patients.py create")
     else:
         print(f"[ERROR] Unknown command: {command}")
-        print("Use 'create', 'list', or 'check'")
+        print("Use 'create', 'list', 'dump', 'calls', 'dump-calls', 'check', or 'backfill-phones'")
 
 if __name__ == "__main__":
     main()
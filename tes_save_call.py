@@ -1,23 +1,16 @@
-import psycopg2
 from psycopg2 import OperationalError, IntegrityError
+from backend.crm.postgres.pool import connection
 
 def save_call(patient_id, audio_file_path, call_status='pending'):
     try:
-        conn = psycopg2.connect(
-            host="localhost",
-            database="crm_db",
-            user="postgres",
-            password="abcd"  # replace with your PostgreSQL password
-        )
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO calls (patient_id, audio_file_url, call_status) VALUES (%s, %s, %s) RETURNING call_id;",
-            (patient_id, audio_file_path, call_status)
-        )
-        call_id = cursor.fetchone()[0]
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO calls (patient_id, audio_file_url, call_status) VALUES (%s, %s, %s) RETURNING call_id;",
+                (patient_id, audio_file_path, call_status)
+            )
+            call_id = cursor.fetchone()[0]
+            cursor.close()
         return call_id
     except OperationalError as e:
         error_msg = str(e)
@@ -0,0 +1,51 @@
+import asyncio
+import hashlib
+import tempfile
+from backend.audio.store import (
+    AudioStore,
+    AudioStoreConfig,
+    RangeNotSatisfiable,
+    audio_url,
+    parse_audio_url,
+    parse_range,
+)
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    for header in ("bytes=100-", "bytes=-0"):
+        try:
+            parse_range(header, 100)
+            assert False, header
+        except RangeNotSatisfiable:
+            pass
+
+def test_audio_url_round_trip():
+    digest = "ab" * 32
+    assert parse_audio_url(audio_url(digest, "audio/wav"))[0] == digest
+    assert parse_audio_url("C:\\recordings\\call.mp3") is None
+
+def test_store_streams_in_chunks_and_dedupes():
+    data = bytes(range(256)) * 1000
+
+    async def body():
+        for i in range(0, len(data), 7000):
+            yield data[i:i + 7000]
+
+    with tempfile.TemporaryDirectory() as root:
+        store = AudioStore(AudioStoreConfig(root=root, chunk_size=4096))
+        digest, size = asyncio.run(store.save_stream(body()))
+        assert digest == hashlib.sha256(data).hexdigest() and size == len(data)
+        assert asyncio.run(store.save_stream(body())) == (digest, size)
+        assert b"".join(store.iter_range(digest, 1000, 20999)) == data[1000:21000]
+        assert all(len(piece) <= 4096 for piece in store.iter_range(digest, 0, size - 1))
+
+if __name__ == "__main__":
+    test_parse_range()
+    test_audio_url_round_trip()
+    test_store_streams_in_chunks_and_dedupes()
+    print("Audio store tests passed")
@@ -0,0 +1,65 @@
+from psycopg2 import errors as pg_errors
+from backend.crm.postgres.calls import _insert_batch, normalize_call_row
+
+class FakeCursor:
+    """Accepts patients 1 and 2; COPY fails on the whole batch, single-row inserts fail on bad values."""
+    def __init__(self):
+        self.next_id = 100
+        self.inserted = []
+        self._result = []
+
+    def execute(self, sql, params=None):
+        if sql.startswith("SELECT patient_id"):
+            self._result = [(p,) for p in params[0] if p in (1, 2)]
+        elif sql.startswith("SELECT nextval"):
+            self._result = [(self.next_id + i,) for i in range(params[0])]
+            self.next_id += params[0]
+        elif sql.startswith("INSERT"):
+            if params[2] == "bad":
+                raise pg_errors.CheckViolation("new row violates check constraint")
+            self.inserted.append(params)
+            self._result = [(self.next_id,)]
+            self.next_id += 1
+
+    def copy_expert(self, sql, buf):
+        raise pg_errors.StringDataRightTruncation("value too long for type character varying(20)")
+
+    def fetchall(self):
+        return self._result
+
+    def fetchone(self):
+        return self._result[0]
+
+    def close(self):
+        pass
+
+class FakeConn:
+    def __init__(self):
+        self.cursor_ = FakeCursor()
+
+    def cursor(self):
+        return self.cursor_
+
+def test_overlong_status_is_a_row_error():
+    try:
+        normalize_call_row((1, "a.wav", "x" * 21))
+    except ValueError as e:
+        assert "call_status" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+    assert normalize_call_row({"patient_id": "1"}) == (1, None, "pending")
+
+def test_copy_data_errors_fall_back_to_per_row_inserts():
+    conn = FakeConn()
+    rows = [(1, "a.wav", "hot"), (2, "b.wav", "x" * 21), (1, "c.wav", "bad"), (2, "d.wav", "non-hot")]
+    result = _insert_batch(conn, rows)
+    assert [e["index"] for e in result.errors] == [1, 2]
+    assert result.call_ids[1] is None and result.call_ids[2] is None
+    assert result.call_ids[0] is not None and result.call_ids[3] is not None
+    assert [values[1] for values in conn.cursor_.inserted] == ["a.wav", "d.wav"]
+    assert result.inserted == 2
+
+if __name__ == "__main__":
+    test_overlong_status_is_a_row_error()
+    test_copy_data_errors_fall_back_to_per_row_inserts()
+    print("Bulk insert tests passed")
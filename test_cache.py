@@ -0,0 +1,56 @@
+import time
+from backend.cache.store import InMemorySharedBackend, LRUCache, TieredCache, is_missing
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_lru_expires_entries():
+    cache = LRUCache(max_entries=10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+def test_tiered_cache_reads_through_and_invalidates_shared_backend():
+    shared = InMemorySharedBackend()
+    worker_1 = TieredCache(LRUCache(), shared)
+    worker_2 = TieredCache(LRUCache(), shared)
+    loads = []
+    assert worker_1.get_or_load("call:1", lambda: loads.append(1) or {"call_id": 1}) == {"call_id": 1}
+    assert worker_2.get_or_load("call:1", lambda: loads.append(2) or {"call_id": 1}) == {"call_id": 1}
+    assert loads == [1]
+    worker_1.invalidate("call:1")
+    assert is_missing(shared.get("call:1"))
+
+def test_invalidation_reaches_other_processes():
+    shared = InMemorySharedBackend()
+    api_worker = TieredCache(LRUCache(), shared)
+    cli = TieredCache(LRUCache(), shared)
+    api_worker.set("call:1", {"call_status": "pending"})
+    assert api_worker.get("call:1") == {"call_status": "pending"}
+    cli.invalidate("call:1")
+    assert is_missing(api_worker.get("call:1"))
+
+def test_short_local_ttl_bounds_staleness():
+    shared = InMemorySharedBackend()
+    api_worker = TieredCache(LRUCache(), shared, local_ttl=0.01)
+    cli = TieredCache(LRUCache(), shared, local_ttl=0.01)
+    api_worker.set("call:1", {"call_status": "pending"})
+    cli.invalidate("call:1")
+    time.sleep(0.02)
+    assert is_missing(api_worker.get("call:1"))
+
+if __name__ == "__main__":
+    test_lru_evicts_least_recently_used()
+    test_lru_expires_entries()
+    test_tiered_cache_reads_through_and_invalidates_shared_backend()
+    test_invalidation_reaches_other_processes()
+    test_short_local_ttl_bounds_staleness()
+    print("Cache tests passed")
@@ -0,0 +1,25 @@
+import asyncio
+from backend.crm.postgres.notifications import CallEventListener
+
+def test_events_are_routed_by_call_and_patient():
+    async def run():
+        listener = CallEventListener(dsn="dbname=unused", queue_size=2)
+        everything = listener.subscribe()
+        by_call = listener.subscribe(call_id=1)
+        by_patient = listener.subscribe(patient_id=7)
+        both = listener.subscribe(call_id=1, patient_id=8)
+        listener.dispatch({"call_id": 1, "patient_id": 7, "call_status": "completed"})
+        listener.dispatch({"call_id": 2, "patient_id": 7, "call_status": "pending"})
+        listener.dispatch({"call_id": 3, "patient_id": 9, "call_status": "pending"})
+        assert [e["call_id"] for e in (everything.queue.get_nowait(), everything.queue.get_nowait())] == [2, 3]
+        assert everything.dropped == 1
+        assert by_call.queue.qsize() == 1 and by_patient.queue.qsize() == 2 and both.queue.empty()
+        for subscription in (everything, by_call, by_patient, both):
+            subscription.close()
+        assert listener.subscriber_count == 0
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    test_events_are_routed_by_call_and_patient()
+    print("Call event tests passed")
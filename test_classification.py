@@ -0,0 +1,60 @@
+from datetime import datetime
+from backend.services.classification import HOT, NON_HOT, classify_chunk, iter_chunks, mark_classified, score_texts
+
+class FakeCursor(list):
+    def sort(self, key, direction):
+        return FakeCursor(sorted(self, key=lambda doc: doc[key], reverse=direction < 0))
+
+    def batch_size(self, n):
+        return self
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection):
+        return FakeCursor(d for d in self.docs if all(d.get(k) == v for k, v in query.items()))
+
+    def bulk_write(self, requests, ordered=True):
+        for request in requests:
+            for doc in self.find(request._filter, None):
+                doc.update(request._doc["$set"])
+
+def test_keywords_drive_the_score():
+    scores = score_texts([
+        "patient reports crushing chest pain and shortness of breath",
+        "patient would like to book a routine check up",
+        "",
+    ])
+    assert scores[0] > scores[1] == scores[2] == 0
+
+def test_a_call_is_hot_if_any_transcript_is():
+    labels = dict(classify_chunk(
+        [1, 1, 2],
+        ["he passed out after a seizure", "feeling better now", "mild cough since monday"],
+        threshold=3.0,
+    ))
+    assert labels == {1: HOT, 2: NON_HOT}
+
+def test_unclassified_and_grown_transcripts_are_rescored():
+    scored_at, appended_at = datetime(2024, 1, 1, 9), datetime(2024, 1, 1, 10)
+    docs = [
+        {"_id": 1, "call_id": 1, "transcript_text": "fever"},
+        {"_id": 2, "call_id": 2, "transcript_text": "live so far", "updated_at": scored_at},
+    ]
+    collection = FakeCollection(docs)
+    (scored, call_ids, _), = iter_chunks(collection, chunk_size=10)
+    assert call_ids == [1, 2]
+    # A late, smaller _id transcript and a live append arrive while scoring.
+    docs.append({"_id": 0, "call_id": 3, "transcript_text": "chest pain"})
+    docs[1].update(transcript_text="live so far then chest pain", updated_at=appended_at)
+    mark_classified(collection, scored)
+    assert "classified_at" in docs[0] and "classified_at" not in docs[1]
+    (_, call_ids, texts), = iter_chunks(collection, chunk_size=10)
+    assert call_ids == [3, 2] and texts[1].endswith("chest pain")
+
+if __name__ == "__main__":
+    test_keywords_drive_the_score()
+    test_a_call_is_hot_if_any_transcript_is()
+    test_unclassified_and_grown_transcripts_are_rescored()
+    print("Classification tests passed")
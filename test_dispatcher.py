@@ -0,0 +1,149 @@
+import asyncio
+from backend.dispatch.dispatcher import (
+    CallDispatcher, DispatchConfig, QueueFull, COMPLETED, FAILED, QUEUED, RUNNING
+)
+
+class FakeBot:
+    """Local stand-in for the medical bot service"""
+    def __init__(self, failures=0, delay=0.0):
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, **payload):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures > 0:
+                self.failures -= 1
+                raise ConnectionError("bot service unavailable")
+            return {"status": "success", "phone": payload["phone_number"]}
+        finally:
+            self.active -= 1
+
+def make_config(**overrides):
+    config = DispatchConfig(concurrency=2, max_queue=10, max_attempts=3, backoff_base=0.01, backoff_max=0.02)
+    for name, value in overrides.items():
+        setattr(config, name, value)
+    return config
+
+async def wait_for_status(dispatcher, call_id, statuses, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while dispatcher.get(call_id).status not in statuses:
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError(f"job {call_id} stuck in {dispatcher.get(call_id).status}")
+        await asyncio.sleep(0.005)
+    return dispatcher.get(call_id)
+
+def test_dispatch_completes_jobs_with_bounded_concurrency():
+    async def scenario():
+        bot = FakeBot(delay=0.02)
+        dispatcher = CallDispatcher(bot, make_config())
+        await dispatcher.start()
+        jobs = [dispatcher.submit({"phone_number": str(i)}) for i in range(6)]
+        for job in jobs:
+            done = await wait_for_status(dispatcher, job.call_id, {COMPLETED, FAILED})
+            assert done.status == COMPLETED
+        await dispatcher.stop()
+        assert bot.max_active <= 2
+    asyncio.run(scenario())
+
+def test_dispatch_retries_then_fails():
+    async def scenario():
+        dispatcher = CallDispatcher(FakeBot(failures=1), make_config())
+        await dispatcher.start()
+        job = dispatcher.submit({"phone_number": "1"})
+        done = await wait_for_status(dispatcher, job.call_id, {COMPLETED, FAILED})
+        assert done.status == COMPLETED and done.attempts == 2
+
+        job = dispatcher.submit({"phone_number": "2"})
+        dispatcher.bot.failures = 5
+        done = await wait_for_status(dispatcher, job.call_id, {COMPLETED, FAILED})
+        assert done.status == FAILED and done.attempts == 3
+        await dispatcher.stop()
+    asyncio.run(scenario())
+
+def test_dispatch_rejects_when_queue_is_full():
+    async def scenario():
+        dispatcher = CallDispatcher(FakeBot(delay=1.0), make_config(concurrency=1, max_queue=2))
+        await dispatcher.start()
+        dispatcher.submit({"phone_number": "1"})
+        await asyncio.sleep(0.01)  # first job is now running, freeing its queue slot
+        dispatcher.submit({"phone_number": "2"})
+        dispatcher.submit({"phone_number": "3"})
+        try:
+            dispatcher.submit({"phone_number": "4"})
+        except QueueFull:
+            pass
+        else:
+            raise AssertionError("expected QueueFull")
+        await dispatcher.stop(timeout=0)
+    asyncio.run(scenario())
+
+class FakeJobTable:
+    """Stand-in for AsyncCRMPool over the dispatch_jobs functions, keeping rows in a dict."""
+    def __init__(self):
+        self.rows = {}
+        self.history = []
+
+    async def run(self, fn, *args):
+        return getattr(self, fn.__name__)(*args)
+
+    def insert_dispatch_job(self, call_id, payload, priority, status, created_at):
+        self.rows[call_id] = {"call_id": call_id, "payload": payload, "priority": priority, "status": status,
+                              "attempts": 0, "result": None, "error": None,
+                              "created_at": created_at, "updated_at": created_at}
+
+    def update_dispatch_job(self, call_id, status, attempts, result, error, updated_at):
+        self.rows[call_id].update(status=status, attempts=attempts, result=result, error=error,
+                                  updated_at=updated_at)
+        self.history.append((call_id, status))
+
+    def delete_dispatch_job(self, call_id):
+        del self.rows[call_id]
+
+    def get_dispatch_job(self, call_id):
+        row = self.rows.get(call_id)
+        return None if row is None else dict(row)
+
+    def recover_dispatch_jobs(self):
+        for row in self.rows.values():
+            if row["status"] == RUNNING:
+                row.update(status=FAILED, error="interrupted")
+        return [dict(row) for row in self.rows.values() if row["status"] in (QUEUED, "retrying")]
+
+def test_jobs_are_persisted_and_recovered_after_a_restart():
+    async def scenario():
+        table = FakeJobTable()
+        bot = FakeBot(delay=0.02)
+        dispatcher = CallDispatcher(bot, make_config(concurrency=1), pool=table)
+        await dispatcher.start()
+        job = await dispatcher.submit_persisted({"phone_number": "1"})
+        assert table.rows[job.call_id]["status"] == QUEUED
+        await wait_for_status(dispatcher, job.call_id, {COMPLETED})
+        assert table.history == [(job.call_id, RUNNING), (job.call_id, COMPLETED)]
+
+        # A previous process left one job queued and one mid-call.
+        table.insert_dispatch_job("CALL_queued", {"phone_number": "2"}, "non-hot", QUEUED, 0.0)
+        table.insert_dispatch_job("CALL_running", {"phone_number": "3"}, "non-hot", RUNNING, 0.0)
+        restarted = CallDispatcher(bot, make_config(concurrency=1), pool=table)
+        await restarted.start()
+        await wait_for_status(restarted, "CALL_queued", {COMPLETED})
+        assert bot.calls == 2
+        assert (await restarted.lookup("CALL_running")).status == FAILED
+        assert (await restarted.lookup(job.call_id)).status == COMPLETED
+        assert await restarted.lookup("CALL_unknown") is None
+        await dispatcher.stop()
+        await restarted.stop()
+    asyncio.run(scenario())
+
+if __name__ == "__main__":
+    test_dispatch_completes_jobs_with_bounded_concurrency()
+    test_dispatch_retries_then_fails()
+    test_dispatch_rejects_when_queue_is_full()
+    test_jobs_are_persisted_and_recovered_after_a_restart()
+    print("Dispatcher tests passed")
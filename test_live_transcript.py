@@ -0,0 +1,43 @@
+from backend.transcription.mongodb.live import (
+    LiveIngestConfig, LiveTranscriptSession, MalformedFrame, SegmentOutOfOrder, decode_frame
+)
+
+def make_session(**config):
+    session = LiveTranscriptSession(collection=None, call_id=1, config=LiveIngestConfig(**config))
+    session.last_seq = 4  # as if resume() found segments 0..4 stored
+    return session
+
+def test_duplicates_are_ignored_and_gaps_rejected():
+    session = make_session()
+    assert session.add(3, "already stored") is False
+    assert session.add(5, "next") is True
+    assert session.add(5, "resent") is False
+    try:
+        session.add(7, "skipped 6")
+        assert False
+    except SegmentOutOfOrder:
+        pass
+    assert session.next_seq == 6
+
+def test_flush_after_segment_count():
+    session = make_session(flush_segments=2, flush_interval=60)
+    assert session.time_until_flush() is None
+    session.add(5, "a")
+    assert not session.should_flush()
+    session.add(6, "b")
+    assert session.should_flush()
+
+def test_frames_must_be_json_objects():
+    assert decode_frame('{"seq": 0, "text": "hi"}') == {"seq": 0, "text": "hi"}
+    for raw in ("not json", "[1, 2]", "42", None):
+        try:
+            decode_frame(raw)
+            assert False
+        except MalformedFrame:
+            pass
+
+if __name__ == "__main__":
+    test_duplicates_are_ignored_and_gaps_rejected()
+    test_flush_after_segment_count()
+    test_frames_must_be_json_objects()
+    print("Live transcript tests passed")
@@ -0,0 +1,65 @@
+import asyncio
+import json
+from fastapi import WebSocketDisconnect
+import backend.main as main
+
+class FakeLiveCollection:
+    def __init__(self):
+        self.appended = []
+        self.completed = False
+
+    async def find_one(self, query, projection=None):
+        return None
+
+    async def find_one_and_update(self, query, pipeline, **options):
+        stage = pipeline[0]["$set"]
+        self.appended.append(stage["transcript_text"]["$cond"][1]["$concat"][2])
+        return {"last_seq": stage["last_seq"]["$cond"][1]}
+
+    async def update_one(self, query, update):
+        self.completed = True
+
+class FakeRepository:
+    def __init__(self, collection):
+        self._collection = collection
+
+    async def collection(self):
+        return self._collection
+
+class FakeWebSocket:
+    """Replays the given text frames, then disconnects."""
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def receive_text(self):
+        if not self.frames:
+            raise WebSocketDisconnect(1006)
+        return self.frames.pop(0)
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+    async def close(self):
+        pass
+
+def test_malformed_frames_are_rejected_and_buffered_segments_survive_a_disconnect():
+    collection = FakeLiveCollection()
+    main.get_transcript_repository = lambda: FakeRepository(collection)
+    websocket = FakeWebSocket([
+        json.dumps({"seq": 0, "text": "hello"}),
+        "not json",
+        json.dumps(["seq", 1]),
+        json.dumps({"seq": 1, "text": "world"}),
+    ])
+    asyncio.run(main.ingest_transcript_segments(websocket, call_id=7, language="en"))
+    assert websocket.sent[0] == {"type": "ready", "last_seq": -1}
+    assert [m["type"] for m in websocket.sent[1:]] == ["error", "error"]
+    assert collection.appended == ["hello world"] and not collection.completed
+
+if __name__ == "__main__":
+    test_malformed_frames_are_rejected_and_buffered_segments_survive_a_disconnect()
+    print("Live transcript ingest tests passed")
@@ -0,0 +1,48 @@
+import asyncio
+from backend.observability.metrics import Metrics, MetricsConfig
+
+def test_track_query_records_latency_errors_and_slow_queries():
+    metrics = Metrics(MetricsConfig(slow_query_ms=0.001))
+    with metrics.track_query("postgres", "save_call"):
+        pass
+    try:
+        with metrics.track_query("mongodb", "save_transcript"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    durations = metrics.db_duration.snapshot()
+    assert durations[("postgres", "save_call")]["count"] == 1
+    assert durations[("mongodb", "save_transcript")]["count"] == 1
+    assert metrics.db_errors.snapshot() == {("mongodb", "save_transcript"): 1}
+    assert metrics.db_slow.snapshot()[("postgres", "save_call")] == 1
+
+def test_track_query_spans_awaits():
+    metrics = Metrics(MetricsConfig(slow_query_ms=0))
+    async def scenario():
+        with metrics.track_query("mongodb", "find_by_call_id"):
+            await asyncio.sleep(0.02)
+    asyncio.run(scenario())
+    value = metrics.db_duration.snapshot()[("mongodb", "find_by_call_id")]
+    assert value["sum"] >= 0.02
+    assert value["buckets"]["0.01"] == 0 and value["buckets"]["+Inf"] == 1
+    assert metrics.db_slow.snapshot() == {}
+
+def test_prometheus_text_format():
+    metrics = Metrics(MetricsConfig(slow_query_ms=0))
+    metrics.http_in_flight.inc("GET", "/api/calls/{call_id}")
+    metrics.http_requests.inc("GET", "/api/calls/{call_id}", "200")
+    metrics.http_duration.observe(0.003, "GET", "/api/calls/{call_id}")
+    text = metrics.render()
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert 'http_requests_total{method="GET",route="/api/calls/{call_id}",status="200"} 1' in text
+    assert 'http_requests_in_flight{method="GET",route="/api/calls/{call_id}"} 1' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/calls/{call_id}",le="0.0025"} 0' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/calls/{call_id}",le="0.005"} 1' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/calls/{call_id}"} 1' in text
+    assert text.endswith("\n")
+
+if __name__ == "__main__":
+    test_track_query_records_latency_errors_and_slow_queries()
+    test_track_query_spans_awaits()
+    test_prometheus_text_format()
+    print("Metrics tests passed")
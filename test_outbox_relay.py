@@ -0,0 +1,69 @@
+from datetime import datetime
+from pymongo.errors import BulkWriteError
+from backend.services.call_lifecycle import bulk_write_failures, relay_outbox_batch
+
+class FakeCursor:
+    def __init__(self, rows, attempts):
+        self.rows = rows
+        self.attempts = attempts
+        self.delivered = []
+        self.backed_off = []
+        self._result = []
+
+    def execute(self, sql, params):
+        if sql.startswith("SELECT"):
+            self._result = self.rows
+        elif "unnest" in sql:
+            _, max_attempts, ids, errors = params
+            self.backed_off = list(zip(ids, errors))
+            self._result = [(i, i * 10, self.attempts + 1, self.attempts + 1 >= max_attempts) for i in ids]
+        else:
+            self.delivered = list(params[0])
+
+    def fetchall(self):
+        return self._result
+
+    def close(self):
+        pass
+
+class FakeConn:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self):
+        return self._cursor
+
+class RejectingCollection:
+    def __init__(self, rejected):
+        self.rejected = rejected
+
+    def bulk_write(self, requests, ordered=True):
+        assert not ordered
+        errors = [{"index": i, "code": 2, "errmsg": f"bad doc {i}"} for i in self.rejected]
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+def outbox_rows(count):
+    return [(i, i * 10, f"transcript {i}", "en", datetime(2024, 1, 1), 0) for i in range(1, count + 1)]
+
+def test_partial_bulk_failure_only_backs_off_rejected_rows():
+    cursor = FakeCursor(outbox_rows(4), attempts=0)
+    delivered, failed = relay_outbox_batch(FakeConn(cursor), RejectingCollection([1, 3]))
+    assert (delivered, failed) == (2, 2)
+    assert cursor.delivered == [1, 3]
+    assert cursor.backed_off == [(2, "bad doc 1"), (4, "bad doc 3")]
+
+def test_rows_are_dead_lettered_after_max_attempts():
+    cursor = FakeCursor(outbox_rows(1), attempts=2)
+    delivered, failed = relay_outbox_batch(FakeConn(cursor), RejectingCollection([0]), max_attempts=3)
+    assert (delivered, failed) == (0, 1) and cursor.delivered == []
+    assert cursor.backed_off == [(1, "bad doc 0")]
+
+def test_connection_errors_fail_the_whole_batch():
+    assert bulk_write_failures(TimeoutError("timed out"), 3) == {0: "timed out", 1: "timed out", 2: "timed out"}
+
+if __name__ == "__main__":
+    test_partial_bulk_failure_only_backs_off_rejected_rows()
+    test_rows_are_dead_lettered_after_max_attempts()
+    test_connection_errors_fail_the_whole_batch()
+    print("Outbox relay tests passed")
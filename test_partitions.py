@@ -0,0 +1,104 @@
+from datetime import date
+from backend.crm.postgres.partitions import add_months, detach_and_drop, ensure_partitions
+
+def bound(month):
+    return f"FOR VALUES FROM ('{month} 00:00:00') TO ('{add_months(month, 1)} 00:00:00')"
+
+class FakeCursor:
+    """Answers the catalog queries ensure_partitions makes and records every statement."""
+
+    def __init__(self, db):
+        self.db = db
+        self.rowcount = -1
+        self._result = []
+
+    def execute(self, sql, params=()):
+        self.db.statements.append(sql)
+        if "pg_partitioned_table" in sql:
+            self._result = [(1,)]
+        elif "pg_inherits" in sql:
+            self._result = [(name, bound, 0) for name, bound in self.db.partitions.items()]
+        elif sql.startswith("SELECT DISTINCT date_trunc"):
+            self._result = sorted({(d.replace(day=1),) for d in self.db.default_rows})
+        elif sql.startswith("WITH moved AS"):
+            start, end = params
+            moving = [d for d in self.db.default_rows if start <= d < end]
+            self.db.default_rows = [d for d in self.db.default_rows if d not in moving]
+            self.db.holding = moving
+            self.rowcount = len(moving)
+        elif "create_calls_partition" in sql:
+            month = params[0]
+            assert not [d for d in self.db.default_rows if d.replace(day=1) == month], "default holds rows of month"
+            name = f"calls_{month:%Y_%m}"
+            self.db.partitions[name] = bound(month)
+            self._result = [(name,)]
+        elif sql.startswith("INSERT INTO"):
+            self.db.moved.extend(self.db.holding)
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+    def fetchall(self):
+        return self._result
+
+    def close(self):
+        pass
+
+class FakeDatabase:
+    def __init__(self, months, default_rows=()):
+        self.partitions = {f"calls_{m:%Y_%m}": bound(m) for m in months}
+        self.partitions["calls_default"] = "DEFAULT"
+        self.default_rows = list(default_rows)
+        self.holding = []
+        self.moved = []
+        self.statements = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+def test_rows_that_arrived_before_their_partition_are_moved_in():
+    db = FakeDatabase([date(2024, 1, 1), date(2024, 2, 1)], default_rows=[date(2024, 3, 9), date(2025, 1, 2)])
+    created = ensure_partitions(db, months_ahead=2, today=date(2024, 2, 15))
+    assert created == ["calls_2024_03", "calls_2024_04", "calls_2025_01"]
+    assert db.default_rows == [] and sorted(db.moved) == [date(2024, 3, 9), date(2025, 1, 2)]
+    assert "SET LOCAL calls.notify = 'off';" in db.statements
+
+def test_rows_older_than_every_partition_stay_in_default():
+    db = FakeDatabase([date(2024, 1, 1), date(2024, 2, 1)], default_rows=[date(2023, 6, 1)])
+    assert ensure_partitions(db, months_ahead=0, today=date(2024, 2, 15)) == []
+    assert db.default_rows == [date(2023, 6, 1)]
+
+def test_partition_updated_after_export_is_not_dropped():
+    class Partition:
+        def __init__(self, fingerprint):
+            self.fingerprint = fingerprint
+            self.statements = []
+
+        def cursor(self):
+            return self
+
+        def execute(self, sql, params=()):
+            self.statements.append(sql)
+
+        def fetchone(self):
+            return self.fingerprint
+
+        def close(self):
+            pass
+
+    updated = Partition((10, 424242))  # same row count, different content
+    try:
+        detach_and_drop(updated, "calls_2023_01", (10, 171717))
+        assert False
+    except RuntimeError:
+        pass
+    assert not any("DROP" in sql or "DETACH" in sql for sql in updated.statements)
+    unchanged = Partition((10, 171717))
+    detach_and_drop(unchanged, "calls_2023_01", (10, 171717))
+    assert unchanged.statements[-1] == 'DROP TABLE "calls_2023_01";'
+
+if __name__ == "__main__":
+    test_rows_that_arrived_before_their_partition_are_moved_in()
+    test_rows_older_than_every_partition_stay_in_default()
+    test_partition_updated_after_export_is_not_dropped()
+    print("Partition tests passed")
@@ -0,0 +1,72 @@
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+from backend.observability.profiling import AWAITING, LOOPBACK_CLIENTS, Profiler, ProfilingConfig
+
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+async def slow_handler():
+    busy(0.05)
+    await asyncio.sleep(0.05)
+
+def scope(headers=(), client="10.0.0.1"):
+    return {"type": "http", "method": "POST", "path": "/api/submit",
+            "headers": list(headers), "client": (client, 5000)}
+
+def test_trigger_needs_allowed_client_or_sample_rate():
+    profiler = Profiler(ProfilingConfig(allowed_clients=frozenset({"10.0.0.1"})))
+    assert profiler.enabled
+    assert profiler.trigger(scope([(b"x-profile", b"1")])) == "header"
+    assert profiler.trigger(scope([(b"x-profile", b"1")], client="10.0.0.2")) is None
+    assert profiler.trigger(scope()) is None
+    assert Profiler(ProfilingConfig(sample_rate=1.0)).trigger(scope()) == "sampled"
+    assert not Profiler(ProfilingConfig(allowed_clients=frozenset())).enabled
+
+def test_profiling_is_off_unless_configured():
+    previous = os.environ.pop("PROFILE_ALLOWED_CLIENTS", None)
+    try:
+        profiler = Profiler(ProfilingConfig.from_env())
+        assert not profiler.enabled and not profiler.client_allowed("127.0.0.1")
+        assert profiler.trigger(scope([(b"x-profile", b"1")], client="127.0.0.1")) is None
+        os.environ["PROFILE_ALLOWED_CLIENTS"] = "loopback, 10.0.0.1"
+        profiler = Profiler(ProfilingConfig.from_env())
+        assert profiler.config.allowed_clients == LOOPBACK_CLIENTS | {"10.0.0.1"} and profiler.enabled
+        assert profiler.trigger(scope([(b"x-profile", b"1")], client="::1")) == "header"
+    finally:
+        os.environ.pop("PROFILE_ALLOWED_CLIENTS", None)
+        if previous is not None:
+            os.environ["PROFILE_ALLOWED_CLIENTS"] = previous
+
+def test_profile_records_running_and_awaiting_stacks():
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = Profiler(ProfilingConfig(sample_rate=1.0, interval_ms=1, directory=tmp, keep=1))
+
+        async def request():
+            session = profiler.begin(scope(), "sampled", "/api/submit")
+            await slow_handler()
+            session.finish(202)
+            return session
+
+        for _ in range(2):
+            session = asyncio.run(request())
+            session._thread.join(5)
+        recent = profiler.store.recent()
+        assert len(recent) == 1 and recent[0]["status"] == 202 and recent[0]["samples"] > 0
+        assert len(list(Path(tmp).iterdir())) == 1
+        folded = Path(recent[0]["file"]).read_text()
+        lines = folded.splitlines()
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+        assert any("busy (" in line for line in lines)
+        assert any(line.rsplit(" ", 1)[0].endswith(AWAITING) and "slow_handler (" in line for line in lines)
+        assert profiler.store.get(recent[0]["id"]) == recent[0]
+
+if __name__ == "__main__":
+    test_trigger_needs_allowed_client_or_sample_rate()
+    test_profiling_is_off_unless_configured()
+    test_profile_records_running_and_awaiting_stacks()
+    print("Profiling tests passed")
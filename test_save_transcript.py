@@ -1,12 +1,10 @@
-from pymongo import MongoClient
 from datetime import datetime, timezone
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from backend.transcription.mongodb.connection import get_collection
 
 def save_transcript(call_id, transcript_text, language="en"):
     try:
-        client = MongoClient("mongodb://localhost:27017/", serverSelectionTimeoutMS=5000)
-        db = client["transcription_db"]
-        collection = db["transcripts"]
+        collection = get_collection()
         
         result = collection.insert_one({
             "call_id": call_id,
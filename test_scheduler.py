@@ -0,0 +1,83 @@
+import asyncio
+from backend.dispatch.dispatcher import CallJob
+from backend.dispatch.scheduler import HOT, NON_HOT, PriorityCallQueue, RateLimit
+from backend.observability.metrics import Metrics, MetricsConfig, set_metrics
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def job(call_id, phone, priority=NON_HOT, attempts=0, created_at=0.0):
+    return CallJob(call_id=call_id, payload={"phone_number": phone}, priority=priority,
+                   attempts=attempts, created_at=created_at)
+
+def test_hot_first_then_fewer_retries_then_oldest():
+    async def scenario():
+        queue = PriorityCallQueue(rate_limit=RateLimit(calls=0))
+        queue.put_nowait(job("old", "1", created_at=1))
+        queue.put_nowait(job("retried", "2", attempts=2, created_at=0))
+        queue.put_nowait(job("new", "3", created_at=5))
+        queue.put_nowait(job("hot", "4", priority=HOT, created_at=9))
+        return [(await queue.get()).call_id for _ in range(4)]
+    assert asyncio.run(scenario()) == ["hot", "old", "new", "retried"]
+
+def test_phone_rate_limit_defers_without_blocking_others():
+    async def scenario():
+        clock = FakeClock()
+        queue = PriorityCallQueue(rate_limit=RateLimit(calls=1, window=60), clock=clock)
+        queue.put_nowait(job("a1", "555", priority=HOT, created_at=1))
+        queue.put_nowait(job("a2", "555", priority=HOT, created_at=2))
+        queue.put_nowait(job("b1", "777", created_at=3))
+        order = [(await queue.get()).call_id, (await queue.get()).call_id]
+        assert queue.stats()["deferred"] == 1
+        clock.now += 61
+        order.append((await queue.get()).call_id)
+        assert queue.wait_time.count == 3
+        return order
+    assert asyncio.run(scenario()) == ["a1", "b1", "a2"]
+
+def test_retries_wait_for_their_backoff():
+    async def scenario():
+        clock = FakeClock()
+        queue = PriorityCallQueue(rate_limit=RateLimit(calls=0), clock=clock)
+        queue.put_later(job("r", "1"), delay=5)
+        assert queue.qsize() == 0 and queue.retry_pending == 1
+        try:
+            await asyncio.wait_for(queue.get(), 0.05)
+            raise AssertionError("retry dispatched before its backoff")
+        except asyncio.TimeoutError:
+            pass
+        clock.now += 5
+        return (await queue.get()).call_id
+    assert asyncio.run(scenario()) == "r"
+
+def test_wait_and_depth_are_exported_on_metrics():
+    async def scenario():
+        clock = FakeClock()
+        queue = PriorityCallQueue(rate_limit=RateLimit(calls=0), clock=clock)
+        queue.put_nowait(job("h", "1", priority=HOT))
+        queue.put_nowait(job("n", "2"))
+        clock.now += 2
+        await queue.get()
+        await queue.get()
+    metrics = Metrics(MetricsConfig(slow_query_ms=0))
+    set_metrics(metrics)
+    try:
+        asyncio.run(scenario())
+    finally:
+        set_metrics(None)
+    assert metrics.dispatch_wait.snapshot()[(HOT,)]["buckets"]["5"] == 1
+    assert metrics.dispatch_depth.snapshot()[()]["count"] == 2
+    text = metrics.render()
+    assert 'dispatch_queue_wait_seconds_bucket{priority="non-hot",le="1"} 0' in text
+    assert 'dispatch_queue_depth_bucket{le="1"} 2' in text
+
+if __name__ == "__main__":
+    test_hot_first_then_fewer_retries_then_oldest()
+    test_phone_rate_limit_defers_without_blocking_others()
+    test_retries_wait_for_their_backoff()
+    test_wait_and_depth_are_exported_on_metrics()
+    print("Scheduler tests passed")
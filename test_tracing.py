@@ -0,0 +1,117 @@
+import asyncio
+import json
+import os
+import tempfile
+from backend.dispatch.dispatcher import CallDispatcher, DispatchConfig
+from backend.dispatch.scheduler import RateLimit
+from backend.observability.metrics import Metrics, MetricsConfig
+from backend.observability.tracing import (
+    NOOP_SPAN,
+    FileExporter,
+    InMemoryCollector,
+    Tracer,
+    TracingConfig,
+    parse_traceparent,
+    set_tracer,
+    start_span,
+    trace_summary,
+)
+
+def memory_tracer():
+    collector = InMemoryCollector(max_traces=10)
+    tracer = Tracer(TracingConfig(), exporters=[collector])
+    set_tracer(tracer)
+    return tracer, collector
+
+def test_spans_follow_tasks_and_threads():
+    tracer, collector = memory_tracer()
+    metrics = Metrics(MetricsConfig(slow_query_ms=0))
+
+    def save_call():
+        with metrics.track_query("postgres", "save_call"):
+            return 42
+
+    async def scenario():
+        with start_span("POST /api/calls", call_id=42) as root:
+            await asyncio.create_task(asyncio.to_thread(save_call))
+            return root.context.trace_id
+
+    trace_id = asyncio.run(scenario())
+    spans = collector.spans(trace_id)
+    assert [span.name for span in spans] == ["POST /api/calls", "postgres save_call"]
+    assert spans[1].parent_id == spans[0].context.span_id
+    assert collector.trace_ids_for_call("42") == [trace_id]
+    summary = trace_summary(spans)
+    assert summary["spans"][1]["attributes"] == {"db.system": "postgres"}
+    set_tracer(None)
+
+def test_background_queries_do_not_start_traces():
+    tracer, collector = memory_tracer()
+    with Metrics(MetricsConfig(slow_query_ms=0)).track_query("postgres", "relay_outbox_batch"):
+        pass
+    assert not collector._traces
+    set_tracer(None)
+
+def test_dispatcher_continues_the_submit_trace():
+    tracer, collector = memory_tracer()
+
+    async def bot(**payload):
+        return {"status": "success"}
+
+    async def scenario():
+        dispatcher = CallDispatcher(bot, DispatchConfig(concurrency=1, rate_limit=RateLimit(calls=0)))
+        await dispatcher.start()
+        with start_span("POST /api/submit") as root:
+            job = dispatcher.submit({"phone_number": "+15550000000"})
+        await dispatcher.stop()
+        return root.context.trace_id, job.call_id
+
+    trace_id, call_id = asyncio.run(scenario())
+    spans = collector.spans(trace_id)
+    assert [span.name for span in spans] == ["POST /api/submit", "call_medical_bot"]
+    assert spans[1].attributes["call_id"] == call_id
+    assert collector.trace_ids_for_call(call_id) == [trace_id]
+    set_tracer(None)
+
+def test_disabled_tracer_is_a_noop():
+    tracer = Tracer(TracingConfig())
+    assert not tracer.enabled
+    assert tracer.span("anything") is NOOP_SPAN
+    assert tracer.begin("anything") is NOOP_SPAN
+
+def test_file_export_is_otlp_json():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "traces.jsonl")
+        tracer = Tracer(TracingConfig(), exporters=[FileExporter(path, "test-service", batch_size=2)])
+        parent = parse_traceparent("00-" + "a" * 32 + "-" + "b" * 16 + "-01")
+        with tracer.span("outer", parent=parent, call_id=7):
+            with tracer.span("inner"):
+                pass
+        tracer.flush()
+        with open(path) as f:
+            lines = [json.loads(line) for line in f]
+    assert len(lines) == 1
+    resource = lines[0]["resourceSpans"][0]
+    assert resource["resource"]["attributes"][0]["value"] == {"stringValue": "test-service"}
+    spans = resource["scopeSpans"][0]["spans"]
+    assert [span["name"] for span in spans] == ["inner", "outer"]
+    assert spans[1]["traceId"] == "a" * 32 and spans[1]["parentSpanId"] == "b" * 16
+    assert {"key": "call_id", "value": {"intValue": "7"}} in spans[1]["attributes"]
+
+def test_collector_evicts_oldest_traces():
+    collector = InMemoryCollector(max_traces=2)
+    tracer = Tracer(TracingConfig(), exporters=[collector])
+    for call_id in range(3):
+        with tracer.span("call", call_id=call_id):
+            pass
+    assert collector.trace_ids_for_call(0) == []
+    assert len(collector.trace_ids_for_call(2)) == 1
+
+if __name__ == "__main__":
+    test_spans_follow_tasks_and_threads()
+    test_background_queries_do_not_start_traces()
+    test_dispatcher_continues_the_submit_trace()
+    test_disabled_tracer_is_a_noop()
+    test_file_export_is_otlp_json()
+    test_collector_evicts_oldest_traces()
+    print("Tracing tests passed")
@@ -0,0 +1,75 @@
+import asyncio
+from backend.services.transcript_search import InvertedIndexSearch, MongoTranscriptSearch, parse_query
+
+def indexed(*texts, language="en"):
+    backend = InvertedIndexSearch()
+    for call_id, text in enumerate(texts, 1):
+        backend.index({"_id": f"t{call_id}", "call_id": call_id, "transcript_text": text, "language": language})
+    return backend
+
+def test_rarer_and_repeated_terms_rank_higher():
+    backend = indexed("fever and cough", "fever fever fever", "cough for two days", "rash on the arm")
+    hits, has_more = backend.search_sync("fever rash")
+    assert [hit["call_id"] for hit in hits] == [2, 4, 1]
+    assert not has_more and hits[0]["transcript_id"] == "t2"
+
+def test_phrases_must_match_exactly():
+    assert parse_query('"Chest pain" fever') == (["fever", "chest", "pain"], ["chest pain"])
+    backend = indexed("chest pain since morning", "pain in the chest")
+    hits, _ = backend.search_sync('"chest pain"')
+    assert [hit["call_id"] for hit in hits] == [1]
+    assert hits[0]["snippet"].startswith("chest pain")
+
+def test_language_filters_results():
+    backend = indexed("fever tonight")
+    backend.index({"call_id": 9, "transcript_text": "fever since monday", "language": "ta"})
+    assert [hit["call_id"] for hit in backend.search_sync("fever", language="ta")[0]] == [9]
+    assert [hit["call_id"] for hit in backend.search_sync("fever", language="en")[0]] == [1]
+    assert len(backend.search_sync("fever")[0]) == 2
+
+def test_pagination():
+    backend = indexed(*[f"fever report {i}" for i in range(5)])
+    first, more = backend.search_sync("fever", limit=2)
+    rest, more_after = backend.search_sync("fever", limit=2, offset=4)
+    assert len(first) == 2 and more
+    assert len(rest) == 1 and not more_after
+
+def test_mongo_backend_filters_by_language_too():
+    class Cursor:
+        def sort(self, *args):
+            return self
+
+        def skip(self, n):
+            return self
+
+        def limit(self, n):
+            return self
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            raise StopAsyncIteration
+
+    class Collection:
+        def find(self, query, projection):
+            self.query = query
+            return Cursor()
+
+    class Repository:
+        collection_ = Collection()
+
+        async def collection(self):
+            return self.collection_
+
+    repository = Repository()
+    asyncio.run(MongoTranscriptSearch(repository).search("fever", language="hi-IN"))
+    assert repository.collection_.query == {"$text": {"$search": "fever", "$language": "none"}, "language": "hi-IN"}
+
+if __name__ == "__main__":
+    test_rarer_and_repeated_terms_rank_higher()
+    test_phrases_must_match_exactly()
+    test_language_filters_results()
+    test_pagination()
+    test_mongo_backend_filters_by_language_too()
+    print("Transcript search tests passed")
@@ -0,0 +1,94 @@
+import json
+from pathlib import Path
+from backend.migrations.runner import apply_mongo_migration
+from backend.services.transcript_search import InvertedIndexSearch
+from backend.transcription.mongodb.storage import (
+    METADATA_PROJECTION,
+    StorageConfig,
+    attach_chunks,
+    encode_transcript,
+    read_text_sync,
+    text_search_language,
+)
+
+class FakeCursor(list):
+    def sort(self, key, direction):
+        return FakeCursor(sorted(self, key=lambda doc: doc[key], reverse=direction < 0))
+
+class FakeCollection:
+    def __init__(self, docs=()):
+        self.docs = list(docs)
+        self.database = {}
+
+    def find(self, query, projection=None):
+        return FakeCursor(d for d in self.docs if all(d.get(k) == v for k, v in query.items()))
+
+def test_short_transcripts_stay_plain():
+    doc, chunks = encode_transcript({"call_id": 1, "transcript_text": "fever"}, StorageConfig())
+    assert doc["transcript_text"] == "fever" and doc["text_length"] == 5
+    assert "encoding" not in doc and chunks == []
+
+def test_long_transcripts_are_compressed_inline():
+    text = "Patient reports chest pain. " * 500
+    doc, chunks = encode_transcript({"call_id": 1, "transcript_text": text}, StorageConfig())
+    assert "transcript_text" not in doc and doc["encoding"] == "zlib" and chunks == []
+    assert len(doc["body"]) < len(text)
+    assert read_text_sync(FakeCollection(), doc) == text
+
+def test_very_long_transcripts_are_chunked_and_read_back_in_order():
+    text = "".join(f"sentence {i} with ünïcode; " for i in range(20000))
+    config = StorageConfig(compress_threshold=1024, chunk_size=4096)
+    doc, chunks = encode_transcript({"call_id": 1, "transcript_text": text}, config)
+    doc["_id"] = "t1"
+    assert doc["chunk_count"] == len(chunks) > 1
+    collection = FakeCollection()
+    collection.database["transcript_chunks"] = FakeCollection(reversed(attach_chunks("t1", chunks)))
+    assert read_text_sync(collection, doc) == text
+
+def test_compressed_transcripts_stay_searchable():
+    text = "Patient reports crushing chest pain radiating to the left arm. " * 200
+    doc, _ = encode_transcript({"call_id": 9, "transcript_text": text, "language": "en"},
+                               StorageConfig(search_chars=1000))
+    assert doc["encoding"] == "zlib" and doc["search_text"] == text[:1000]
+    assert METADATA_PROJECTION["search_text"] == 0
+    backend = InvertedIndexSearch()
+    backend.index({"call_id": 1, "transcript_text": "mild fever", "language": "en"})
+    backend.index(dict(doc, _id="t9"))
+    hits, _ = backend.search_sync('"chest pain"')
+    assert [hit["call_id"] for hit in hits] == [9]
+
+def test_unsupported_languages_are_indexed_without_stemming():
+    assert [text_search_language(l) for l in ("en", "pt-BR", "FR", "spanish", "ta", "hi-IN", None)] == [
+        "english", "portuguese", "french", "spanish", "none", "none", "none"]
+    doc, _ = encode_transcript({"call_id": 3, "transcript_text": "vanakkam", "language": "ta"})
+    assert doc["language"] == "ta" and doc["search_language"] == "none"
+
+def test_text_index_migration_replaces_the_0003_index():
+    class IndexedCollection:
+        def __init__(self):
+            self.indexes = {}
+
+        def create_index(self, keys, name, **options):
+            self.indexes.setdefault(name, (keys, options))
+
+        def index_information(self):
+            return dict(self.indexes)
+
+        def drop_index(self, name):
+            del self.indexes[name]
+
+    db = {"transcripts": IndexedCollection()}
+    for version in ("0003_transcript_text_index", "0007_transcript_text_search_index", "0007_transcript_text_search_index"):
+        apply_mongo_migration(db, json.loads(Path(f"backend/migrations/mongodb/{version}.json").read_text()))
+    (name, (keys, options)), = db["transcripts"].indexes.items()
+    assert keys == [("transcript_text", "text"), ("search_text", "text")]
+    assert options["language_override"] == "search_language"
+
+if __name__ == "__main__":
+    test_short_transcripts_stay_plain()
+    test_long_transcripts_are_compressed_inline()
+    test_very_long_transcripts_are_chunked_and_read_back_in_order()
+    test_compressed_transcripts_stay_searchable()
+    test_unsupported_languages_are_indexed_without_stemming()
+    test_text_index_migration_replaces_the_0003_index()
+    print("Transcript storage tests passed")